@@ -19,18 +19,23 @@
 # TODO: Give searches and heuristics commandline options and reenable preferred
 # operators.
 
-import platform
 import argparse
 import logging
 import os
 import sys
-import re
-
 
+from pyperplan.experiments import (
+    BLIND_SEARCHES,
+    find_problems,
+    make_runs,
+    run_experiment,
+)
 from pyperplan.planner import (
     find_domain,
     HEURISTICS,
-    search_plan,
+    parse_portfolio,
+    PORTFOLIO,
+    search_portfolio,
     SEARCHES,
     validate_solution,
     write_solution,
@@ -70,6 +75,93 @@ def main():
         help=f"Select a search algorithm from {search_names}",
         default="bfs",
     )
+    argparser.add_argument(
+        "--bitsets",
+        action="store_true",
+        help="Represent states, preconditions and effects as int bitmasks",
+    )
+    argparser.add_argument(
+        "--join-grounding",
+        action="store_true",
+        help="Ground actions by joining their preconditions with the facts "
+        "that are reachable in the delete relaxation",
+    )
+    argparser.add_argument(
+        "--grounding-workers",
+        type=int,
+        default=1,
+        help="Number of processes that ground the actions",
+    )
+    argparser.add_argument(
+        "--heuristic-cache",
+        type=int,
+        default=0,
+        metavar="SIZE",
+        help="Cache the heuristic values of up to SIZE states (0 disables it)",
+    )
+    argparser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes that run random walks in parallel "
+        "(only for mcrw and ehrws)",
+    )
+    argparser.add_argument(
+        "--portfolio",
+        nargs="?",
+        const=",".join(PORTFOLIO),
+        metavar="CONFIGS",
+        help="Run a comma-separated list of search:heuristic configurations "
+        "in parallel instead of --search and --heuristic. Without CONFIGS, "
+        "%s is used" % ",".join(PORTFOLIO),
+    )
+    argparser.add_argument(
+        "--deadline",
+        type=float,
+        help="With --portfolio, return the shortest plan found within this "
+        "many seconds instead of the first plan",
+    )
+    argparser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        help="Number of runs that are executed in parallel. If not given, "
+        "one run per CPU is executed",
+    )
+    argparser.add_argument(
+        "--time-limit", type=float, help="CPU time limit of a run in seconds"
+    )
+    argparser.add_argument(
+        "--memory-limit", type=int, help="Memory limit of a run in MiB"
+    )
+    argparser.add_argument(
+        "--seed", type=int, default=0, help="Random seed of the first run of a task"
+    )
+    argparser.add_argument(
+        "--runs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Let one process execute up to N runs of a task with the same "
+        "grounded task and heuristic",
+    )
+    argparser.add_argument(
+        "--task-cache",
+        metavar="DIR",
+        help="Store grounded tasks in DIR and load them from there in later "
+        "calls instead of parsing and grounding again",
+    )
+    argparser.add_argument(
+        "--domain-cache",
+        metavar="DIR",
+        help="Store parsed domains in DIR and load them from there in later "
+        "calls instead of parsing again",
+    )
+    argparser.add_argument(
+        "--results",
+        metavar="FILE",
+        help="Append the result of each run as a JSON line to FILE",
+    )
     argparser.add_argument(dest="num_task_experiments")
     argparser.add_argument(dest="num_runs_per_task")
     args = argparser.parse_args()
@@ -80,7 +172,6 @@ def main():
         stream=sys.stdout,
     )
 
-
     hffpo_searches = ["gbf", "wastar", "ehs"]
     if args.heuristic == "hffpo" and args.search not in hffpo_searches:
         print(
@@ -90,95 +181,94 @@ def main():
         argparser.print_help()
         sys.exit(2)
 
-
-
-    path_to_domain = os.path.dirname(args.domain)
-    
-    task_experiment_counter = 0
-
-    file_list = [f for f in os.listdir(path_to_domain) if os.path.isfile(os.path.join(path_to_domain, f))]
-
-    problem_list = []
-
-    for file in file_list:
-        if "task" in file and file.endswith("pddl"):
-            problem_list.append(file)
-    problem_list = sorted(problem_list)
     args.problem = os.path.abspath(args.problem)
-
     if args.domain is None:
         args.domain = find_domain(args.problem)
     else:
-        # args.domain = os.path.abspath(args.domain) original pyperplan code
-        args.domain = find_domain(args.problem) # using the premade matching function for simplicity
-
-    starting_index = int(re.findall(r'\d+', args.problem)[0]) - 1 # python indexing
-    print(args.problem)
-
-    os_name = platform.system()
-
-
-    if os_name == 'Windows':
-        current_problem = os.path.dirname(args.problem) + '\\' + problem_list[starting_index]
-
-    elif os_name == 'Darwin':
-        current_problem = os.path.dirname(args.problem) + '/' + problem_list[starting_index]
-
-
-    if len(problem_list) - starting_index < int(args.num_task_experiments): # number of experiments possible given start of iteration
-        print("error, requested too many task experiments")
-        exit()
-
-
-    for task_experiment in range(1,int(args.num_task_experiments)+1):
-        print("task_splitter")
-        print(f"CURRENTLY on task number: {task_experiment}")
-
-        if os_name == 'Windows':
-            current_problem = os.path.dirname(args.problem) + '\\' + problem_list[starting_index]
-
-        elif os_name == 'Darwin':
-            current_problem = os.path.dirname(args.problem) + '/' + problem_list[starting_index]
-        current_prob = current_problem.rsplit('/', 1)[-1]
-
-
-
-        for run in range(1,int(args.num_runs_per_task)+1):
-            print("run_splitter")
-            print(f"CURRENTLY on run number: {run}")
-            
-
-
-            search = SEARCHES[args.search]
-            heuristic = HEURISTICS[args.heuristic]
-
-            if args.search in ["bfs", "ids", "sat"]:
-                heuristic = None
+        args.domain = os.path.abspath(args.domain)
+
+    # The problems of the experiment are the num_task_experiments problems of
+    # the benchmark directory that start with the given one.
+    problem_files = [args.problem]
+    num_tasks = int(args.num_task_experiments)
+    if num_tasks > 1:
+        benchmark_dir = os.path.dirname(args.problem)
+        try:
+            first = find_problems(benchmark_dir).index(args.problem) + 1
+            problem_files = find_problems(benchmark_dir, first, num_tasks)
+        except ValueError as error:
+            print(f"ERROR: requested too many task experiments: {error}")
+            sys.exit(2)
+    num_runs = int(args.num_runs_per_task)
+
+    if args.portfolio:
+        logging.info("using portfolio: %s" % args.portfolio)
+        portfolio = parse_portfolio(args.portfolio.split(","))
+        for problem_file in problem_files:
+            domain_file = find_domain(problem_file)
+            for _ in range(num_runs):
+                solution = search_portfolio(
+                    domain_file,
+                    problem_file,
+                    portfolio,
+                    deadline=args.deadline,
+                    use_bitsets=args.bitsets,
+                )
+                if solution is None:
+                    logging.warning("No solution could be found")
+                else:
+                    solution_file = problem_file + ".soln"
+                    logging.info("Plan length: %s" % len(solution))
+                    write_solution(solution, solution_file)
+                    validate_solution(domain_file, problem_file, solution_file)
+        return
+
+    configuration = args.search
+    if args.search not in BLIND_SEARCHES:
+        configuration += ":" + args.heuristic
+    logging.info("using configuration: %s" % configuration)
+    runs = make_runs(
+        problem_files, [configuration], range(args.seed, args.seed + num_runs)
+    )
+    if num_tasks == 1:
+        # Keep the domain that was given on the commandline.
+        runs = [run._replace(domain_file=args.domain) for run in runs]
+    results = run_experiment(
+        runs,
+        results_file=args.results,
+        num_jobs=args.jobs,
+        time_limit=args.time_limit,
+        memory_limit=args.memory_limit,
+        use_bitsets=args.bitsets,
+        heuristic_cache_size=args.heuristic_cache,
+        num_workers=args.workers,
+        runs_per_process=args.runs,
+        task_cache_dir=args.task_cache,
+        join_grounding=args.join_grounding,
+        grounding_workers=args.grounding_workers,
+        domain_cache_dir=args.domain_cache,
+    )
 
-            logging.info("using search: %s" % search.__name__)
-            logging.info("using heuristic: %s" % (heuristic.__name__ if heuristic else None))
-            use_preferred_ops = args.heuristic == "hffpo"
-            solution = search_plan(
-                find_domain(current_problem),
-                current_problem,
-                search,
-                heuristic,
-                use_preferred_ops=use_preferred_ops,
+    for result in results:
+        problem_file = result["problem_file"]
+        if result["status"] != "solved":
+            logging.warning(
+                "No solution could be found for %s (%s)"
+                % (os.path.basename(problem_file), result["status"])
             )
-
-            if solution is None:
-                logging.warning("No solution could be found")
-            else:
-                solution_file = args.problem + ".soln"
-                logging.info("Plan length: %s" % len(solution))
-                write_solution(solution, solution_file)
-                validate_solution(args.domain, args.problem, solution_file)
-
-        starting_index += 1
-        task_experiment_counter += 1
-
-    print(f"Number of tasks experimented on: {task_experiment_counter}, Number of runs per task: {int(args.num_runs_per_task)}")
-
+            continue
+        solution_file = problem_file + ".soln"
+        logging.info("Plan length: %s" % result["plan_length"])
+        with open(solution_file, "w") as file:
+            for name in result["plan"]:
+                print(name, file=file)
+        validate_solution(result["domain_file"], problem_file, solution_file)
+
+    solved = sum(result["status"] == "solved" for result in results)
+    logging.info(
+        "Solved %d of %d runs (%d tasks, %d runs per task)"
+        % (solved, len(results), len(problem_files), num_runs)
+    )
 
 if __name__ == "__main__":
     main()
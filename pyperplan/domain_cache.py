@@ -0,0 +1,136 @@
+#
+# This file is part of pyperplan.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+#
+
+"""
+A cache of parsed domains that is keyed by the content of the domain files
+"""
+
+from collections import OrderedDict
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+
+from .pddl.parser import Parser
+
+
+# Increase when the parsed representation changes, so that domains which
+# were stored by older versions are parsed again.
+VERSION = 1
+
+
+def domain_key(content):
+    """
+    Returns a hex digest of the content of a domain file and the version of
+    the cache.
+
+    @param content  The content of the domain file as bytes
+    """
+    digest = hashlib.sha256()
+    digest.update(b"pyperplan domain %d\0" % VERSION)
+    digest.update(content)
+    return digest.hexdigest()
+
+
+def _parse_domain(content):
+    parser = Parser(None)
+    parser.domInput = content.decode("utf-8")
+    return parser.parse_domain(read_from_file=False)
+
+
+def _read_domain(filename):
+    try:
+        with open(filename, "rb") as file:
+            return pickle.load(file)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        return None
+
+
+def _write_domain(domain, cache_dir, filename):
+    os.makedirs(cache_dir, exist_ok=True)
+    # Write to a temporary file first, so parallel runs never read a
+    # partially written domain.
+    handle, temp_filename = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as file:
+            pickle.dump(domain, file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_filename, filename)
+    except BaseException:
+        os.remove(temp_filename)
+        raise
+
+
+class DomainCache:
+    """
+    Remembers the parsed pddl.Domain of domain files.
+
+    Domains are identified by the hash of the file content, so domain files
+    with the same content (e.g. the per-problem domain files of some
+    benchmarks) are parsed only once. The cache holds at most max_size
+    domains in memory and evicts the least recently used one when it is
+    full. Grounding does not modify a domain, so the problems of a domain
+    can share it.
+    """
+
+    def __init__(self, max_size=32):
+        """
+        @param max_size: The maximum number of domains kept in memory.
+        """
+        self.max_size = max_size
+        self.domains = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, domain_file, cache_dir=None):
+        """
+        Returns the parsed domain of the given file.
+
+        @param domain_file: The path to a domain file.
+        @param cache_dir: If given, a directory in which parsed domains are
+                          stored with pickle. It is created if needed. Only
+                          use directories that nobody else can write to.
+        """
+        with open(domain_file, "rb") as file:
+            content = file.read()
+        key = domain_key(content)
+        domain = self.domains.get(key)
+        if domain is not None:
+            self.hits += 1
+            self.domains.move_to_end(key)
+            return domain
+        self.misses += 1
+        filename = None
+        if cache_dir is not None:
+            filename = os.path.join(cache_dir, key + ".domain")
+            if os.path.isfile(filename):
+                domain = _read_domain(filename)
+                if domain is not None:
+                    logging.info(f"Loaded parsed domain from {filename}")
+        if domain is None:
+            domain = _parse_domain(content)
+            if filename is not None:
+                _write_domain(domain, cache_dir, filename)
+                logging.info(f"Stored parsed domain in {filename}")
+        self.domains[key] = domain
+        if len(self.domains) > self.max_size:
+            self.domains.popitem(last=False)
+        return domain
+
+    def clear(self):
+        """Removes all domains from memory."""
+        self.domains.clear()
@@ -0,0 +1,394 @@
+#
+# This file is part of pyperplan.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+#
+
+"""
+Runs experiments, i.e., a matrix of tasks, search configurations and seeds,
+in parallel processes with per-run resource limits
+"""
+
+from collections import deque, namedtuple
+import functools
+import json
+import logging
+import multiprocessing
+from multiprocessing.connection import wait
+import os
+import random
+import re
+import signal
+import time
+import traceback
+
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from . import planner
+from .heuristics.heuristic_cache import HeuristicCache
+
+
+# One run of an experiment. "search" and "heuristic" are names from
+# planner.SEARCHES and planner.HEURISTICS. "heuristic" is None for searches
+# that do not use a heuristic.
+Run = namedtuple("Run", ["domain_file", "problem_file", "search", "heuristic", "seed"])
+
+# Searches that ignore the heuristic.
+BLIND_SEARCHES = ["bfs", "ids", "sat"]
+
+EXPANSIONS = re.compile(r"(\d+) Nodes expanded")
+
+
+def find_problems(benchmark_dir, first=1, count=None):
+    """
+    Returns the paths of the problem files of a benchmark directory. Problem
+    files are the files whose name contains "task" and ends with "pddl". They
+    are numbered from 1 in the order of their names.
+
+    @param benchmark_dir  The directory with the domain and problem files
+    @param first          The number of the first problem that is returned
+    @param count          The number of problems that are returned. If None,
+                          all problems from the first one are returned.
+    """
+    problems = sorted(
+        name
+        for name in os.listdir(benchmark_dir)
+        if "task" in name
+        and name.endswith("pddl")
+        and os.path.isfile(os.path.join(benchmark_dir, name))
+    )
+    if first < 1 or first > len(problems):
+        raise ValueError(
+            f"{benchmark_dir} has no problem number {first} "
+            f"({len(problems)} problems)"
+        )
+    if count is None:
+        count = len(problems) - first + 1
+    if first - 1 + count > len(problems):
+        raise ValueError(
+            f"{benchmark_dir} has only {len(problems)} problems, "
+            f"cannot take {count} from number {first}"
+        )
+    return [
+        os.path.join(os.path.abspath(benchmark_dir), name)
+        for name in problems[first - 1 : first - 1 + count]
+    ]
+
+
+def make_runs(problem_files, configurations, seeds):
+    """
+    Builds the runs of the experiment matrix. The runs of a problem are
+    adjacent, so a problem is only grounded while its runs are scheduled.
+
+    @param problem_files   A list of problem files, e.g. from find_problems.
+                           The domain of each problem is found with
+                           planner.find_domain.
+    @param configurations  A list of "search:heuristic" (or "search") names
+    @param seeds           The random seeds with which each configuration
+                           is run on each problem
+    @return A list of Run tuples
+    """
+    parsed = []
+    for configuration in configurations:
+        search_name, _, heuristic_name = configuration.partition(":")
+        if search_name not in planner.SEARCHES:
+            raise ValueError(f"Unknown search {search_name!r}")
+        if heuristic_name and heuristic_name not in planner.HEURISTICS:
+            raise ValueError(f"Unknown heuristic {heuristic_name!r}")
+        if search_name in BLIND_SEARCHES:
+            heuristic_name = ""
+        parsed.append((search_name, heuristic_name or None))
+    return [
+        Run(planner.find_domain(problem_file), problem_file, search, heuristic, seed)
+        for problem_file in problem_files
+        for search, heuristic in parsed
+        for seed in seeds
+    ]
+
+
+class _ExpansionCounter(logging.Handler):
+    """Remembers the last number of expansions that a search logged."""
+
+    def __init__(self):
+        logging.Handler.__init__(self, logging.INFO)
+        self.expansions = None
+
+    def emit(self, record):
+        match = EXPANSIONS.search(record.getMessage())
+        if match:
+            self.expansions = int(match.group(1))
+
+
+def _set_memory_limit(memory_limit):
+    if resource is not None and memory_limit is not None:
+        limit = memory_limit * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _set_time_limit(time_limit):
+    """
+    Limits the CPU time that the process may use from now on. Only the soft
+    limit is set (SIGXCPU ends the process), so it can be moved for every
+    run of a process.
+    """
+    if resource is None or time_limit is None:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    seconds = int(usage.ru_utime + usage.ru_stime + time_limit + 0.999)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if hard != resource.RLIM_INFINITY:
+        seconds = min(seconds, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (seconds, hard))
+
+
+def _run_in_process(task, runs, options, connection):
+    """
+    Executes runs that share the problem and configuration. The heuristic
+    is built once and used by all of them. The result of each run is sent
+    as soon as the run ends.
+    """
+    # Keep the scheduler from stopping the runs on its own Ctrl-C.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _set_memory_limit(options.get("memory_limit"))
+    counter = _ExpansionCounter()
+    root_logger = logging.getLogger()
+    root_logger.handlers = [counter]
+    root_logger.setLevel(logging.INFO)
+
+    run = runs[0]
+    search = planner.SEARCHES[run.search]
+    num_workers = options.get("num_workers", 1)
+    if num_workers > 1 and run.search in ["mcrw", "ehrws"]:
+        search = functools.partial(search, num_workers=num_workers)
+    try:
+        _set_time_limit(options.get("time_limit"))
+        heuristic = None
+        if run.heuristic is not None:
+            heuristic = planner.HEURISTICS[run.heuristic](task)
+        if heuristic is not None and options.get("heuristic_cache_size"):
+            heuristic = HeuristicCache(heuristic, options["heuristic_cache_size"])
+        solutions = planner.search_runs(
+            task, search, heuristic, [run.seed for run in runs]
+        )
+        for _ in runs:
+            counter.expansions = None
+            _set_time_limit(options.get("time_limit"))
+            start_time = time.process_time()
+            _, solution = next(solutions)
+            connection.send(
+                {
+                    "status": "unsolved" if solution is None else "solved",
+                    "plan_length": None if solution is None else len(solution),
+                    "plan": None if solution is None else [op.name for op in solution],
+                    "expansions": counter.expansions,
+                    "search_time": time.process_time() - start_time,
+                }
+            )
+    except MemoryError:
+        connection.send({"status": "out of memory"})
+    except Exception:
+        connection.send({"status": "crashed", "error": traceback.format_exc()})
+    connection.close()
+
+
+def _failed_result(exitcode):
+    # The signals that the CPU time limit sends (they do not exist on Windows).
+    limit_signals = [getattr(signal, name, None) for name in ["SIGXCPU", "SIGKILL"]]
+    if exitcode is not None and -exitcode in limit_signals:
+        return {"status": "timeout"}
+    return {"status": "crashed", "error": f"exit code {exitcode}"}
+
+
+def _make_batches(runs, runs_per_process):
+    """
+    Splits the indices of the runs into batches of at most runs_per_process
+    adjacent runs that share the problem and the configuration.
+    """
+    batches = []
+    for index, run in enumerate(runs):
+        if batches:
+            last = runs[batches[-1][-1]]
+            if (
+                len(batches[-1]) < runs_per_process
+                and batches[-1][-1] == index - 1
+                and last._replace(seed=run.seed) == run
+            ):
+                batches[-1].append(index)
+                continue
+        batches.append([index])
+    return batches
+
+
+def run_experiment(
+    runs,
+    results_file=None,
+    num_jobs=None,
+    time_limit=None,
+    memory_limit=None,
+    use_bitsets=False,
+    heuristic_cache_size=None,
+    num_workers=1,
+    runs_per_process=1,
+    task_cache_dir=None,
+    join_grounding=False,
+    grounding_workers=1,
+    domain_cache_dir=None,
+):
+    """
+    Executes the given runs in parallel processes.
+
+    Each problem is parsed and grounded once in the main process. The runs
+    of the problem share the grounded task and problems with the same domain
+    share the parsed domain. By default every run has a
+    process of its own and constructs its heuristic. With runs_per_process,
+    a process executes up to that many runs that only differ in their seed
+    one after the other with the same heuristic (see planner.search_runs).
+    The results are appended to results_file as JSON lines as soon as a run
+    ends, so an interrupted experiment keeps its finished runs.
+
+    @param runs                  A list of Run tuples, e.g. from make_runs
+    @param results_file          If given, the path of a file to which a
+                                 JSON object per finished run is appended
+    @param num_jobs              The number of processes that are executed at
+                                 the same time (default: number of CPUs)
+    @param time_limit            The CPU time limit of a run in seconds
+    @param memory_limit          The address space limit of a process in MiB
+    @param use_bitsets           Represent states as int bitmasks
+    @param heuristic_cache_size  If given, cache the heuristic values of up
+                                 to this many states
+    @param num_workers           The number of walk processes of each mcrw
+                                 or ehrws run
+    @param runs_per_process      The maximum number of runs of a process
+    @param task_cache_dir        If given, the grounded tasks are cached in
+                                 this directory (see planner.load_task)
+    @param join_grounding        Ground only the operators that are reachable
+                                 in the delete relaxation
+    @param grounding_workers     The number of processes that ground a task
+    @param domain_cache_dir      If given, parsed domains are stored in this
+                                 directory (see planner.load_task)
+    @return A list with the result dict of each run in the order of runs
+    """
+    if resource is None and (time_limit is not None or memory_limit is not None):
+        logging.warning("Resource limits are not supported on this platform")
+    options = {
+        "time_limit": time_limit,
+        "memory_limit": memory_limit,
+        "heuristic_cache_size": heuristic_cache_size,
+        "num_workers": num_workers,
+    }
+    num_jobs = num_jobs or os.cpu_count() or 1
+    remaining = {}
+    for run in runs:
+        key = (run.domain_file, run.problem_file)
+        remaining[key] = remaining.get(key, 0) + 1
+    tasks = {}
+    grounding_times = {}
+
+    def get_task(run):
+        key = (run.domain_file, run.problem_file)
+        if key not in tasks:
+            start_time = time.process_time()
+            tasks[key] = planner.load_task(
+                run.domain_file,
+                run.problem_file,
+                use_bitsets,
+                task_cache_dir,
+                join_grounding,
+                grounding_workers,
+                domain_cache_dir,
+            )
+            grounding_times[key] = time.process_time() - start_time
+        return tasks[key]
+
+    results = [None] * len(runs)
+    pending = deque(_make_batches(runs, runs_per_process))
+    running = {}
+    output = open(results_file, "a") if results_file else None
+
+    def finish_run(index, result, start_time):
+        run = runs[index]
+        key = (run.domain_file, run.problem_file)
+        record = dict(run._asdict())
+        record.update(result)
+        record["grounding_time"] = grounding_times[key]
+        record["wall_time"] = time.monotonic() - start_time
+        results[index] = record
+        logging.info(
+            "{} {}:{} seed {}: {}".format(
+                os.path.basename(run.problem_file),
+                run.search,
+                run.heuristic,
+                run.seed,
+                record["status"],
+            )
+        )
+        if output is not None:
+            print(json.dumps(record), file=output, flush=True)
+        remaining[key] -= 1
+        if remaining[key] == 0:
+            del tasks[key]
+
+    try:
+        while pending or running:
+            while pending and len(running) < num_jobs:
+                batch = pending.popleft()
+                reader, writer = multiprocessing.Pipe(duplex=False)
+                # Not a daemon, because the walk pool of an mcrw or ehrws run
+                # with num_workers > 1 has child processes. Processes that
+                # are still running are terminated below.
+                process = multiprocessing.Process(
+                    target=_run_in_process,
+                    args=(
+                        get_task(runs[batch[0]]),
+                        [runs[index] for index in batch],
+                        options,
+                        writer,
+                    ),
+                )
+                process.start()
+                writer.close()
+                running[reader] = (batch, process, time.monotonic())
+
+            for reader in wait(list(running)):
+                batch, process, start_time = running[reader]
+                try:
+                    result = reader.recv()
+                except EOFError:
+                    result = None
+                if result is not None:
+                    finish_run(batch.pop(0), result, start_time)
+                    running[reader] = (batch, process, time.monotonic())
+                    if batch and result["status"] not in ["out of memory", "crashed"]:
+                        continue
+                del running[reader]
+                reader.close()
+                process.join()
+                if result is None:
+                    finish_run(
+                        batch.pop(0), _failed_result(process.exitcode), start_time
+                    )
+                if batch:
+                    # The process ended early, the other runs get a new one.
+                    pending.appendleft(batch)
+    finally:
+        for _, process, _ in running.values():
+            process.terminate()
+            process.join()
+        if output is not None:
+            output.close()
+    return results
@@ -23,9 +23,9 @@ task.
 from collections import defaultdict
 import itertools
 import logging
-import re
+import multiprocessing
 
-from .task import Operator, Task
+from .task import BitsetOperator, BitsetTask, Operator, Task
 
 
 # controls mass log output
@@ -33,7 +33,13 @@ verbose_logging = False
 
 
 def ground(
-    problem, remove_statics_from_initial_state=True, remove_irrelevant_operators=True
+    problem,
+    remove_statics_from_initial_state=True,
+    remove_irrelevant_operators=True,
+    use_bitsets=False,
+    join_grounding=False,
+    remove_unreachable_operators=True,
+    num_workers=1,
 ):
     """
     This is the main method that grounds the PDDL task and returns an
@@ -42,6 +48,17 @@ def ground(
     @note Assumption: only PDDL problems with types at the moment.
 
     @param problem A pddl.Problem instance describing the parsed problem
+    @param use_bitsets If True, intern the facts to integer indices and return
+                       a task.BitsetTask whose states are int bitmasks
+    @param join_grounding If True, ground actions by joining their
+                          preconditions with the facts that are reachable in
+                          the delete relaxation. Operators that are not
+                          reachable are never created.
+    @param remove_unreachable_operators If True, remove the operators that are
+                                        not reachable from the initial state
+                                        in the delete relaxation
+    @param num_workers The number of processes that ground the actions. Join
+                       grounding always runs in a single process.
     @return A task.Task instance with the grounded problem
     """
 
@@ -78,7 +95,13 @@ def ground(
         logging.debug("Initial state with statics:\n%s" % init)
 
     # Ground actions
-    operators = _ground_actions(actions, type_map, statics, init)
+    if join_grounding:
+        operators = _ground_actions_by_join(actions, type_map, statics, init)
+    else:
+        operators = _ground_actions(actions, type_map, statics, init, num_workers)
+        # perform reachability analysis
+        if remove_unreachable_operators:
+            operators = _reachability_analysis(operators, init)
     if verbose_logging:
         logging.debug("Operators:\n%s" % "\n".join(map(str, operators)))
 
@@ -107,7 +130,85 @@ def ground(
         operators = _relevance_analysis(operators, goals)
 
     name = problem.name
-    return Task(name, facts, init, goals, operators)
+    task = Task(name, facts, init, goals, operators)
+    if use_bitsets:
+        task = _get_bitset_task(task)
+    return task
+
+
+def _get_bitset_task(task):
+    """
+    Intern all facts of "task" to integer indices and return an equivalent
+    task.BitsetTask.
+
+    Static facts that were kept in the initial state get an index, too.
+    """
+    fact_names = sorted(task.facts | task.initial_state)
+    fact_to_bit = {fact: 1 << index for index, fact in enumerate(fact_names)}
+
+    def get_mask(facts):
+        mask = 0
+        for fact in facts:
+            mask |= fact_to_bit[fact]
+        return mask
+
+    operators = [
+        BitsetOperator(
+            op.name,
+            get_mask(op.preconditions),
+            get_mask(op.add_effects),
+            get_mask(op.del_effects),
+        )
+        for op in task.operators
+    ]
+    return BitsetTask(
+        task.name,
+        fact_names,
+        get_mask(task.initial_state),
+        get_mask(task.goals),
+        operators,
+    )
+
+
+def _reachability_analysis(operators, init):
+    """Remove the operators that are unreachable in the delete relaxation.
+
+    Starting with the facts of the initial state, an operator becomes
+    reachable once all of its preconditions are reachable, and then its add
+    effects become reachable. Every operator counts its unreached
+    preconditions, so each fact and operator is processed only once.
+    """
+    waiting = defaultdict(list)
+    unreached = []
+    queue = []
+    for index, op in enumerate(operators):
+        unreached.append(len(op.preconditions))
+        for fact in op.preconditions:
+            waiting[fact].append(index)
+        if not op.preconditions:
+            queue.append(index)
+
+    reached = set(init)
+    for fact in init:
+        for index in waiting.get(fact, ()):
+            unreached[index] -= 1
+            if unreached[index] == 0:
+                queue.append(index)
+    while queue:
+        op = operators[queue.pop()]
+        for fact in op.add_effects:
+            if fact not in reached:
+                reached.add(fact)
+                for index in waiting.get(fact, ()):
+                    unreached[index] -= 1
+                    if unreached[index] == 0:
+                        queue.append(index)
+
+    reachable = [op for index, op in enumerate(operators) if unreached[index] == 0]
+    logging.info(
+        "Reachability analysis removed %d operators" % (len(operators) - len(reachable))
+    )
+    return reachable
 
 
 def _relevance_analysis(operators, goals):
@@ -116,29 +217,34 @@ def _relevance_analysis(operators, goals):
     We start with all facts within the goal and iteratively compute
     a fixpoint of all relevant effects.
     Relevant effects are those that contribute to a valid path to the goal.
+
+    The fixpoint is computed with a worklist of newly relevant facts. An
+    index from each fact to the operators that add or delete it ensures
+    that every operator is visited only when one of its effects becomes
+    relevant, and its preconditions are added only once.
     """
     debug = True
     debug_pruned_op = set()
 
-    relevant_facts = set()
-    old_relevant_facts = set()
-    changed = True
-    for goal in goals:
-        relevant_facts.add(goal)
-
-    while changed:
-        # set next relevant facts to current facts
-        # if we do not add anything in the following for loop
-        # we have already found a fixpoint
-        old_relevant_facts = relevant_facts.copy()
-        # compute cut of relevant facts with effects of all operators
-        for op in operators:
-            new_addlist = op.add_effects & relevant_facts
-            new_dellist = op.del_effects & relevant_facts
-            if new_addlist or new_dellist:
-                # add all preconditions to relevant facts
-                relevant_facts |= op.preconditions
-        changed = old_relevant_facts != relevant_facts
+    achievers = defaultdict(list)
+    for index, op in enumerate(operators):
+        for fact in op.add_effects | op.del_effects:
+            achievers[fact].append(index)
+
+    relevant_facts = set(goals)
+    relevant_ops = [False] * len(operators)
+    queue = list(relevant_facts)
+    while queue:
+        fact = queue.pop()
+        for index in achievers.get(fact, ()):
+            if relevant_ops[index]:
+                continue
+            relevant_ops[index] = True
+            # add all preconditions to relevant facts
+            for pre in operators[index].preconditions:
+                if pre not in relevant_facts:
+                    relevant_facts.add(pre)
+                    queue.append(pre)
 
     # delete all irrellevant effects
     del_operators = set()
@@ -221,7 +327,7 @@ def _collect_facts(operators):
     return facts
 
 
-def _ground_actions(actions, type_map, statics, init):
+def _ground_actions(actions, type_map, statics, init, num_workers=1):
     """
     Ground a list of actions and return the resulting list of operators.
 
@@ -229,39 +335,134 @@ def _ground_actions(actions, type_map, statics, init):
     @param type_map: Mapping from type to objects of that type
     @param statics: Names of the static predicates
     @param init: Grounded initial state
+    @param num_workers: The number of processes that ground the actions
     """
-    op_lists = [_ground_action(action, type_map, statics, init) for action in actions]
+    static_index = _get_static_index(init)
+    if num_workers > 1:
+        return _ground_actions_in_parallel(
+            actions, type_map, statics, init, static_index, num_workers
+        )
+    op_lists = [
+        _ground_action(action, type_map, statics, init, static_index)
+        for action in actions
+    ]
     operators = list(itertools.chain(*op_lists))
     return operators
 
 
-def _find_pred_in_init(pred_name, param, sig_pos, init):
+# The actions, statics and initial state of a grounding worker process.
+_worker = {}
+
+
+def _init_grounding_worker(actions, statics, init):
+    _worker["actions"] = actions
+    _worker["statics"] = statics
+    _worker["init"] = init
+
+
+def _ground_job(job):
+    action_index, domain_lists = job
+    action = _worker["actions"][action_index]
+    ops = _ground_assignments(action, domain_lists, _worker["statics"], _worker["init"])
+    return [
+        (op.name, tuple(op.preconditions), tuple(op.add_effects), tuple(op.del_effects))
+        for op in ops
+    ]
+
+
+def _ground_actions_in_parallel(
+    actions, type_map, statics, init, static_index, num_workers
+):
+    """
+    Ground the actions in a pool of processes.
+
+    The domain lists of all actions are computed first. The assignment space
+    of an action is split into jobs by the objects of its first parameter,
+    so large actions are spread over several workers. A worker returns an
+    operator as a tuple of its name and its facts. The results are merged in
+    the order of the jobs, so the operators are the same and in the same
+    order as with sequential grounding.
+    """
+    all_domain_lists = [
+        _get_domain_lists(action, type_map, statics, static_index) for action in actions
+    ]
+    sizes = []
+    for domain_lists in all_domain_lists:
+        size = 1
+        for domain in domain_lists:
+            size *= len(domain)
+        sizes.append(size)
+    # Aim for a few jobs per worker to balance the load.
+    job_size = max(1, sum(sizes) // (4 * num_workers))
+    jobs = []
+    for index, domain_lists in enumerate(all_domain_lists):
+        if sizes[index] == 0:
+            continue
+        if not domain_lists:
+            jobs.append((index, domain_lists))
+            continue
+        first = domain_lists[0]
+        num_shards = min(len(first), -(-sizes[index] // job_size))
+        for shard in range(num_shards):
+            chunk = first[
+                shard
+                * len(first)
+                // num_shards : (shard + 1)
+                * len(first)
+                // num_shards
+            ]
+            jobs.append((index, [chunk] + domain_lists[1:]))
+
+    with multiprocessing.Pool(
+        num_workers,
+        initializer=_init_grounding_worker,
+        initargs=(list(actions), statics, init),
+    ) as pool:
+        return [
+            Operator(*op_tuple)
+            for op_tuples in pool.imap(_ground_job, jobs)
+            for op_tuple in op_tuples
+        ]
+
+
+def _get_static_index(init):
     """
-    This method is used to check whether an instantiation of the predicate
-    denoted by pred_name with the parameter param at position sig_pos is
-    present in the initial condition.
+    Index the facts of the initial state by predicate name, argument position
+    and argument, so that _ground_action can check in constant time whether
+    an object occurs at a position of a static predicate in the initial
+    state.
 
-    Useful to evaluate static preconditions efficiently.
+    @param init: Grounded initial state
+    @return A set of (predicate name, position, object) triples
     """
-    match_init = None
-    if sig_pos == 0:
-        match_init = re.compile(rf"\({pred_name} {param}.*")
-    else:
-        reg_ex = r"\(%s\s+" % pred_name
-        reg_ex += r"[\w\d-]+\s+" * sig_pos
-        #        for i in xrange(sig_pos):
-        #            reg_ex += '[\w\d-]+\s+'
-        reg_ex += "%s.*" % param
-        match_init = re.compile(reg_ex)
-    assert match_init is not None
-    return any([match_init.match(string) for string in init])
+    index = set()
+    for fact in init:
+        pred_name, *args = fact[1:-1].split()
+        for position, arg in enumerate(args):
+            index.add((pred_name, position, arg))
+    return index
 
 
-def _ground_action(action, type_map, statics, init):
+def _ground_action(action, type_map, statics, init, static_index=None):
     """
     Ground the action and return the resulting list of operators.
+
+    @param static_index: The result of _get_static_index(init). It is built
+                         if it is not given.
     """
     logging.debug("Grounding %s" % action.name)
+    if static_index is None:
+        static_index = _get_static_index(init)
+    domain_lists = _get_domain_lists(action, type_map, statics, static_index)
+    return _ground_assignments(action, domain_lists, statics, init)
+
+
+def _get_domain_lists(action, type_map, statics, static_index):
+    """
+    Return a list with the possible (param_name, object) pairs of each
+    parameter of the action. Objects that violate a static precondition of
+    the action are removed.
+    """
     param_to_objects = {}
 
     for param_name, param_types in action.signature:
@@ -289,7 +490,7 @@ def _ground_action(action, type_map, statics, init):
                     # remove if no instantiation present in initial state
                     obj_copy = objects.copy()
                     for o in obj_copy:
-                        if not _find_pred_in_init(pred.name, o, sig_pos, init):
+                        if (pred.name, sig_pos, o) not in static_index:
                             if verbose_logging:
                                 remove_debug += 1
                             objects.remove(o)
@@ -299,9 +500,16 @@ def _ground_action(action, type_map, statics, init):
         )
 
     # save a list of possible assignment tuples (param_name, object)
-    domain_lists = [
+    return [
         [(name, obj) for obj in objects] for name, objects in param_to_objects.items()
     ]
+
+
+def _ground_assignments(action, domain_lists, statics, init):
+    """
+    Create the operators for all assignments in the product of the
+    domain_lists of the action.
+    """
     # Calculate all possible assignments
     assignments = itertools.product(*domain_lists)
 
@@ -315,6 +523,188 @@ def _ground_action(action, type_map, statics, init):
     return ops
 
 
+def _split_fact(fact):
+    """Split a grounded fact like "(at a b)" into ("at", ("a", "b"))."""
+    pred_name, *args = fact[1:-1].split()
+    return pred_name, tuple(args)
+
+
+class _FactTable:
+    """
+    The facts that are reachable so far, indexed by predicate name and by
+    (predicate name, position, object).
+    """
+
+    def __init__(self):
+        self.by_predicate = defaultdict(list)
+        self.by_argument = defaultdict(list)
+
+    def add(self, pred_name, args):
+        self.by_predicate[pred_name].append(args)
+        for position, arg in enumerate(args):
+            self.by_argument[(pred_name, position, arg)].append(args)
+
+    def candidates(self, pred_name, terms, assignment):
+        """
+        Return the argument tuples of pred_name that may match an atom with
+        the given terms. If a term is bound, only the tuples with the bound
+        object at its position are returned.
+        """
+        best = None
+        for position, term in enumerate(terms):
+            obj = assignment.get(term)
+            if obj is not None:
+                tuples = self.by_argument.get((pred_name, position, obj), ())
+                if best is None or len(tuples) < len(best):
+                    best = tuples
+        if best is None:
+            return self.by_predicate.get(pred_name, ())
+        return best
+
+
+def _match_atom(terms, args, assignment, param_to_objects):
+    """
+    Unify the terms of a precondition atom with the arguments of a fact.
+
+    @param terms: Parameter names and constants of the atom
+    @param args: The objects of the fact
+    @param assignment: The current mapping from parameter names to objects.
+                       It is not modified.
+    @return The extended assignment or None if the fact does not match
+    """
+    if len(terms) != len(args):
+        return None
+    new_assignment = assignment
+    for term, arg in zip(terms, args):
+        objects = param_to_objects.get(term)
+        if objects is None:
+            # The term is a constant.
+            if term != arg:
+                return None
+            continue
+        bound = new_assignment.get(term)
+        if bound is None:
+            if arg not in objects:
+                return None
+            if new_assignment is assignment:
+                new_assignment = dict(assignment)
+            new_assignment[term] = arg
+        elif bound != arg:
+            return None
+    return new_assignment
+
+
+def _join(atoms, assignment, table, param_to_objects, free_params):
+    """
+    Yield the complete assignments that extend "assignment" such that all
+    atoms are reachable facts.
+
+    The atom with the most bound terms is joined next, so partial
+    assignments that cannot be completed are dropped as early as possible.
+    Parameters that occur in no atom are enumerated at the end.
+    """
+    if not atoms:
+        unbound = [param for param in free_params if param not in assignment]
+        for objects in itertools.product(*[param_to_objects[p] for p in unbound]):
+            complete = dict(assignment)
+            complete.update(zip(unbound, objects))
+            yield complete
+        return
+    index = max(
+        range(len(atoms)),
+        key=lambda i: sum(term in assignment for term in atoms[i][1]),
+    )
+    pred_name, terms = atoms[index]
+    rest = atoms[:index] + atoms[index + 1 :]
+    for args in table.candidates(pred_name, terms, assignment):
+        extended = _match_atom(terms, args, assignment, param_to_objects)
+        if extended is not None:
+            yield from _join(rest, extended, table, param_to_objects, free_params)
+
+
+def _ground_actions_by_join(actions, type_map, statics, init):
+    """
+    Ground only the operators that are reachable in the delete relaxation of
+    the task.
+
+    Instead of forming the product of all parameter domains, the
+    precondition atoms of an action are joined with the reachable facts one
+    atom at a time, starting with the initial state. The add effects of the
+    new operators become reachable and the joins are repeated until no new
+    facts are reached. Each round only joins assignments that use at least
+    one fact that was reached in the previous round (semi-naive evaluation).
+
+    @param actions: List of actions
+    @param type_map: Mapping from type to objects of that type
+    @param statics: Names of the static predicates
+    @param init: Grounded initial state
+    @return The list of reachable operators, grouped by action
+    """
+    action_data = []
+    for action in actions:
+        param_to_objects = {
+            name: set(itertools.chain(*[type_map[type] for type in types]))
+            for name, types in action.signature
+        }
+        atoms = [
+            (pred.name, tuple(name for name, _ in pred.signature))
+            for pred in action.precondition
+        ]
+        action_data.append((action, param_to_objects, atoms))
+
+    table = _FactTable()
+    reached = set()
+    delta = defaultdict(list)
+    for fact in init:
+        reached.add(fact)
+        pred_name, args = _split_fact(fact)
+        table.add(pred_name, args)
+        delta[pred_name].append(args)
+
+    op_lists = [[] for _ in actions]
+    seen = [set() for _ in actions]
+    first_round = True
+    while delta:
+        new_facts = []
+        for op_list, known, (action, param_to_objects, atoms) in zip(
+            op_lists, seen, action_data
+        ):
+            free_params = [name for name, _ in action.signature]
+            if first_round and not atoms:
+                seeds = [({}, [])]
+            else:
+                seeds = (
+                    (assignment, atoms[:index] + atoms[index + 1 :])
+                    for index, (pred_name, terms) in enumerate(atoms)
+                    for args in delta.get(pred_name, ())
+                    for assignment in [_match_atom(terms, args, {}, param_to_objects)]
+                    if assignment is not None
+                )
+            for seed, rest in seeds:
+                for assignment in _join(
+                    rest, seed, table, param_to_objects, free_params
+                ):
+                    key = tuple(assignment[name] for name in free_params)
+                    if key in known:
+                        continue
+                    known.add(key)
+                    op = _create_operator(action, assignment, statics, init)
+                    if op is None:
+                        continue
+                    op_list.append(op)
+                    for fact in op.add_effects:
+                        if fact not in reached:
+                            reached.add(fact)
+                            new_facts.append(fact)
+        first_round = False
+        delta = defaultdict(list)
+        for fact in new_facts:
+            pred_name, args = _split_fact(fact)
+            table.add(pred_name, args)
+            delta[pred_name].append(args)
+    return list(itertools.chain(*op_lists))
+
+
 def _create_operator(action, assignment, statics, init):
     """Create an operator for "action" and "assignment".
 
@@ -26,10 +26,10 @@ class BlindHeuristic(Heuristic):
 
     def __init__(self, task):
         super().__init__()
-        self.goals = task.goals
+        self.goal_reached = task.goal_reached
 
     def __call__(self, node):
-        if all([(fact in node.state) for fact in self.goals]):
+        if self.goal_reached(node.state):
             return 0
         else:
             return 1
@@ -17,9 +17,24 @@
 
 
 class Heuristic:
+    # True if the heuristic value of a node depends on the path to it and
+    # not only on its state.
+    path_dependent = False
+    # True if evaluate_batch shares work between the nodes, so that a batch
+    # is cheaper than evaluating the nodes one by one.
+    batched = False
+
     def __call__(self, node):
         """
         This function should calculate the heuristic value based on the current
         state.
         """
         raise NotImplementedError
+
+    def evaluate_batch(self, nodes):
+        """
+        This function returns the heuristic values of a list of nodes, e.g.,
+        of all successors of an expanded node. Heuristics can override it to
+        share work between the nodes.
+        """
+        return [self(node) for node in nodes]
@@ -0,0 +1,94 @@
+#
+# This file is part of pyperplan.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+#
+
+"""
+A wrapper that caches the values of another heuristic
+"""
+
+from collections import OrderedDict
+
+from .heuristic_base import Heuristic
+
+
+class HeuristicCache(Heuristic):
+    """
+    Remembers the heuristic values of the most recently evaluated states.
+
+    The cache holds at most max_size states and evicts the least recently
+    used one when it is full. Heuristics whose value depends on the path to
+    a node (path_dependent is True) are always evaluated.
+    """
+
+    def __init__(self, heuristic, max_size=100000):
+        """
+        @param heuristic: The heuristic whose values are cached.
+        @param max_size: The maximum number of cached states.
+        """
+        self.heuristic = heuristic
+        self.max_size = max_size
+        self.path_dependent = heuristic.path_dependent
+        self.batched = heuristic.batched
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, state):
+        h = self.cache.get(state)
+        if h is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.cache.move_to_end(state)
+        return h
+
+    def _store(self, state, h):
+        self.cache[state] = h
+        if len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+
+    def __call__(self, node):
+        if self.path_dependent:
+            return self.heuristic(node)
+        h = self._lookup(node.state)
+        if h is None:
+            h = self.heuristic(node)
+            self._store(node.state, h)
+        return h
+
+    def evaluate_batch(self, nodes):
+        """The nodes that are not cached are evaluated in one batch."""
+        if self.path_dependent:
+            return self.heuristic.evaluate_batch(nodes)
+        values = [self._lookup(node.state) for node in nodes]
+        missing = [index for index, h in enumerate(values) if h is None]
+        computed = self.heuristic.evaluate_batch([nodes[index] for index in missing])
+        for index, h in zip(missing, computed):
+            values[index] = h
+            self._store(nodes[index].state, h)
+        return values
+
+    @property
+    def keep_relaxed_plans(self):
+        return self.heuristic.keep_relaxed_plans
+
+    @keep_relaxed_plans.setter
+    def keep_relaxed_plans(self, keep):
+        # Nodes whose value comes from the cache keep no relaxed plan.
+        self.heuristic.keep_relaxed_plans = keep
+
+    def calc_h_with_plan(self, node):
+        return self.heuristic.calc_h_with_plan(node)
@@ -84,7 +84,12 @@ def compute_landmark_costs(task, landmarks):
 
 
 class LandmarkHeuristic(Heuristic):
+    # The unreached landmarks are inherited from the parent node.
+    path_dependent = True
+
     def __init__(self, task):
+        self.get_facts = task.get_facts
+        task = task.get_set_task()
         self.task = task
 
         self.landmarks = get_landmarks(task)
@@ -98,10 +103,11 @@ class LandmarkHeuristic(Heuristic):
             node.unreached = self.landmarks - self.task.initial_state
         else:
             # A new node reaches the facts in its add_effects
-            node.unreached = node.parent.unreached - node.action.add_effects
+            add_effects = self.get_facts(node.action.add_effects)
+            node.unreached = node.parent.unreached - add_effects
         # We always want to keep the goal facts unreached if they are not true
         # in the current state, even if they have been reached before
-        unreached = node.unreached | (self.task.goals - node.state)
+        unreached = node.unreached | (self.task.goals - self.get_facts(node.state))
 
         h = sum(self.costs[landmark] for landmark in unreached)
         return h
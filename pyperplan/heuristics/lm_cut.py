@@ -146,8 +146,10 @@ class LmCutHeuristic(Heuristic):
         self.reachable = set()
         self.goal_plateau = set()
         self.dead_end = True
+        # Bitset tasks are relaxed via their set-based equivalent.
+        self.get_facts = task.get_facts
 
-        self._compute_relaxed_facts_and_operators(task)
+        self._compute_relaxed_facts_and_operators(task.get_set_task())
 
     def _compute_relaxed_facts_and_operators(self, task):
         """Store all facts from the task as relaxed facts into our dict."""
@@ -350,7 +352,7 @@ class LmCutHeuristic(Heuristic):
         return cut
 
     def __call__(self, node):
-        state = node.state
+        state = self.get_facts(node.state)
         heuristic_value = 0.0
         goal_state = self.relaxed_facts[self.explicit_goal]
         # reset dead end flag
@@ -15,11 +15,13 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>
 #
 
+from collections import defaultdict
 import heapq
 import logging
 
 from ..task import Operator, Task
 from .heuristic_base import Heuristic
+from .relaxation_numpy import NumpyRelaxation
 
 
 """ This module contains the relaxation heuristics hAdd, hMax, hSA and hFF. """
@@ -45,9 +47,11 @@ class RelaxedFact:
                   fact True (only for hSA).
         cheapest_achiever -- stores the cheapest operator that was applied to
                              reach this fact (only for hFF).
+        achievers -- a list that contains all operators that add this fact.
         """
         self.name = name
         self.precondition_of = []
+        self.achievers = []
         self.expanded = False
         self.sa_set = None
         self.cheapest_achiever = None
@@ -57,16 +61,18 @@ class RelaxedFact:
 class RelaxedOperator:
     """This class represents a relaxed operator (no delete effects)."""
 
-    def __init__(self, name, preconditions, add_effects):
+    def __init__(self, name, preconditions, add_effects, index=None):
         """Construct a new relaxed operator.
 
         Keyword arguments:
         name -- the name of the relaxed operator.
         preconditions -- the preconditions of this operator
         add_effects -- the add effects of this operator
+        index -- the index of the operator in the operators of the task
 
         Member variables:
         name -- the name of the relaxed operator.
+        index -- the index of the operator in the operators of the task
         preconditions -- the preconditions of this operator
         counter -- alternative method to check whether all preconditions are
                    True
@@ -74,6 +80,7 @@ class RelaxedOperator:
         cost -- the cost for applying this operator
         """
         self.name = name
+        self.index = index
         self.preconditions = preconditions
         self.add_effects = add_effects
         self.cost = 1
@@ -87,11 +94,17 @@ class _RelaxationHeuristic(Heuristic):
     implementation of the hAdd heuristic.
     """
 
-    def __init__(self, task):
+    def __init__(self, task, incremental=False, backend="python"):
         """Construct a instance of _RelaxationHeuristic.
 
         Keyword arguments:
         task -- an instance of the Task class.
+        incremental -- if True, the distances of the previously evaluated
+                       state are repaired instead of recomputed from scratch
+                       (see repair_distance).
+        backend -- "python" to compute the distances with a Dijkstra search
+                   over the relaxed facts below, or "numpy" to compute them
+                   with a relaxation_numpy.NumpyRelaxation.
 
         Member variables:
         facts -- a dict that maps from fact names to fact objects
@@ -101,26 +114,56 @@ class _RelaxationHeuristic(Heuristic):
         tie_breaker -- a tie breaker needed for qeueing
         eval -- a function that is used to evaluate the cost of applying an
                 operator
+        get_facts -- a function that returns the fact names of a state
+        incremental -- whether the distances are repaired incrementally
+        last_state -- the state whose distances are currently stored, or None
+                      if they cannot be reused
+        max_repair_ratio -- the work limit of a repair (see repair_distance)
+        repairs -- the number of attempted repairs
+        repair_failures -- the number of aborted repairs
+        engine -- the NumpyRelaxation for the numpy backend, else None
+        batched -- whether evaluate_batch relaxes the states together, which
+                   only the numpy backend does
         """
+        if backend not in ("python", "numpy"):
+            raise ValueError("Unknown backend %r" % backend)
+        if incremental and backend != "python":
+            raise ValueError("Incremental evaluation needs the python backend")
+
+        # Bitset tasks are relaxed via their set-based equivalent.
+        self.get_facts = task.get_facts
+        task = task.get_set_task()
+        self.engine = None
+        if backend == "numpy":
+            self.engine = NumpyRelaxation(task)
+        self.batched = self.engine is not None
+
         self.facts = dict()
         self.operators = []
         self.goals = task.goals
         self.init = task.initial_state
         self.tie_breaker = 0
         self.start_state = RelaxedFact("start")
+        self.incremental = incremental
+        self.last_state = None
+        self.max_repair_ratio = 0.25
+        self.repairs = 0
+        self.repair_failures = 0
 
         # Create relaxed facts for all facts in the task description.
         for fact in task.facts:
             self.facts[fact] = RelaxedFact(fact)
 
-        for op in task.operators:
+        for index, op in enumerate(task.operators):
             # Relax operators and add them to operator list.
-            ro = RelaxedOperator(op.name, op.preconditions, op.add_effects)
+            ro = RelaxedOperator(op.name, op.preconditions, op.add_effects, index)
             self.operators.append(ro)
 
             # Initialize precondition_of-list for each fact
             for var in op.preconditions:
                 self.facts[var].precondition_of.append(ro)
+            for var in op.add_effects:
+                self.facts[var].achievers.append(ro)
 
             # Handle operators that have no preconditions.
             if not op.preconditions:
@@ -135,8 +178,20 @@ class _RelaxationHeuristic(Heuristic):
         Keyword arguments:
         node -- the current state
         """
-        state = node.state
-        state = set(state)
+        state = set(self.get_facts(node.state))
+
+        if self.engine is not None:
+            return self.calc_engine_h([state])[0]
+
+        if self.incremental and self.last_state is not None:
+            # Repair the distances of the previously evaluated state, which is
+            # the parent or a sibling of this node in most searches. Stop
+            # trying when most repairs are aborted.
+            if self.repair_failures <= self.repairs // 2 + 8:
+                self.repairs += 1
+                if self.repair_distance(state):
+                    return self.calc_goal_h()
+                self.repair_failures += 1
 
         # Reset distance and set to default values.
         self.init_distance(state)
@@ -158,12 +213,27 @@ class _RelaxationHeuristic(Heuristic):
 
         # Call the Dijkstra search that performs the forward pass.
         self.dijkstra(heap)
+        if self.incremental:
+            self.last_state = state
 
         # Extract the goal heuristic.
         h_value = self.calc_goal_h()
 
         return h_value
 
+    def evaluate_batch(self, nodes):
+        """The numpy backend relaxes all states of the batch together."""
+        if self.engine is None:
+            return super().evaluate_batch(nodes)
+        return self.calc_engine_h([set(self.get_facts(node.state)) for node in nodes])
+
+    def calc_engine_h(self, states):
+        """This function computes the heuristic values of the states with
+        self.engine."""
+        use_max = self.eval is max
+        self.engine.compute_distances(states, use_max)
+        return self.engine.goal_values(use_max)
+
     def init_distance(self, state):
         """
         This function resets all member variables that store information that
@@ -191,6 +261,141 @@ class _RelaxationHeuristic(Heuristic):
         for operator in self.operators:
             operator.counter = len(operator.preconditions)
 
+    def repair_distance(self, state):
+        """
+        This function turns the distances of self.last_state into the
+        distances of "state".
+
+        The distances of all facts that depend on a deleted fact through their
+        cheapest achievers, and that have no other achiever of the same cost,
+        are invalidated. Together with the added facts they seed a Dijkstra
+        search that only visits the part of the relaxed exploration that
+        changed. As in dijkstra, an operator is only evaluated once none of
+        its preconditions is pending in the queue.
+
+        If the repair evaluates more than max_repair_ratio times as many
+        operators as the task has, it is aborted and False is returned. The
+        distances are then left in an undefined state and need a new forward
+        pass.
+        """
+        deleted = self.last_state - state
+        added = state - self.last_state
+        budget = self.max_repair_ratio * len(self.operators)
+        evaluations = 0
+
+        # Collect all facts whose distance depends on a deleted fact. They are
+        # visited by increasing old distance, so the preconditions of their
+        # achievers have been checked before.
+        invalid = set()
+        queue = []
+        for name in deleted:
+            fact = self.facts[name]
+            invalid.add(fact)
+            queue.append((0, self.tie_breaker, fact))
+            self.tie_breaker += 1
+        while queue:
+            (_dist, _tie, fact) = heapq.heappop(queue)
+            if fact.name not in deleted:
+                if fact in invalid:
+                    continue
+                evaluations += len(fact.achievers)
+                if evaluations > budget:
+                    return False
+                if self.keep_distance(fact, invalid):
+                    continue
+                invalid.add(fact)
+            for operator in fact.precondition_of:
+                for name in operator.add_effects:
+                    neighbor = self.facts[name]
+                    if neighbor.cheapest_achiever is operator:
+                        heapq.heappush(
+                            queue, (neighbor.distance, self.tie_breaker, neighbor)
+                        )
+                        self.tie_breaker += 1
+
+        # Facts whose distance is not final yet and, for each operator, the
+        # number of its preconditions among them.
+        pending = set()
+        waiting = defaultdict(int)
+
+        def push(fact):
+            if fact not in pending:
+                pending.add(fact)
+                for operator in fact.precondition_of:
+                    waiting[operator] += 1
+            heapq.heappush(heap, (fact.distance, self.tie_breaker, fact))
+            self.tie_breaker += 1
+
+        heap = []
+        for fact in invalid:
+            fact.distance = float("inf")
+            fact.sa_set = None
+            fact.cheapest_achiever = None
+            pending.add(fact)
+            for operator in fact.precondition_of:
+                waiting[operator] += 1
+        # Recompute the invalidated distances from the remaining facts.
+        for fact in invalid:
+            for operator in fact.achievers:
+                if waiting[operator]:
+                    continue
+                evaluations += 1
+                (unioned_sets, tmp_dist) = self.get_cost(operator, fact)
+                if tmp_dist < fact.distance:
+                    fact.distance = tmp_dist
+                    fact.sa_set = unioned_sets
+                    fact.cheapest_achiever = operator
+            if fact.distance < float("inf"):
+                push(fact)
+        for name in added:
+            fact = self.facts[name]
+            fact.distance = 0
+            fact.sa_set = set()
+            fact.cheapest_achiever = None
+            push(fact)
+
+        while heap:
+            (dist, _tie, fact) = heapq.heappop(heap)
+            if dist > fact.distance or fact not in pending:
+                # The fact was pushed again with a smaller distance.
+                continue
+            if evaluations > budget:
+                return False
+            pending.remove(fact)
+            for operator in fact.precondition_of:
+                waiting[operator] -= 1
+                if waiting[operator]:
+                    continue
+                evaluations += 1
+                (unioned_sets, tmp_dist) = self.get_cost(operator, fact)
+                for n in operator.add_effects:
+                    neighbor = self.facts[n]
+                    if tmp_dist < neighbor.distance:
+                        neighbor.distance = tmp_dist
+                        neighbor.sa_set = unioned_sets
+                        neighbor.cheapest_achiever = operator
+                        push(neighbor)
+        self.last_state = state
+        return True
+
+    def keep_distance(self, fact, invalid):
+        """
+        Check whether "fact" has an achiever that does not depend on the
+        invalid facts and has the cost of its current distance. If so, it
+        becomes the new cheapest achiever.
+        """
+        for operator in fact.achievers:
+            if operator is fact.cheapest_achiever or any(
+                self.facts[pre] in invalid for pre in operator.preconditions
+            ):
+                continue
+            (unioned_sets, tmp_dist) = self.get_cost(operator, fact)
+            if tmp_dist == fact.distance:
+                fact.sa_set = unioned_sets
+                fact.cheapest_achiever = operator
+                return True
+        return False
+
     def get_cost(self, operator, pre):
         """This function calculated the cost of applying an operator.
 
@@ -228,7 +433,12 @@ class _RelaxationHeuristic(Heuristic):
         """
         This function is used as a stopping criterion for the Dijkstra search,
         which differs for different heuristics.
+
+        In incremental mode the search explores all reachable facts, because
+        their distances are reused for later states.
         """
+        if self.incremental:
+            return not queue
         return achieved_goals == self.goals or not queue
 
     def dijkstra(self, queue):
@@ -281,12 +491,12 @@ class hAddHeuristic(_RelaxationHeuristic):
     It derives from the _RelaxationHeuristic class.
     """
 
-    def __init__(self, task):
+    def __init__(self, task, incremental=False, backend="python"):
         """
         To make this class an implementation of hADD, apart from deriving from
         _RelaxationHeuristic,  we only need to set eval to sum().
         """
-        super().__init__(task)
+        super().__init__(task, incremental, backend)
         self.eval = sum
 
 
@@ -296,12 +506,12 @@ class hMaxHeuristic(_RelaxationHeuristic):
     It derives from the _RelaxationHeuristic class.
     """
 
-    def __init__(self, task):
+    def __init__(self, task, incremental=False, backend="python"):
         """
         To make this class an implementation of hADD, apart from deriving from
         _RelaxationHeuristic, we only need to set eval to max().
         """
-        super().__init__(task)
+        super().__init__(task, incremental, backend)
         self.eval = max
 
 
@@ -311,6 +521,13 @@ class hSAHeuristic(_RelaxationHeuristic):
     It derives from the _RelaxationHeuristic class.
     """
 
+    def __init__(self, task):
+        """
+        The sa-sets cannot be repaired incrementally, so hSA always evaluates
+        states from scratch.
+        """
+        super().__init__(task)
+
     def get_cost(self, operator, pre):
         """
         This function has to be overwritten, because the hSA heuristic not
@@ -377,20 +594,78 @@ class hFFHeuristic(_RelaxationHeuristic):
     It derives from the _RelaxationHeuristic class.
     """
 
-    def __init__(self, task):
+    def __init__(self, task, incremental=False, backend="python"):
         """Construct a hFFHeuristic.
 
         FF uses same forward pass as hAdd.
+
+        Member variables:
+        keep_relaxed_plans -- if True, every evaluated node keeps the
+                              operator indices of its relaxed plan in
+                              node.relaxed_plan, so calc_h_with_plan can
+                              return it without another forward pass.
+                              Searches with preferred operators switch it on
+                              while they run.
+        relaxed_plans -- the operator indices of the relaxed plans (or None
+                         for dead ends) of the last evaluated states, only
+                         set if keep_relaxed_plans is True
         """
-        super().__init__(task)
+        super().__init__(task, incremental, backend)
         self.eval = sum
+        self.keep_relaxed_plans = False
+        self.relaxed_plans = []
+
+    def __call__(self, node):
+        h_value = super().__call__(node)
+        if self.keep_relaxed_plans:
+            node.relaxed_plan = self.relaxed_plans[0]
+        return h_value
+
+    def evaluate_batch(self, nodes):
+        """The python backend keeps the relaxed plans in __call__."""
+        values = super().evaluate_batch(nodes)
+        if self.engine is not None and self.keep_relaxed_plans:
+            for node, relaxed_plan in zip(nodes, self.relaxed_plans):
+                node.relaxed_plan = relaxed_plan
+        return values
+
+    def calc_engine_h(self, states):
+        """The numpy backend only computes the hAdd distances for hFF."""
+        self.engine.compute_distances(states)
+        if not self.keep_relaxed_plans:
+            return self.engine.ff_values()
+        values = self.engine.ff_values(return_relaxed_plan=True)
+        self.relaxed_plans = [
+            None if relaxed_plan is None else tuple(relaxed_plan)
+            for _, relaxed_plan in values
+        ]
+        return [h_value for h_value, _ in values]
 
     def calc_h_with_plan(self, node):
         """
         Helper method to calculate hFF value together with a relaxed plan.
+
+        If the node kept its relaxed plan from an earlier evaluation (see
+        keep_relaxed_plans), that plan is returned without a forward pass.
         """
-        state = node.state
-        state = set(state)
+        try:
+            relaxed_plan = node.relaxed_plan
+        except AttributeError:
+            # The node was not evaluated with keep_relaxed_plans.
+            pass
+        else:
+            if relaxed_plan is None:
+                return float("inf"), None
+            return len(relaxed_plan), self.get_operator_names(relaxed_plan)
+        state = set(self.get_facts(node.state))
+        if self.engine is not None:
+            self.engine.compute_distances([state])
+            h_value, relaxed_plan = self.engine.ff_values(return_relaxed_plan=True)[0]
+            if relaxed_plan is None:
+                return h_value, None
+            return h_value, self.get_operator_names(relaxed_plan)
+        # This forward pass does not leave the distances of "state" behind.
+        self.last_state = None
         # Reset distance and set to default values.
         self.init_distance(state)
         # reset dead end status
@@ -414,6 +689,11 @@ class hFFHeuristic(_RelaxationHeuristic):
         else:
             return h_value
 
+    def get_operator_names(self, relaxed_plan):
+        """Returns the set of operator names of a relaxed plan given by
+        operator indices."""
+        return {self.operators[index].name for index in relaxed_plan}
+
     def calc_goal_h(self, return_relaxed_plan=False):
         """
         This function has to be overwritten, because the hFF heuristic needs an
@@ -438,7 +718,7 @@ class hFFHeuristic(_RelaxationHeuristic):
                 # is not already expanded
                 if (
                     fact.cheapest_achiever is not None
-                    and not fact.cheapest_achiever in relaxed_plan
+                    and not fact.cheapest_achiever.index in relaxed_plan
                 ):
                     # Add all preconditions of the cheapest achiever to the
                     # queue.
@@ -446,15 +726,19 @@ class hFFHeuristic(_RelaxationHeuristic):
                         if pre not in closed_list:
                             q.append(self.facts[pre])
                             closed_list.add(pre)
-                    relaxed_plan.add(fact.cheapest_achiever.name)
+                    relaxed_plan.add(fact.cheapest_achiever.index)
 
+            if self.keep_relaxed_plans:
+                self.relaxed_plans = [tuple(relaxed_plan)]
             # Extract FF value.
             if return_relaxed_plan:
-                return len(relaxed_plan), relaxed_plan
+                return len(relaxed_plan), self.get_operator_names(relaxed_plan)
             else:
                 return len(relaxed_plan)
 
         else:
+            if self.keep_relaxed_plans:
+                self.relaxed_plans = [None]
             if return_relaxed_plan:
                 return float("inf"), None
             else:
@@ -0,0 +1,185 @@
+#
+# This file is part of pyperplan.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+#
+
+""" This module contains a NumPy engine for the relaxation heuristics. """
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class NumpyRelaxation:
+    """This class computes the hAdd and hMax distances of the relaxed task.
+
+    Instead of a Dijkstra search over fact objects, the distances are
+    computed by generalized Bellman-Ford iterations. Each iteration evaluates
+    all operators at once from a padded precondition matrix and takes the
+    minimum over the achievers of each fact from the add effects sorted by
+    fact.
+    """
+
+    def __init__(self, task):
+        """Construct the incidence arrays of the relaxed task.
+
+        Keyword arguments:
+        task -- an instance of the Task class.
+
+        Member variables:
+        fact_index -- a dict that maps from fact names to fact indices
+        operator_names -- the names of the operators by index
+        preconditions -- a list with the precondition indices of each operator
+        pre_matrix -- an array with one row of precondition indices per
+                      operator. Rows are padded with the index of an extra
+                      fact whose distance is always 0.
+        eff_ops, eff_facts -- the operator and fact of each add effect,
+                              sorted by fact
+        achieved -- the facts that have at least one achiever
+        starts -- the index in eff_ops at which the achievers of each fact in
+                  achieved start
+        goals -- an array with the indices of the goal facts
+        distance -- the distances computed by the last call of
+                    compute_distances with one row per state. The last
+                    column belongs to the extra fact.
+        op_cost -- the costs of the operators computed by the last call of
+                   compute_distances with one row per state
+        """
+        if np is None:
+            raise ImportError("The numpy backend requires numpy to be installed.")
+        facts = sorted(task.facts)
+        self.fact_index = {fact: index for index, fact in enumerate(facts)}
+        num_facts = len(facts)
+        self.operator_names = [op.name for op in task.operators]
+        self.preconditions = [
+            [self.fact_index[fact] for fact in op.preconditions]
+            for op in task.operators
+        ]
+
+        width = max([len(pre) for pre in self.preconditions] + [1])
+        self.pre_matrix = np.full(
+            (len(task.operators), width), num_facts, dtype=np.intp
+        )
+        for op_index, pre in enumerate(self.preconditions):
+            self.pre_matrix[op_index, : len(pre)] = pre
+
+        effects = sorted(
+            (self.fact_index[fact], op_index)
+            for op_index, op in enumerate(task.operators)
+            for fact in op.add_effects
+        )
+        self.eff_facts = np.array([fact for fact, _ in effects], dtype=np.intp)
+        self.eff_ops = np.array([op for _, op in effects], dtype=np.intp)
+        self.achieved, self.starts = np.unique(self.eff_facts, return_index=True)
+
+        self.goals = np.array(
+            [self.fact_index[fact] for fact in task.goals], dtype=np.intp
+        )
+        self.num_facts = num_facts
+        self.distance = np.zeros((0, num_facts + 1))
+        self.op_cost = np.zeros((0, len(task.operators)))
+
+    def compute_distances(self, states, use_max=False):
+        """Compute the distances of all facts for a batch of states.
+
+        The rows of self.distance and self.op_cost belong to the states in
+        the given order. All states are relaxed together, so a batch costs
+        little more than a single state.
+
+        Keyword arguments:
+        states -- a list of states, each given by the fact names that are
+                  True in it
+        use_max -- if True, compute hMax distances, else hAdd distances.
+        """
+        distance = np.full((len(states), self.num_facts + 1), np.inf)
+        distance[:, -1] = 0
+        for row, state in enumerate(states):
+            distance[row, [self.fact_index[fact] for fact in state]] = 0
+        self.distance = distance
+        self.op_cost = np.zeros((len(states), len(self.operator_names)))
+        if not len(self.achieved):
+            return
+        reduce = np.max if use_max else np.sum
+        old = distance[:, self.achieved]
+        while True:
+            # Every operator costs 1 on top of its preconditions.
+            self.op_cost = reduce(distance[:, self.pre_matrix], axis=2) + 1
+            best = np.minimum.reduceat(
+                self.op_cost[:, self.eff_ops], self.starts, axis=1
+            )
+            new = np.minimum(old, best)
+            if np.array_equal(new, old):
+                break
+            distance[:, self.achieved] = new
+            old = new
+
+    def goal_values(self, use_max=False):
+        """Return the hAdd or hMax values of the goal for the last states."""
+        if not len(self.goals):
+            return [0] * len(self.distance)
+        goal_distances = self.distance[:, self.goals]
+        if use_max:
+            return goal_distances.max(axis=1).tolist()
+        return goal_distances.sum(axis=1).tolist()
+
+    def relaxed_plan(self, row):
+        """Return the operator indices of a relaxed plan for the state in the
+        given row.
+
+        For each fact the first operator whose cost equals the fact's
+        distance is used as its cheapest achiever. The distances have to be
+        hAdd distances that are finite for all goals.
+        """
+        distance = self.distance[row]
+        is_best = self.op_cost[row, self.eff_ops] == distance[self.eff_facts]
+        best = np.flatnonzero(is_best)
+        facts, first = np.unique(self.eff_facts[best], return_index=True)
+        achiever = dict(zip(facts.tolist(), self.eff_ops[best[first]].tolist()))
+
+        relaxed_plan = set()
+        queue = self.goals.tolist()
+        closed_list = set(queue)
+        while queue:
+            fact = queue.pop()
+            if distance[fact] == 0:
+                continue
+            op_index = achiever[fact]
+            if op_index in relaxed_plan:
+                continue
+            relaxed_plan.add(op_index)
+            for pre in self.preconditions[op_index]:
+                if pre not in closed_list:
+                    queue.append(pre)
+                    closed_list.add(pre)
+        return relaxed_plan
+
+    def ff_values(self, return_relaxed_plan=False):
+        """Return the hFF values (and the operator indices of the relaxed
+        plans) for the last states.
+
+        The distances have to be hAdd distances.
+        """
+        values = []
+        for row, h_add in enumerate(self.goal_values()):
+            if h_add == float("inf"):
+                values.append((float("inf"), None) if return_relaxed_plan else h_add)
+                continue
+            relaxed_plan = self.relaxed_plan(row)
+            if return_relaxed_plan:
+                values.append((len(relaxed_plan), relaxed_plan))
+            else:
+                values.append(len(relaxed_plan))
+        return values
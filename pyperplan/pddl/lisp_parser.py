@@ -17,32 +17,108 @@
 
 """Basic functions for parsing simple Lisp files."""
 
+import re
 
 from .errors import ParseError
 from .lisp_iterators import LispIterator
 
 
+_COMMENT = re.compile(r";[^\n]*")
+
+
 def parse_lisp_iterator(input):
     return LispIterator(parse_nested_list(input))
 
 
 def parse_nested_list(input_file):
-    tokens = _tokenize(input_file)
+    tokens = parse_lisp_stream(input_file)
+    result = parse_list(tokens)
+    check_exhausted(tokens)
+    return result
+
+
+def parse_lisp_stream(input_file, check_balance=False):
+    """
+    Returns an iterator over the tokens of the input that starts behind the
+    opening parenthesis of the outermost list. The caller reads the rest of
+    the list and then calls check_exhausted.
+
+    With check_balance, the parentheses are checked first, so that
+    unbalanced input raises the same ParseError as parse_nested_list.
+    """
+    token_list = _tokenize(input_file)
+    tokens = iter(token_list)
     next_token = next(tokens)
     if next_token != "(":
         raise ParseError("Expected '(', got %s." % next_token)
-    result = list(_parse_list_aux(tokens))
+    if check_balance:
+        _check_balance(token_list)
+    return tokens
+
+
+def _check_balance(tokens):
+    """
+    Raises a ParseError if the list that starts with the first token is not
+    closed or followed by more tokens.
+    """
+    depth = 0
+    for index, token in enumerate(tokens):
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth -= 1
+            if depth == 0:
+                if index + 1 < len(tokens):
+                    raise ParseError("Unexpected token: %s." % tokens[index + 1])
+                return
+    raise ParseError("missing closing parenthesis")
+
+
+def check_exhausted(tokens):
+    """Raises a ParseError if there are tokens after the outermost list."""
     for tok in tokens:  # Check that generator is exhausted.
         raise ParseError("Unexpected token: %s." % tok)
-    return result
+
+
+def next_token(tokens):
+    """Returns the next token of a list that has not been closed yet."""
+    for token in tokens:
+        return token
+    raise ParseError("missing closing parenthesis")
+
+
+def parse_list(tokens):
+    """
+    Returns the nested list of the elements of a list whose "(" has
+    already been read from tokens. The closing ")" is consumed.
+    """
+    return list(_parse_list_aux(tokens))
+
+
+def parse_element(tokens, token):
+    """
+    Returns the word or the nested list that starts with token, which has
+    already been read from tokens.
+    """
+    if token == "(":
+        return parse_list(tokens)
+    return token
 
 
 def _tokenize(input_file):
-    for line in input_file:
-        line = line.partition(";")[0]  # Strip comments.
-        line = line.replace("(", " ( ").replace(")", " ) ").replace("?", " ?")
-        for token in line.split():
-            yield token.lower()
+    """
+    Returns the list of the tokens of the input, which is a file object or
+    an iterable of lines. The whole input is scanned at once instead of
+    line by line.
+    """
+    if hasattr(input_file, "read"):
+        text = input_file.read()
+    else:
+        text = "\n".join(input_file)
+    if ";" in text:
+        text = _COMMENT.sub("", text)  # Strip comments.
+    text = text.lower().replace("(", " ( ").replace(")", " ) ").replace("?", " ?")
+    return text.split()
 
 
 def _parse_list_aux(tokenstream):
@@ -17,7 +17,15 @@
 #
 
 from .errors import *
-from .lisp_parser import parse_lisp_iterator
+from .lisp_iterators import LispIterator
+from .lisp_parser import (
+    check_exhausted,
+    next_token,
+    parse_element,
+    parse_lisp_iterator,
+    parse_lisp_stream,
+    parse_list,
+)
 from .parser_common import *
 from .tree_visitor import TraversePDDLDomain, TraversePDDLProblem, Visitable
 
@@ -384,12 +392,7 @@ def _parse_type_helper(iter, type_class):
             # check if either definition present
             if iter.peek().is_structure():
                 # must contain either definition
-                types_iter = next(iter)
-                if not types_iter.try_match("either"):
-                    raise ValueError(
-                        "Error multiple parent definition must " 'start with "either"'
-                    )
-                tlist = parse_list_template(_parse_string_helper, types_iter)
+                tlist = _parse_either_helper(next(iter))
                 while len(tmpList) != 0:
                     result.append(type_class(tmpList.pop(), tlist))
             else:
@@ -414,6 +417,13 @@ def _parse_type_helper(iter, type_class):
     return result
 
 
+def _parse_either_helper(iter):
+    """Parses the list of types of an "either" definition."""
+    if not iter.try_match("either"):
+        raise ValueError('Error multiple parent definition must start with "either"')
+    return parse_list_template(_parse_string_helper, iter)
+
+
 ###
 ### parser functions
 ###
@@ -767,6 +777,143 @@ def parse_goal_stmt(iter):
     return GoalStmt(f)
 
 
+def _next_statement(tokens):
+    """
+    Reads the start of the next element of a list from tokens.
+
+    Returns a tuple of the first token of the element and, if the element is
+    a structure, its first token (otherwise None).
+    """
+    token = next_token(tokens)
+    if token != "(":
+        return token, None
+    return token, next_token(tokens)
+
+
+def _parse_statement_rest(tokens, token, tag):
+    """
+    Returns a LispIterator for an element of which _next_statement has
+    already read the tokens token and tag.
+    """
+    if tag is None:
+        if token == ")":
+            raise ParseError("already at end")
+        return LispIterator(token)
+    if tag == ")":
+        return LispIterator([])
+    return LispIterator([parse_element(tokens, tag)] + parse_list(tokens))
+
+
+def _stream_objects(tokens):
+    """
+    Parses the objects of an objects statement from tokens like
+    parse_objects_stmt, but without building a nested list first. The
+    ":objects" keyword has already been read.
+
+    Returns a list of Object instances.
+    """
+    result = []
+    names = []
+    while True:
+        token = next_token(tokens)
+        if token == ")":
+            break
+        if token == "(" or token[0] in reserved:
+            # Let the general parser raise its error.
+            _parse_type_helper(LispIterator([parse_element(tokens, token)]), Object)
+        if token == "-":
+            token = next_token(tokens)
+            if token == "(":
+                type_name = _parse_either_helper(LispIterator(parse_list(tokens)))
+            elif token == ")":
+                _parse_type_helper(LispIterator(["-"]), Object)
+            else:
+                type_name = token
+            result.extend(Object(name, type_name) for name in names)
+            names = []
+        else:
+            names.append(token)
+    result.extend(Object(name, None) for name in names)
+    return result
+
+
+def _stream_init(tokens):
+    """
+    Parses the initial state of an init statement from tokens like
+    parse_init_stmt, but without building a nested list first. The ":init"
+    keyword has already been read.
+
+    Returns an InitStmt instance.
+    """
+    predicates = []
+    while True:
+        token = next_token(tokens)
+        if token == ")":
+            return InitStmt(predicates)
+        if token == "(":
+            words = []
+            token = next_token(tokens)
+            while token != "(" and token != ")":
+                words.append(token)
+                token = next_token(tokens)
+            if token == ")" and words:
+                predicates.append(PredicateInstance(words[0], words[1:]))
+                continue
+            element = words
+            if token == "(":
+                element += [parse_list(tokens)] + parse_list(tokens)
+        else:
+            element = token
+        # Let the general parser handle (or reject) all other elements.
+        predicates.append(parse_predicate_instance(LispIterator(element)))
+
+
+def parse_problem_stream(tokens):
+    """Parses a problem definition directly from the tokens of a problem.
+
+    The result is the same as that of parse_problem_def, but the objects and
+    the initial state, which make up most of a large problem, are read token
+    by token without building nested lists and iterators for them.
+
+    Keyword arguments:
+    tokens -- the tokens behind the opening parenthesis of the problem, e.g.
+              from lisp_parser.parse_lisp_stream
+
+    Returns a ProblemDef instance
+    """
+    token, tag = _next_statement(tokens)
+    if token != "define":
+        raise ValueError(
+            "Invalid problem definition! --> problem definition "
+            'must start with "define"'
+        )
+    # parse problem name and corresponding domain name
+    probname = parse_problem_name(
+        _parse_statement_rest(tokens, *_next_statement(tokens))
+    )
+    dom = parse_problem_domain_stmt(
+        _parse_statement_rest(tokens, *_next_statement(tokens))
+    )
+    # parse all object definitions
+    objects = dict()
+    token, tag = _next_statement(tokens)
+    if tag == ":objects":
+        objects = _stream_objects(tokens)
+        token, tag = _next_statement(tokens)
+    if tag == ":init":
+        init = _stream_init(tokens)
+    else:
+        init = parse_init_stmt(_parse_statement_rest(tokens, token, tag))
+    goal = parse_goal_stmt(_parse_statement_rest(tokens, *_next_statement(tokens)))
+    # assert end is reached
+    token = next_token(tokens)
+    if token != ")":
+        LispIterator([parse_element(tokens, token)] + parse_list(tokens)).match_end()
+    check_exhausted(tokens)
+    # create new ProblemDef instance
+    return ProblemDef(probname, dom.name, objects, init, goal)
+
+
 class Parser:
     """
     This is the main Parser class that can be used from outside this module
@@ -817,7 +964,7 @@ class Parser:
         # finally return the pddl.Domain
         return visitor.domain
 
-    def parse_problem(self, dom, read_from_file=True):
+    def parse_problem(self, dom, read_from_file=True, stream=True):
         """
         Method that parses a problem, this method will be called from outside
         the parser.
@@ -825,14 +972,33 @@ class Parser:
         Keyword arguments:
         read_from_file -- defines whether the input should be read from a file
                           or directly from the input string
+        stream -- parse the objects and the initial state directly from the
+                  tokens (see parse_problem_stream). Malformed problems
+                  raise the same errors as without stream.
         """
-        if read_from_file:
-            with open(self.probFile, encoding="utf-8") as file:
-                self.probInput = self._read_input(file)
+        if stream:
+            if read_from_file:
+                with open(self.probFile, encoding="utf-8") as file:
+                    input = [file.read()]
+            else:
+                input = self.probInput.split("\n")
+            try:
+                probAST = parse_problem_stream(
+                    parse_lisp_stream(input, check_balance=True)
+                )
+            except ParseError:
+                # The streaming parser reports some malformed sections at a
+                # different position. Parse these problems again with the
+                # general parser, so that they fail with its errors.
+                probAST = parse_problem_def(self._read_input(input))
         else:
-            input = self.probInput.split("\n")
-            self.probInput = self._read_input(input)
-        probAST = parse_problem_def(self.probInput)
+            if read_from_file:
+                with open(self.probFile, encoding="utf-8") as file:
+                    self.probInput = self._read_input(file)
+            else:
+                input = self.probInput.split("\n")
+                self.probInput = self._read_input(input)
+            probAST = parse_problem_def(self.probInput)
         # initialize the translation visitor
         visitor = TraversePDDLProblem(dom)
         # and traverse the AST
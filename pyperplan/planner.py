@@ -17,13 +17,19 @@
 
 import importlib
 import logging
+import multiprocessing
 import os
+import queue
+import random
 import re
 import subprocess
 import sys
 import time
 
-from . import grounding, heuristics, search, tools
+from . import grounding, search, task_cache, tools
+from .domain_cache import DomainCache
+from .heuristics.heuristic_cache import HeuristicCache
+from .heuristics.relaxation import hFFHeuristic
 from .pddl.parser import Parser
 
 
@@ -31,6 +37,8 @@ SEARCHES = {
     "astar": search.astar_search,
     "wastar": search.weighted_astar_search,
     "gbf": search.greedy_best_first_search,
+    "lazy-wastar": search.lazy_weighted_astar_search,
+    "lazy-gbf": search.lazy_greedy_best_first_search,
     "bfs": search.breadth_first_search,
     "ehs": search.enforced_hillclimbing_search,
     "ids": search.iterative_deepening_search,
@@ -42,6 +50,13 @@ SEARCHES = {
 
 NUMBER = re.compile(r"\d+")
 
+# The configurations (search, heuristic) that a portfolio runs by default.
+PORTFOLIO = ["gbf:hff", "ehs:hff", "ehrws:hff", "astar:lmcut"]
+
+# The parsed domains of this process. Problems that share a domain file (or
+# its content) only parse it once.
+DOMAIN_CACHE = DomainCache()
+
 
 def get_heuristics():
     """
@@ -109,11 +124,11 @@ def find_domain(problem):
     return domain
 
 
-def _parse(domain_file, problem_file):
+def _parse(domain_file, problem_file, domain_cache_dir=None):
     # Parsing
     parser = Parser(domain_file, problem_file)
     logging.info(f"Parsing Domain {domain_file}")
-    domain = parser.parse_domain()
+    domain = DOMAIN_CACHE.load(domain_file, domain_cache_dir)
     logging.info(f"Parsing Problem {problem_file}")
     problem = parser.parse_problem(domain)
     logging.debug(domain)
@@ -125,11 +140,21 @@ def _parse(domain_file, problem_file):
 
 
 def _ground(
-    problem, remove_statics_from_initial_state=True, remove_irrelevant_operators=True
+    problem,
+    remove_statics_from_initial_state=True,
+    remove_irrelevant_operators=True,
+    use_bitsets=False,
+    join_grounding=False,
+    grounding_workers=1,
 ):
     logging.info(f"Grounding start: {problem.name}")
     task = grounding.ground(
-        problem, remove_statics_from_initial_state, remove_irrelevant_operators
+        problem,
+        remove_statics_from_initial_state,
+        remove_irrelevant_operators,
+        use_bitsets=use_bitsets,
+        join_grounding=join_grounding,
+        num_workers=grounding_workers,
     )
     logging.info(f"Grounding end: {problem.name}")
     logging.info("{} Variables created".format(len(task.facts)))
@@ -157,8 +182,86 @@ def write_solution(solution, filename):
             print(op.name, file=file)
 
 
+def load_task(
+    domain_file,
+    problem_file,
+    use_bitsets=False,
+    cache_dir=None,
+    join_grounding=False,
+    grounding_workers=1,
+    domain_cache_dir=None,
+):
+    """
+    Parses and grounds the given input files.
+
+    @param domain_file   The path to a domain file
+    @param problem_file  The path to a problem file in the domain given by
+                         domain_file
+    @param use_bitsets   Represent states as int bitmasks during the search
+    @param cache_dir     If given, a directory in which grounded tasks are
+                         cached (see task_cache). A cached task is loaded
+                         without parsing and grounding.
+    @param join_grounding  Only ground the operators that are reachable in
+                           the delete relaxation (see grounding.ground)
+    @param grounding_workers  The number of processes that ground the
+                              actions. The result does not depend on it.
+    @param domain_cache_dir  If given, a directory in which parsed domains
+                             are stored (see DomainCache.load). Within a
+                             process, domains are always cached.
+    @return The grounded task
+    """
+
+    def ground_task():
+        problem = _parse(domain_file, problem_file, domain_cache_dir)
+        return _ground(
+            problem,
+            use_bitsets=use_bitsets,
+            join_grounding=join_grounding,
+            grounding_workers=grounding_workers,
+        )
+
+    if cache_dir is None:
+        return ground_task()
+    options = {
+        "remove_statics_from_initial_state": True,
+        "remove_irrelevant_operators": True,
+        "use_bitsets": use_bitsets,
+        "join_grounding": join_grounding,
+        "remove_unreachable_operators": True,
+    }
+    return task_cache.load_task(
+        cache_dir, domain_file, problem_file, options, ground_task
+    )
+
+
+def search_runs(task, search, heuristic, seeds, use_preferred_ops=False):
+    """
+    Searches the same grounded task once per seed. All runs share the task
+    and the heuristic, so repeated runs of a randomized search only pay for
+    parsing, grounding and building the heuristic once.
+
+    @param task               A grounded task, e.g. from load_task
+    @param search             A callable that performs a search on the
+                              task's search space
+    @param heuristic          An instance of a heuristic for the task or None
+    @param seeds              The seeds of the random module, one per run
+    @param use_preferred_ops  Pass preferred operators to the search
+    @return A generator that yields a pair (seed, solution) per seed. A run
+            starts when its pair is requested.
+    """
+    for seed in seeds:
+        random.seed(seed)
+        yield seed, _search(task, search, heuristic, use_preferred_ops)
+
+
 def search_plan(
-    domain_file, problem_file, search, heuristic_class, use_preferred_ops=False
+    domain_file,
+    problem_file,
+    search,
+    heuristic_class,
+    use_preferred_ops=False,
+    use_bitsets=False,
+    heuristic_cache_size=None,
 ):
     """
     Parses the given input files to a specific planner task and then tries to
@@ -171,22 +274,149 @@ def search_plan(
                             search space
     @param heuristic_class  A class implementing the heuristic_base.Heuristic
                             interface
+    @param use_bitsets      Represent states as int bitmasks during the search
+    @param heuristic_cache_size  If given, cache the heuristic values of up to
+                                 this many states
     @return A list of actions that solve the problem
     """
-    problem = _parse(domain_file, problem_file)
-    task = _ground(problem)
+    task = load_task(domain_file, problem_file, use_bitsets)
     heuristic = None
     if not heuristic_class is None:
         heuristic = heuristic_class(task)
+    use_preferred_ops = use_preferred_ops and isinstance(heuristic, hFFHeuristic)
+    if heuristic is not None and heuristic_cache_size:
+        heuristic = HeuristicCache(heuristic, heuristic_cache_size)
     search_start_time = time.process_time()
-    if use_preferred_ops and isinstance(heuristic, heuristics.hFFHeuristic):
+    if use_preferred_ops:
         solution = _search(task, search, heuristic, use_preferred_ops=True)
     else:
         solution = _search(task, search, heuristic)
     logging.info("Search time: {:.2}".format(time.process_time() - search_start_time))
+    if isinstance(heuristic, HeuristicCache):
+        logging.info(
+            "Heuristic cache: {} hits, {} misses".format(
+                heuristic.hits, heuristic.misses
+            )
+        )
     return solution
 
 
+def parse_portfolio(configurations):
+    """
+    Translates portfolio configurations of the form "search:heuristic" (or
+    just "search" for blind searches) into pairs of a search function and a
+    heuristic class.
+
+    @param configurations  A list of configuration names, e.g. PORTFOLIO
+    @return A list of (search, heuristic_class) pairs
+    """
+    portfolio = []
+    for configuration in configurations:
+        search_name, _, heuristic_name = configuration.partition(":")
+        if search_name not in SEARCHES:
+            raise ValueError(f"Unknown search {search_name!r} in portfolio")
+        if heuristic_name and heuristic_name not in HEURISTICS:
+            raise ValueError(f"Unknown heuristic {heuristic_name!r} in portfolio")
+        heuristic_class = HEURISTICS[heuristic_name] if heuristic_name else None
+        portfolio.append((SEARCHES[search_name], heuristic_class))
+    return portfolio
+
+
+def _run_portfolio_member(task, search, heuristic_class, index, results):
+    try:
+        heuristic = None
+        if heuristic_class is not None:
+            heuristic = heuristic_class(task)
+        solution = _search(task, search, heuristic)
+        if solution is not None:
+            # Searches like sat_solve return the operators of the set-based
+            # task for a bitset task, so they are identified by name.
+            op_indices = {
+                op.name: op_index for op_index, op in enumerate(task.operators)
+            }
+            solution = [op_indices[op.name] for op in solution]
+    except Exception:
+        logging.exception(f"Portfolio member {search.__name__} failed")
+        solution = None
+    results.put((index, solution))
+
+
+def search_portfolio(
+    domain_file, problem_file, portfolio, deadline=None, use_bitsets=False
+):
+    """
+    Grounds the given problem once and runs several search configurations on
+    it in parallel, one process per configuration.
+
+    @param domain_file   The path to a domain file
+    @param problem_file  The path to a problem file in the domain given by
+                         domain_file
+    @param portfolio     A list of (search, heuristic_class) pairs, e.g. from
+                         parse_portfolio. heuristic_class may be None.
+    @param deadline      If None, return the first plan that is found.
+                         Otherwise return the shortest plan that is found
+                         within this many seconds.
+    @param use_bitsets   Represent states as int bitmasks during the search
+    @return A list of actions that solve the problem or None. All searches
+            that are still running when the plan is returned are killed.
+    """
+    task = load_task(domain_file, problem_file, use_bitsets)
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=_run_portfolio_member,
+            args=(task, search, heuristic_class, index, results),
+            daemon=True,
+        )
+        for index, (search, heuristic_class) in enumerate(portfolio)
+    ]
+    start_time = time.monotonic()
+    for process in processes:
+        process.start()
+
+    best = None
+    best_index = None
+    finished = 0
+    try:
+        while finished < len(processes):
+            timeout = 1.0
+            if deadline is not None:
+                timeout = min(timeout, deadline - (time.monotonic() - start_time))
+                if timeout <= 0:
+                    logging.info("Portfolio deadline reached")
+                    break
+            try:
+                index, solution = results.get(timeout=timeout)
+            except queue.Empty:
+                if not any(process.is_alive() for process in processes):
+                    # Members that crashed never report a result.
+                    break
+                continue
+            finished += 1
+            if solution is None:
+                continue
+            if best is None or len(solution) < len(best):
+                best, best_index = solution, index
+            if deadline is None:
+                break
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+
+    if best is None:
+        return None
+    search, heuristic_class = portfolio[best_index]
+    logging.info(
+        "Portfolio plan found by {} with {}".format(
+            search.__name__, heuristic_class.__name__ if heuristic_class else None
+        )
+    )
+    return [task.operators[op_index] for op_index in best]
+
+
 def validate_solution(domain_file, problem_file, solution_file):
     if not validator_available():
         logging.info(
@@ -15,7 +15,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>
 #
 
-from .a_star import astar_search, greedy_best_first_search, weighted_astar_search, monte_carlo_rrw_search, enforced_hillclimbing_random_walk_search
+from .a_star import astar_search, greedy_best_first_search, weighted_astar_search, lazy_astar_search, lazy_greedy_best_first_search, lazy_weighted_astar_search, monte_carlo_rrw_search, enforced_hillclimbing_random_walk_search
 from .breadth_first_search import breadth_first_search
 from .enforced_hillclimbing_search import enforced_hillclimbing_search
 from .iterative_deepening_search import iterative_deepening_search
@@ -19,14 +19,17 @@
 Implements the A* (a-star) and weighted A* search algorithm. Includes multiple new random-walk based algorithms not included in the base version of Pyperplan.
 """
 
-import heapq
 import logging
 import random
+from array import array
 from datetime import datetime, timedelta
 from sympy import divisor_count
 
 
 from . import searchspace
+from .open_lists import make_open_list
+from .parallel_walks import WalkPool
+from .state_registry import StateRegistry
 
 def luby_sequence(n=20000000, scale=1):
     sequence = [1]
@@ -114,20 +117,32 @@ def ordered_node_greedy_best_first(node, h, node_tiebreaker):
     return (f, h, node_tiebreaker, node)
 
 
-def greedy_best_first_search(task, heuristic, use_relaxed_plan=False):
+def greedy_best_first_search(task, heuristic, use_relaxed_plan=False, open_list="heap"):
     """
     Searches for a plan in the given task using greedy best first search.
 
     @param task The task to be solved.
     @param heuristic A heuristic callable which computes the estimated steps
                      from a search node to reach the goal.
+    @param use_relaxed_plan Prefer the successors of the operators in the
+                            relaxed plan (see astar_search).
+    @param open_list The name of the open list (see open_lists.OPEN_LISTS).
     """
+    open_list = make_open_list(
+        open_list,
+        ordered_node_greedy_best_first,
+        g_weight=0,
+        h_weight=1,
+        preferred=use_relaxed_plan,
+    )
     return astar_search(
-        task, heuristic, ordered_node_greedy_best_first, use_relaxed_plan
+        task, heuristic, ordered_node_greedy_best_first, use_relaxed_plan, open_list
     )
 
 
-def weighted_astar_search(task, heuristic, weight=5, use_relaxed_plan=False):
+def weighted_astar_search(
+    task, heuristic, weight=5, use_relaxed_plan=False, open_list="heap"
+):
     """
     Searches for a plan in the given task using A* search.
 
@@ -135,14 +150,41 @@ def weighted_astar_search(task, heuristic, weight=5, use_relaxed_plan=False):
     @param heuristic  A heuristic callable which computes the estimated steps.
                       from a search node to reach the goal.
     @param weight A weight to be applied to the heuristics value for each node.
+    @param use_relaxed_plan Prefer the successors of the operators in the
+                            relaxed plan (see astar_search).
+    @param open_list The name of the open list (see open_lists.OPEN_LISTS).
+                     Bucket open lists need an integer weight.
     """
-    return astar_search(
-        task, heuristic, ordered_node_weighted_astar(weight), use_relaxed_plan
+    make_open_entry = ordered_node_weighted_astar(weight)
+    open_list = make_open_list(
+        open_list,
+        make_open_entry,
+        g_weight=1,
+        h_weight=weight,
+        preferred=use_relaxed_plan,
     )
+    return astar_search(task, heuristic, make_open_entry, use_relaxed_plan, open_list)
+
+
+def _extract_plan(parent_ids, parent_ops, state_id):
+    """
+    Returns the operators on the path from the initial state to the state
+    with the given ID.
+    """
+    plan = []
+    while parent_ids[state_id] != -1:
+        plan.append(parent_ops[state_id])
+        state_id = parent_ids[state_id]
+    plan.reverse()
+    return plan
 
 
 def astar_search(
-    task, heuristic, make_open_entry=ordered_node_astar, use_relaxed_plan=False
+    task,
+    heuristic,
+    make_open_entry=ordered_node_astar,
+    use_relaxed_plan=False,
+    open_list="heap",
 ):
     """
     Searches for a plan in the given task using A* search.
@@ -156,69 +198,113 @@ def astar_search(
                            ordered_node_weighted_astar and
                            ordered_node_greedy_best_first with obvious
                            meanings.
+    @param use_relaxed_plan Get the relaxed plan of each expanded node from
+                            heuristic.calc_h_with_plan, which reuses the plan
+                            of the node's evaluation. The successors
+                            of its operators (the preferred operators) are
+                            also put into a second open list, from which the
+                            search pops alternately with the list of all
+                            successors. The preferred list is boosted
+                            whenever a lower h value is reached.
+    @param open_list An empty open list (see open_lists) or the name of one.
+                     A named bucket open list orders the nodes by g + h
+                     regardless of make_open_entry. Bucket open lists need
+                     integer heuristic values. With use_relaxed_plan, an
+                     open list object has to be an AlternationOpenList.
     """
-    open = []
-    state_cost = {task.initial_state: 0}
-    node_tiebreaker = 0
+    if isinstance(open_list, str):
+        open_list = make_open_list(
+            open_list, make_open_entry, preferred=use_relaxed_plan
+        )
+    # Nodes keep the relaxed plans of their evaluation for their expansion.
+    with searchspace.keep_relaxed_plans(heuristic, use_relaxed_plan):
+        return _astar_search(task, heuristic, use_relaxed_plan, open_list)
+
+
+def _astar_search(task, heuristic, use_relaxed_plan, open_list):
+    # g-values and parent links are indexed by the IDs that the registry
+    # gives to the states.
+    registry = StateRegistry(task)
+    registry.insert(task.initial_state)
+    state_cost = array("d", [0])
+    # The ID of the state from which each state was reached with its g value
+    # and the operator that was applied there (-1 and None for the initial
+    # state).
+    parent_ids = array("i", [-1])
+    parent_ops = [None]
+    # The g value with which each state was last expanded. A preferred node
+    # is in two open lists and must only be expanded once.
+    expanded_cost = array("d", [float("inf")])
 
     root = searchspace.make_root_node(task.initial_state)
     init_h = heuristic(root)
-    heapq.heappush(open, make_open_entry(root, init_h, node_tiebreaker))
     logging.info("Initial h value: %f" % init_h)
+    if init_h != float("inf"):
+        # don't bother with an initial state that can't reach the goal
+        open_list.push(root, init_h)
 
     besth = float("inf")
     counter = 0
     expansions = 0
 
-    while open:
-        (f, h, _tie, pop_node) = heapq.heappop(open)
+    while open_list:
+        h, pop_node = open_list.pop()
         if h < besth:
             besth = h
             logging.debug("Found new best h: %d after %d expansions" % (besth, counter))
+            if use_relaxed_plan:
+                open_list.boost()
 
         pop_state = pop_node.state
+        pop_id = registry.lookup(pop_state)
         # Only expand the node if its associated cost (g value) is the lowest
         # cost known for this state. Otherwise we already found a cheaper
         # path after creating this node and hence can disregard it.
-        if state_cost[pop_state] == pop_node.g:
+        if state_cost[pop_id] == pop_node.g and expanded_cost[pop_id] > pop_node.g:
+            expanded_cost[pop_id] = pop_node.g
             expansions += 1
 
             if task.goal_reached(pop_state):
                 logging.info("Goal reached. Start extraction of solution.")
                 logging.info("%d Nodes expanded" % expansions)
-                return pop_node.extract_solution()
+                return _extract_plan(parent_ids, parent_ops, pop_id)
             rplan = None
             if use_relaxed_plan:
-                (rh, rplan) = heuristic.calc_h_with_plan(
-                    searchspace.make_root_node(pop_state)
-                )
+                (rh, rplan) = heuristic.calc_h_with_plan(pop_node)
                 logging.debug("relaxed plan %s " % rplan)
 
+            succ_nodes = []
             for op, succ_state in task.get_successor_states(pop_state):
-                if use_relaxed_plan:
-                    if rplan and not op.name in rplan:
-                        # ignore this operator if we use the relaxed plan
-                        # criterion
-                        logging.debug(
-                            "removing operator %s << not a "
-                            "preferred operator" % op.name
-                        )
-                        continue
-                    else:
-                        logging.debug("keeping operator %s" % op.name)
+                succ_nodes.append(searchspace.make_child_node(pop_node, op, succ_state))
 
-                succ_node = searchspace.make_child_node(pop_node, op, succ_state)
-                h = heuristic(succ_node)
+            # All successors are evaluated at once, so the heuristic can share
+            # work between them.
+            for succ_node, h in zip(succ_nodes, heuristic.evaluate_batch(succ_nodes)):
+                succ_state = succ_node.state
                 if h == float("inf"):
                     # don't bother with states that can't reach the goal anyway
                     continue
-                old_succ_g = state_cost.get(succ_state, float("inf"))
-                if succ_node.g < old_succ_g:
+                succ_id, inserted = registry.insert(succ_state)
+                if inserted:
+                    state_cost.append(float("inf"))
+                    expanded_cost.append(float("inf"))
+                    parent_ids.append(-1)
+                    parent_ops.append(None)
+                if succ_node.g < state_cost[succ_id]:
                     # We either never saw succ_state before, or we found a
                     # cheaper path to succ_state than previously.
-                    node_tiebreaker += 1
-                    heapq.heappush(open, make_open_entry(succ_node, h, node_tiebreaker))
-                    state_cost[succ_state] = succ_node.g
+                    if use_relaxed_plan:
+                        preferred = bool(rplan) and succ_node.action.name in rplan
+                        open_list.push(succ_node, h, preferred)
+                    else:
+                        open_list.push(succ_node, h)
+                    state_cost[succ_id] = succ_node.g
+                    parent_ids[succ_id] = pop_id
+                    parent_ops[succ_id] = succ_node.action
+                    # The plan is extracted from the parent links of the
+                    # states, so the evaluated node does not have to keep
+                    # the path to it alive.
+                    succ_node.parent = None
 
         counter += 1
     logging.info("No operators left. Task unsolvable.")
@@ -226,33 +312,183 @@ def astar_search(
     return None
 
 
-def random_walk(task, heuristic, current_state, h_min, max_walk_len, restart_probability):
+def lazy_greedy_best_first_search(
+    task, heuristic, use_relaxed_plan=False, open_list="heap"
+):
+    """
+    Searches for a plan in the given task using greedy best first search with
+    deferred heuristic evaluation (see lazy_astar_search).
+
+    @param task The task to be solved.
+    @param heuristic A heuristic callable which computes the estimated steps
+                     from a search node to reach the goal.
+    @param use_relaxed_plan Prefer the successors of the operators in the
+                            relaxed plan (see lazy_astar_search).
+    @param open_list The name of the open list (see open_lists.OPEN_LISTS).
+    """
+    open_list = make_open_list(
+        open_list,
+        ordered_node_greedy_best_first,
+        g_weight=0,
+        h_weight=1,
+        preferred=use_relaxed_plan,
+    )
+    return lazy_astar_search(
+        task, heuristic, ordered_node_greedy_best_first, use_relaxed_plan, open_list
+    )
+
+
+def lazy_weighted_astar_search(
+    task, heuristic, weight=5, use_relaxed_plan=False, open_list="heap"
+):
+    """
+    Searches for a plan in the given task using weighted A* search with
+    deferred heuristic evaluation (see lazy_astar_search).
+
+    @param task The task to be solved.
+    @param heuristic  A heuristic callable which computes the estimated steps.
+                      from a search node to reach the goal.
+    @param weight A weight to be applied to the heuristics value for each node.
+    @param use_relaxed_plan Prefer the successors of the operators in the
+                            relaxed plan (see lazy_astar_search).
+    @param open_list The name of the open list (see open_lists.OPEN_LISTS).
+    """
+    make_open_entry = ordered_node_weighted_astar(weight)
+    open_list = make_open_list(
+        open_list,
+        make_open_entry,
+        g_weight=1,
+        h_weight=weight,
+        preferred=use_relaxed_plan,
+    )
+    return lazy_astar_search(
+        task, heuristic, make_open_entry, use_relaxed_plan, open_list
+    )
+
+
+def lazy_astar_search(
+    task,
+    heuristic,
+    make_open_entry=ordered_node_astar,
+    use_relaxed_plan=False,
+    open_list="heap",
+):
+    """
+    Searches for a plan in the given task using A* search with deferred
+    heuristic evaluation, like the lazy search of Fast Downward.
+
+    Successors are put into the open list with the h value of their parent
+    and are only evaluated when they are popped. Successors that are never
+    popped therefore cost no heuristic evaluation. With use_relaxed_plan, a
+    popped node is evaluated with calc_h_with_plan, which gives its h value
+    and its relaxed plan in a single pass. The successors of the operators
+    in the relaxed plan are preferred like in astar_search. The found plans
+    are not optimal, even with an admissible heuristic, because nodes are
+    ordered by their parent's h.
+
+    @param task The task to be solved
+    @param heuristic  A heuristic callable which computes the estimated steps
+                      from a search node to reach the goal.
+    @param make_open_entry The ordering of the open list, see astar_search.
+    @param use_relaxed_plan Prefer the successors of the operators in the
+                            relaxed plan, see astar_search.
+    @param open_list An empty open list (see open_lists) or the name of one.
+    """
+    if isinstance(open_list, str):
+        open_list = make_open_list(
+            open_list, make_open_entry, preferred=use_relaxed_plan
+        )
+    registry = StateRegistry(task)
+    # The lowest g value with which each state was popped, indexed by the IDs
+    # that the registry gives to the states.
+    state_cost = array("d")
+
+    root = searchspace.make_root_node(task.initial_state)
+    open_list.push(root, 0)
+
+    besth = float("inf")
+    expansions = 0
+    evaluations = 0
+
+    while open_list:
+        _parent_h, pop_node = open_list.pop()
+        pop_state = pop_node.state
+        state_id, inserted = registry.insert(pop_state)
+        if inserted:
+            state_cost.append(float("inf"))
+        elif state_cost[state_id] <= pop_node.g:
+            # The state was already reached on a path that is as cheap.
+            continue
+        state_cost[state_id] = pop_node.g
+
+        if task.goal_reached(pop_state):
+            logging.info("Goal reached. Start extraction of solution.")
+            logging.info("%d Nodes expanded" % expansions)
+            logging.info("%d Heuristic evaluations" % evaluations)
+            return pop_node.extract_solution()
+
+        rplan = None
+        if use_relaxed_plan:
+            h, rplan = heuristic.calc_h_with_plan(pop_node)
+        else:
+            h = heuristic(pop_node)
+        evaluations += 1
+        if pop_node is root:
+            logging.info("Initial h value: %f" % h)
+        if h == float("inf"):
+            # don't bother with states that can't reach the goal anyway
+            continue
+        if h < besth:
+            besth = h
+            logging.debug(
+                "Found new best h: %d after %d expansions" % (besth, expansions)
+            )
+            if use_relaxed_plan:
+                open_list.boost()
+
+        expansions += 1
+        for op, succ_state in task.get_successor_states(pop_state):
+            succ_g = pop_node.g + 1
+            succ_id = registry.lookup(succ_state)
+            if succ_id is not None and state_cost[succ_id] <= succ_g:
+                continue
+            succ_node = searchspace.make_child_node(pop_node, op, succ_state)
+            if use_relaxed_plan:
+                open_list.push(succ_node, h, bool(rplan) and op.name in rplan)
+            else:
+                open_list.push(succ_node, h)
+
+    logging.info("No operators left. Task unsolvable.")
+    logging.info("%d Nodes expanded" % expansions)
+    logging.info("%d Heuristic evaluations" % evaluations)
+    return None
+
+
+def random_walk(task, heuristic, current_state, h_min, max_walk_len, restart_probability, stop_event=None):
     walk_len = 0
     sampled_node = current_state
     # print(f"current heuristic min: {heuristic(sampled_node)}")
     restart_probability = restart_probability * 100
 
     while walk_len < max_walk_len:    # restart hardcoded threshold t_g = 100
+        if stop_event is not None and stop_event.is_set():
+            return sampled_node, walk_len    # another parallel walk reached the goal
 
         # print(f"random_walk: current h = {heuristic(sampled_node)}, walk length = {walk_len}")
         sampled_state = sampled_node.state
         # print("test", sampled_state)
-        sampled_actions = task.get_successor_states(sampled_state)
-        num_applicable_actions = len(sampled_actions)
+        chosen_operator = task.sample_applicable_operator(sampled_state)     # perform random action selection
         
         # print("Test", actions)
-        if num_applicable_actions == 0 or heuristic(sampled_node) == float("inf"):
+        if chosen_operator is None or heuristic(sampled_node) == float("inf"):
             return sampled_node, walk_len    # dead end situation
         
-        random_num = random.randint(0,num_applicable_actions-1)     # perform random action selection
-        chosen_operator = sampled_actions[random_num][0]
-        chosen_succ_state = sampled_actions[random_num][1]
+        chosen_succ_state = chosen_operator.apply(sampled_state)
         # action_sequence.append((chosen_operator, chosen_succ_state))
 
         sampled_node = searchspace.make_child_node(sampled_node, chosen_operator, chosen_succ_state)    # the successor node object
         sampled_node_state = sampled_node.state
         h_succ = heuristic(sampled_node)
-        succ_actions = task.get_successor_states(sampled_node_state)
 
         walk_len += 1   # setting counter for the restart threshold 
 
@@ -278,7 +514,7 @@ def random_walk(task, heuristic, current_state, h_min, max_walk_len, restart_pro
     return sampled_node, walk_len       # max walk len hit
 
 def monte_carlo_rrw_search(
-    task, heuristic, max_walk_len = 700, restart_probability=0.01, time_limit=3000, make_open_entry=ordered_node_greedy_best_first, use_relaxed_plan=False,
+    task, heuristic, max_walk_len = 700, restart_probability=0.01, time_limit=3000, make_open_entry=ordered_node_greedy_best_first, use_relaxed_plan=False, num_workers=1,
 ):
     """
     Searches for a plan in the given task using monte carlo RRW search.
@@ -292,7 +528,13 @@ def monte_carlo_rrw_search(
                            ordered_node_weighted_astar and
                            ordered_node_greedy_best_first with obvious
                            meanings.
+    @param num_workers If greater than 1, run this many walks at a time in a
+                       pool of processes (see _parallel_monte_carlo_rrw_search).
     """
+    if num_workers > 1:
+        return _parallel_monte_carlo_rrw_search(
+            task, heuristic, max_walk_len, restart_probability, time_limit, num_workers
+        )
     node_tiebreaker = 0
 
     root = searchspace.make_root_node(task.initial_state)  # setting root node s_0
@@ -321,7 +563,7 @@ def monte_carlo_rrw_search(
 
         sampled_state = sampled_node.state
 
-        num_applicable_actions = len(task.get_successor_states(sampled_state))
+        has_applicable_actions = next(task.get_applicable_operators(sampled_state), None) is not None
 
         if task.goal_reached(sampled_state):
             sol = sampled_node.extract_solution()
@@ -333,7 +575,7 @@ def monte_carlo_rrw_search(
 
             return sampled_node.extract_solution()  # TODO: look at details of extract_solution and chaining action sequences
 
-        elif num_applicable_actions > 0 and h_sampled < h_min:  # successfully found new lowest h state, update current state to new lowest h state
+        elif has_applicable_actions and h_sampled < h_min:  # successfully found new lowest h state, update current state to new lowest h state
 
             current_state = sampled_node
             # print(sampled)
@@ -362,29 +604,76 @@ def monte_carlo_rrw_search(
 
 
 
-def ehs_random_walk(task, heuristic, current_state, h_min, max_walk_len):
+def _parallel_monte_carlo_rrw_search(
+    task, heuristic, max_walk_len, restart_probability, time_limit, num_workers
+):
+    """
+    Monte carlo RRW search that runs num_workers walks from the current state
+    at a time. A walk that reaches the goal wins. Otherwise the search
+    continues from the lowest h endpoint that improves on the current state,
+    or restarts from the initial state if no walk improved. As in the serial
+    version, time_limit is the maximum number of walks.
+    """
+    root = searchspace.make_root_node(task.initial_state)
+    init_h = heuristic(root)
+    h_min = init_h
+    current_state = root
+    logging.info("Initial h value: %f" % init_h)
+
+    expansions = 0
+    num_walks = 0
+    with WalkPool(task, heuristic, num_workers) as pool:
+        while num_walks < time_limit:
+            walk_args = [(h_min, max_walk_len, restart_probability)] * num_workers
+            results = pool.run_walks(random_walk, current_state.state, walk_args)
+            num_walks += len(results)
+            expansions += sum(result.walk_len for result in results)
+
+            goals = [result for result in results if result.goal_reached]
+            if goals:
+                logging.info("Goal reached on walk number: %d" % num_walks)
+                logging.info("%d Nodes expanded" % expansions)
+                return pool.make_node(current_state, goals[0]).extract_solution()
+
+            improved = [
+                result
+                for result in results
+                if not result.dead_end and result.h < h_min
+            ]
+            if improved:
+                best = min(improved, key=lambda result: result.h)
+                current_state = pool.make_node(current_state, best)
+                h_min = best.h
+            else:
+                current_state = root
+                h_min = init_h
+
+    logging.info("Time limit reached, failed to find a solution")
+    return None
+
+
+def ehs_random_walk(task, heuristic, current_state, h_min, max_walk_len, stop_event=None):
     walk_len = 0
     sampled_node = current_state
     # print(f"current heuristic min: {heuristic(sampled_node)}")
     restart_depth = max_walk_len    
 
     while walk_len < restart_depth:    # restart hardcoded threshold t_g = 100
+        if stop_event is not None and stop_event.is_set():
+            return current_state, walk_len    # another parallel walk reached the goal
 
         # print(f"random_walk: current h = {heuristic(sampled_node)}, walk length = {walk_len}")
         sampled_state = sampled_node.state
         # print("test", sampled_state)
-        sampled_actions = task.get_successor_states(sampled_state)
-        num_applicable_actions = len(sampled_actions)
+        chosen_operator = task.sample_applicable_operator(sampled_state)     # perform random action selection
         
         # print("Test", actions)
         
-        if num_applicable_actions == 0 or heuristic(sampled_node) == float("inf"):
+        if chosen_operator is None or heuristic(sampled_node) == float("inf"):
             print('deadend encountered')
             return sampled_node, walk_len    # dead end situation
         
-        random_num = random.randint(0,num_applicable_actions-1)     # perform random action selection
-        chosen_operator = sampled_actions[random_num][0]
-        chosen_succ_state = sampled_actions[random_num][1]
+        chosen_succ_state = chosen_operator.apply(sampled_state)
         # action_sequence.append((chosen_operator, chosen_succ_state))
 
         sampled_node = searchspace.make_child_node(sampled_node, chosen_operator, chosen_succ_state)    # the successor node object
@@ -409,7 +698,7 @@ def ehs_random_walk(task, heuristic, current_state, h_min, max_walk_len):
         ### Generating 2 million elements of luby for 75 runs takes 20 seconds
 
 def enforced_hillclimbing_random_walk_search(
-    task, heuristic, max_walk_len = 10, restart_sequence=luby_sequence(2000000), sequence_scale=1, time_limit=10, make_open_entry=ordered_node_greedy_best_first, use_relaxed_plan=False,
+    task, heuristic, max_walk_len = 10, restart_sequence=luby_sequence(2000000), sequence_scale=1, time_limit=10, make_open_entry=ordered_node_greedy_best_first, use_relaxed_plan=False, num_workers=1,
 ):
     """
     Searches for a plan in the given task using enforced hillclimbing random walk search search.
@@ -423,6 +712,9 @@ def enforced_hillclimbing_random_walk_search(
                            ordered_node_weighted_astar and
                            ordered_node_greedy_best_first with obvious
                            meanings.
+    @param num_workers If greater than 1, run this many walks at a time in a
+                       pool of processes (see
+                       _parallel_enforced_hillclimbing_random_walk_search).
     """
     sequence_used = False
     if restart_sequence != None:
@@ -431,6 +723,17 @@ def enforced_hillclimbing_random_walk_search(
         sequence_used = True
         sequence_index = 0
 
+    if num_workers > 1:
+        return _parallel_enforced_hillclimbing_random_walk_search(
+            task,
+            heuristic,
+            max_walk_len,
+            restart_sequence,
+            sequence_scale,
+            time_limit,
+            num_workers,
+        )
+
 
     time_limit = 60 * time_limit   # get time limit in seconds
     start_time = datetime.now()
@@ -491,12 +794,12 @@ def enforced_hillclimbing_random_walk_search(
             print("SOLVED")
             return sampled_node.extract_solution()  # TODO: look at details of extract_solution and chaining action sequences
 
-        num_applicable_actions = len(task.get_successor_states(sampled_state)) # checking for deadend
-        if num_applicable_actions == 0:
+        has_applicable_actions = next(task.get_applicable_operators(sampled_state), None) is not None # checking for deadend
+        if not has_applicable_actions:
             print('DEADEND: NO MORE ACTIONS AVAILABLE')
             return None
 
-        elif num_applicable_actions > 0 and h_sampled < h_min:  # successfully found new lowest h state, update current state to new lowest h state
+        elif h_sampled < h_min:  # successfully found new lowest h state, update current state to new lowest h state
 
             current_state = sampled_node
             # print(sampled)
@@ -509,3 +812,68 @@ def enforced_hillclimbing_random_walk_search(
     # logging.info("%d Nodes expanded" % expansions)
     print("Time limit reached, failed to find a solution")
     return None
+
+
+def _parallel_enforced_hillclimbing_random_walk_search(
+    task,
+    heuristic,
+    max_walk_len,
+    restart_sequence,
+    sequence_scale,
+    time_limit,
+    num_workers,
+):
+    """
+    Enforced hillclimbing random walk search that runs num_workers walks from
+    the current state at a time. Each walk takes the next length of the
+    restart sequence. A walk that reaches the goal wins. Otherwise the search
+    continues from the lowest h endpoint that improves on the current state.
+    The search fails if all walks of a round end in dead ends.
+    """
+    time_limit = 60 * time_limit   # get time limit in seconds
+    start_time = datetime.now()
+    root = searchspace.make_root_node(task.initial_state)
+    h_min = heuristic(root)
+    current_state = root
+    logging.info("Initial h value: %f" % h_min)
+
+    expansions = 0
+    num_walks = 0
+    sequence_index = 0
+    with WalkPool(task, heuristic, num_workers) as pool:
+        while (datetime.now() - start_time).total_seconds() < time_limit:
+            if restart_sequence is None:
+                walk_lens = [max_walk_len] * num_workers
+            else:
+                walk_lens = [
+                    restart_sequence[index] * sequence_scale
+                    for index in range(sequence_index, sequence_index + num_workers)
+                ]
+                sequence_index += num_workers
+            walk_args = [(h_min, walk_len) for walk_len in walk_lens]
+            results = pool.run_walks(ehs_random_walk, current_state.state, walk_args)
+            num_walks += len(results)
+            expansions += sum(result.walk_len for result in results)
+
+            goals = [result for result in results if result.goal_reached]
+            if goals:
+                logging.info("Goal reached on walk number: %d" % num_walks)
+                logging.info("%d Nodes expanded" % expansions)
+                return pool.make_node(current_state, goals[0]).extract_solution()
+
+            if all(result.dead_end for result in results):
+                logging.info("Dead end: no more actions available")
+                return None
+
+            improved = [
+                result
+                for result in results
+                if not result.dead_end and result.h < h_min
+            ]
+            if improved:
+                best = min(improved, key=lambda result: result.h)
+                current_state = pool.make_node(current_state, best)
+                h_min = best.h
+
+    logging.info("Time limit reached, failed to find a solution")
+    return None
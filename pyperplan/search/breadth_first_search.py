@@ -19,10 +19,10 @@
 Implements the breadth first search algorithm.
 """
 
-from collections import deque
 import logging
 
 from . import searchspace
+from .state_registry import StateRegistry
 
 
 def breadth_first_search(planning_task):
@@ -36,32 +36,31 @@ def breadth_first_search(planning_task):
     """
     # counts the number of loops (only for printing)
     iteration = 0
-    # fifo-queue storing the nodes which are next to explore
-    queue = deque()
-    queue.append(searchspace.make_root_node(planning_task.initial_state))
-    # set storing the explored nodes, used for duplicate detection
-    closed = {planning_task.initial_state}
-    while queue:
+    # stores one node per explored state, used for duplicate detection.
+    # Nodes are numbered in the order they are created, so the nodes from
+    # next_node to the last one form the fifo-queue of unexplored nodes.
+    # The states are packed into a StateRegistry.
+    nodes = searchspace.NodeStore(StateRegistry(planning_task))
+    nodes.make_root_node(planning_task.initial_state)
+    next_node = 0
+    while next_node < len(nodes):
         iteration += 1
         logging.debug(
             "breadth_first_search: Iteration %d, #unexplored=%d"
-            % (iteration, len(queue))
+            % (iteration, len(nodes) - next_node)
         )
         # get the next node to explore
-        node = queue.popleft()
+        node = next_node
+        next_node += 1
+        state = nodes.get_state(node)
         # exploring the node or if it is a goal node extracting the plan
-        if planning_task.goal_reached(node.state):
+        if planning_task.goal_reached(state):
             logging.info("Goal reached. Start extraction of solution.")
             logging.info("%d Nodes expanded" % iteration)
-            return node.extract_solution()
-        for operator, successor_state in planning_task.get_successor_states(node.state):
+            return nodes.extract_solution(node)
+        for operator, successor_state in planning_task.get_successor_states(state):
             # duplicate detection
-            if successor_state not in closed:
-                queue.append(
-                    searchspace.make_child_node(node, operator, successor_state)
-                )
-                # remember the successor state
-                closed.add(successor_state)
+            nodes.make_new_child_node(node, operator, successor_state)
     logging.info("No operators left. Task unsolvable.")
     logging.info("%d Nodes expanded" % iteration)
     return None
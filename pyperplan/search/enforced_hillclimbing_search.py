@@ -33,11 +33,25 @@ def enforced_hillclimbing_search(planning_task, heuristic, use_preferred_ops=Fal
     duplicate detection.
 
     @param planning_task: The planning task to solve.
+    @param use_preferred_ops: Only explore the successors of the operators
+                              in the relaxed plan of a node. If they lead to
+                              no better state, the plateau is explored again
+                              with all successors.
     @return: The solution as a list of operators or None if no solution was
     found. Note that enforced hill climbing is an incomplete algorithm, so it
     may fail to find a solution even though the task is solvable.
     """
+    # With preferred operators, the nodes keep the relaxed plans of their
+    # evaluation, so they need no second forward pass when they are explored.
+    with searchspace.keep_relaxed_plans(heuristic, use_preferred_ops):
+        return _enforced_hillclimbing_search(
+            planning_task, heuristic, use_preferred_ops, random_op_ordering, time_limit
+        )
 
+
+def _enforced_hillclimbing_search(
+    planning_task, heuristic, use_preferred_ops, random_op_ordering, time_limit
+):
     time_limit = 60 * time_limit   # get time limit in seconds
 
     start_time = datetime.now()
@@ -56,7 +70,12 @@ def enforced_hillclimbing_search(planning_task, heuristic, use_preferred_ops=Fal
     # set storing the explored nodes, used for duplicate detection
     closed = set()
     visited = set()
-    while queue:
+    # Ignore the successors of non-preferred operators until the preferred
+    # ones lead to no improvement on the current plateau.
+    prune = use_preferred_ops
+    # The explored nodes of the plateau whose successors were pruned
+    pruned_nodes = []
+    while queue or pruned_nodes:
         iteration += 1
         current_time = datetime.now()
         # print(f'current time: {current_time}, end time: {end_time}')
@@ -66,6 +85,13 @@ def enforced_hillclimbing_search(planning_task, heuristic, use_preferred_ops=Fal
             print("Time limit reached, failed to find a solution")
             return None
 
+        if not queue:
+            # The preferred operators lead to no better state. Explore the
+            # plateau again with all successors of the pruned nodes.
+            logging.debug("No improvement with preferred operators")
+            queue.extend(pruned_nodes)
+            pruned_nodes = []
+            prune = False
 
         # get the next node to explore
         node = queue.popleft()
@@ -78,9 +104,9 @@ def enforced_hillclimbing_search(planning_task, heuristic, use_preferred_ops=Fal
             logging.info("%d Nodes expanded" % len(visited))
             return node.extract_solution()
 
-        # for the preferred operator version --> recompute heuristic and
-        # relaxed plan
-        if use_preferred_ops:
+        # for the preferred operator version --> get the relaxed plan that
+        # the node kept from its evaluation
+        if prune:
             (rh, rplan) = heuristic.calc_h_with_plan(node)
             logging.debug("relaxed plan %s " % rplan)
 
@@ -93,44 +119,60 @@ def enforced_hillclimbing_search(planning_task, heuristic, use_preferred_ops=Fal
         else:
             successor_states = not_shuffled
 
+        successor_nodes = []
+        pruned = False
         for operator, successor_state in successor_states:
 
             # for the preferred operator version ignore all non preferred
             # operators
-            if use_preferred_ops:
+            if prune:
                 if rplan and not operator.name in rplan:
                     # ignore this operator if we use the relaxed plan criterion
                     logging.debug(
                         "removing operator %s << not a preferred "
                         "operator" % operator.name
                     )
+                    pruned = True
                     continue
                 else:
                     logging.debug("keeping operator %s" % operator.name)
 
             # duplicate detection
             if successor_state not in closed:
-                successor_node = searchspace.make_child_node(
-                    node, operator, successor_state
+                successor_nodes.append(
+                    searchspace.make_child_node(node, operator, successor_state)
                 )
-                heuristic_value = heuristic(successor_node)
-                if heuristic_value == float("inf"):
-                    continue
-                elif heuristic_value < best_heuristic_value:
-                    # Just take the first successor node that has a lower
-                    # heuristic value than the current best_heuristic_value
-                    # and ignore the other successor nodes.
-                    logging.debug(
-                        "Found new best h: %f after %d expansions"
-                        % (heuristic_value, iteration)
-                    )
-                    queue.clear()
-                    closed.clear()
-                    best_heuristic_value = heuristic_value
-                    queue.append(successor_node)
-                    break
-                else:
-                    queue.append(successor_node)
+        if pruned:
+            pruned_nodes.append(node)
+
+        if heuristic.batched:
+            # All successors are evaluated at once, so the heuristic can share
+            # work between them.
+            heuristic_values = heuristic.evaluate_batch(successor_nodes)
+        else:
+            # Evaluate one successor at a time, so that no successor after
+            # the first improving one is evaluated.
+            heuristic_values = map(heuristic, successor_nodes)
+        for successor_node, heuristic_value in zip(successor_nodes, heuristic_values):
+            if heuristic_value == float("inf"):
+                continue
+            elif heuristic_value < best_heuristic_value:
+                # Just take the first successor node that has a lower
+                # heuristic value than the current best_heuristic_value
+                # and ignore the other successor nodes.
+                logging.debug(
+                    "Found new best h: %f after %d expansions"
+                    % (heuristic_value, iteration)
+                )
+                queue.clear()
+                closed.clear()
+                pruned_nodes = []
+                prune = use_preferred_ops
+                best_heuristic_value = heuristic_value
+                queue.append(successor_node)
+                break
+            else:
+                queue.append(successor_node)
 
 
 
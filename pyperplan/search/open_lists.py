@@ -0,0 +1,224 @@
+#
+# This file is part of pyperplan.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+#
+
+"""
+Open lists for the best-first searches in a_star.py
+"""
+
+from collections import deque
+import heapq
+import math
+import sys
+
+
+# The names of the open lists that make_open_list knows.
+OPEN_LISTS = ["heap", "bucket", "bucket-lifo"]
+
+# The lowest h value of an f bucket without nodes.
+_NO_H = sys.maxsize
+
+
+class HeapOpenList:
+    """
+    A binary heap of the entries that make_open_entry creates, e.g.
+    (f, h, tiebreaker, node) tuples. Nodes with the same f and h values are
+    popped in the order in which they were pushed.
+    """
+
+    def __init__(self, make_open_entry):
+        """
+        @param make_open_entry: A function like a_star.ordered_node_astar
+                                that creates the entry of a node from the
+                                node, its h value and a tiebreaker.
+        """
+        self.make_open_entry = make_open_entry
+        self.heap = []
+        self.tiebreaker = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, node, h):
+        self.tiebreaker += 1
+        heapq.heappush(self.heap, self.make_open_entry(node, h, self.tiebreaker))
+
+    def pop(self):
+        """Removes the node with the lowest entry and returns (h, node)."""
+        _, h, _, node = heapq.heappop(self.heap)
+        return h, node
+
+
+class BucketOpenList:
+    """
+    A two-level bucket open list for integer f and h values, where
+    f = g_weight * g + h_weight * h. The nodes are stored in one bucket per
+    f value and, within it, one bucket per h value, so pushing is O(1) and
+    popping only has to skip empty buckets. Nodes with the same f and h
+    values are popped first in first out (like HeapOpenList) or, with lifo,
+    last in first out.
+    """
+
+    def __init__(self, g_weight=1, h_weight=1, lifo=False):
+        """
+        @param g_weight: The weight of the g value in f (0 for greedy
+                         best-first search).
+        @param h_weight: The weight of the h value in f.
+        @param lifo: Pop the most recently pushed node of a bucket first.
+        """
+        self.g_weight = g_weight
+        self.h_weight = h_weight
+        self.lifo = lifo
+        # buckets[f][h] is a list (lifo) or a deque of nodes.
+        self.buckets = []
+        # min_h[f] is a lower bound of the lowest non-empty h bucket of f
+        # or _NO_H.
+        self.min_h = []
+        self.min_f = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def push(self, node, h):
+        f = self.g_weight * node.g + self.h_weight * h
+        if not (math.isfinite(f) and math.isfinite(h)) or f != int(f) or h != int(h):
+            raise ValueError(
+                "A bucket open list needs finite integer f and h values, "
+                f"got f={f}, h={h}"
+            )
+        f = int(f)
+        h = int(h)
+        buckets = self.buckets
+        if f >= len(buckets):
+            buckets.extend([] for _ in range(f + 1 - len(buckets)))
+            self.min_h.extend(_NO_H for _ in range(f + 1 - len(self.min_h)))
+        h_buckets = buckets[f]
+        if h >= len(h_buckets):
+            new_bucket = list if self.lifo else deque
+            h_buckets.extend(new_bucket() for _ in range(h + 1 - len(h_buckets)))
+        h_buckets[h].append(node)
+        if not self.size or f < self.min_f:
+            self.min_f = f
+        if h < self.min_h[f]:
+            self.min_h[f] = h
+        self.size += 1
+
+    def pop(self):
+        """
+        Removes a node with the lowest f value and, among those, the lowest
+        h value and returns (h, node).
+        """
+        if not self.size:
+            raise IndexError("pop from an empty open list")
+        f = self.min_f
+        h_buckets = self.buckets[f]
+        h = self.min_h[f]
+        while h >= len(h_buckets) or not h_buckets[h]:
+            h += 1
+            if h >= len(h_buckets):
+                # The bucket of f is empty.
+                self.min_h[f] = _NO_H
+                f += 1
+                h_buckets = self.buckets[f]
+                h = self.min_h[f]
+        self.min_f = f
+        self.min_h[f] = h
+        self.size -= 1
+        if self.lifo:
+            return h, h_buckets[h].pop()
+        return h, h_buckets[h].popleft()
+
+
+class AlternationOpenList:
+    """
+    Alternates between an open list of all nodes and an open list of the
+    nodes that were reached with a preferred operator, like the alternation
+    open list of Fast Downward. Every list has a priority that grows by one
+    with each pop, and the non-empty list with the lowest priority is popped
+    (the list of all nodes on ties). boost() lowers the priority of the
+    preferred list, so the search follows preferred operators for a while
+    after it made progress. Since all nodes stay in the list of all nodes,
+    a search with this open list is as complete as without preferred
+    operators.
+
+    A preferred node is in both lists, so it may be popped twice. Searches
+    have to skip nodes that they already expanded.
+    """
+
+    def __init__(self, all_nodes, preferred_nodes, boost=1000):
+        """
+        @param all_nodes: An empty open list for all nodes.
+        @param preferred_nodes: An empty open list for the preferred nodes.
+        @param boost: The amount by which boost() lowers the priority of
+                      the preferred list.
+        """
+        self.open_lists = [all_nodes, preferred_nodes]
+        self.priorities = [0, 0]
+        self.boost_amount = boost
+
+    def __len__(self):
+        """The number of entries, which counts preferred nodes twice."""
+        return len(self.open_lists[0]) + len(self.open_lists[1])
+
+    def push(self, node, h, preferred=False):
+        self.open_lists[0].push(node, h)
+        if preferred:
+            self.open_lists[1].push(node, h)
+
+    def pop(self):
+        """Pops (h, node) from the list with the lowest priority."""
+        all_nodes, preferred_nodes = self.open_lists
+        if not preferred_nodes or (
+            all_nodes and self.priorities[0] <= self.priorities[1]
+        ):
+            index = 0
+        else:
+            index = 1
+        self.priorities[index] += 1
+        return self.open_lists[index].pop()
+
+    def boost(self):
+        self.priorities[1] -= self.boost_amount
+
+
+def make_open_list(
+    name, make_open_entry, g_weight=1, h_weight=1, preferred=False, boost=1000
+):
+    """
+    Creates an empty open list.
+
+    @param name: "heap", "bucket" or "bucket-lifo"
+    @param make_open_entry: The ordering of a heap open list.
+    @param g_weight: The weight of g in the f value of a bucket open list.
+    @param h_weight: The weight of h in the f value of a bucket open list.
+                     Both weights must give the same order as
+                     make_open_entry.
+    @param preferred: Return an AlternationOpenList of two open lists of
+                      this kind.
+    @param boost: The boost of the AlternationOpenList.
+    """
+    if preferred:
+        return AlternationOpenList(
+            make_open_list(name, make_open_entry, g_weight, h_weight),
+            make_open_list(name, make_open_entry, g_weight, h_weight),
+            boost,
+        )
+    if name == "heap":
+        return HeapOpenList(make_open_entry)
+    if name in ["bucket", "bucket-lifo"]:
+        return BucketOpenList(g_weight, h_weight, lifo=name == "bucket-lifo")
+    raise ValueError(f"Unknown open list {name!r}, choose from {OPEN_LISTS}")
@@ -0,0 +1,136 @@
+#
+# This file is part of pyperplan.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+#
+
+"""
+Runs the random walks of the random-walk searches in a pool of processes
+"""
+
+from collections import namedtuple
+import multiprocessing
+import random
+
+from . import searchspace
+
+
+# The outcome of a walk. "plan" contains the indices of the operators that
+# lead from the start state to the end of the walk. "restarted" is True if the
+# walk jumped back to the initial state of the task, in which case "plan"
+# starts there.
+WalkResult = namedtuple(
+    "WalkResult", ["plan", "h", "walk_len", "restarted", "goal_reached", "dead_end"]
+)
+
+# The task, heuristic and stop event of a worker process.
+_worker = {}
+
+
+def _init_worker(task, heuristic, stop_event):
+    _worker["task"] = task
+    _worker["heuristic"] = heuristic
+    _worker["stop_event"] = stop_event
+    _worker["op_indices"] = {op: index for index, op in enumerate(task.operators)}
+
+
+def _run_walk(job):
+    index, (walk, start_state, walk_args, seed) = job
+    task = _worker["task"]
+    heuristic = _worker["heuristic"]
+    stop_event = _worker["stop_event"]
+    random.seed(seed)
+    start = searchspace.make_root_node(start_state)
+    node, walk_len = walk(task, heuristic, start, *walk_args, stop_event=stop_event)
+    op_indices = _worker["op_indices"]
+    plan = [op_indices[op] for op in node.extract_solution()]
+    goal_reached = task.goal_reached(node.state)
+    if goal_reached:
+        stop_event.set()
+    return index, WalkResult(
+        plan,
+        heuristic(node),
+        walk_len,
+        node.parent is None and node is not start,
+        goal_reached,
+        next(task.get_applicable_operators(node.state), None) is None,
+    )
+
+
+class WalkPool:
+    """
+    A pool of worker processes that run random walks from a common start
+    state. Every worker receives the task and the heuristic once when it is
+    started. As soon as one walk reaches the goal, the other walks of the
+    same batch are stopped.
+    """
+
+    def __init__(self, task, heuristic, num_workers):
+        """
+        @param task: The task whose states are explored.
+        @param heuristic: The heuristic that guides the walks.
+        @param num_workers: The number of worker processes.
+        """
+        self.task = task
+        self.num_workers = num_workers
+        self.stop_event = multiprocessing.Event()
+        self.pool = multiprocessing.Pool(
+            num_workers,
+            initializer=_init_worker,
+            initargs=(task, heuristic, self.stop_event),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
+
+    def run_walks(self, walk, start_state, walk_args):
+        """
+        Run one walk per entry of walk_args in parallel.
+
+        @param walk: A walk function like a_star.random_walk. It is called
+                     with the task, the heuristic, a root node for
+                     start_state, the entry of walk_args and the keyword
+                     argument stop_event.
+        @param start_state: The state in which all walks start.
+        @param walk_args: A list with a tuple of further arguments per walk.
+        @return: A list with the WalkResult of each walk.
+        """
+        # The seeds are drawn in the main process, so a seeded search draws
+        # the same walks regardless of the scheduling of the workers.
+        jobs = [(walk, start_state, args, random.getrandbits(64)) for args in walk_args]
+        results = [None] * len(jobs)
+        for index, result in self.pool.imap_unordered(_run_walk, enumerate(jobs)):
+            results[index] = result
+        self.stop_event.clear()
+        return results
+
+    def make_node(self, start_node, result):
+        """
+        Returns the search node at the end of the walk with the given result
+        that started in start_node.
+        """
+        node = start_node
+        if result.restarted:
+            node = searchspace.make_root_node(self.task.initial_state)
+        for index in result.plan:
+            op = self.task.operators[index]
+            node = searchspace.make_child_node(node, op, op.apply(node.state))
+        return node
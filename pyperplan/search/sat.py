@@ -121,6 +121,8 @@ def sat_solve(task, max_steps=HORIZON):
     Returns a list of operators or None if no valid plan could be found
     with <= 'HORIZON' steps
     """
+    # The encoding works on fact names, so bitset tasks are translated back.
+    task = task.get_set_task()
     logging.info(f"Maximum number of plan steps: {max_steps}")
     for horizon in range(max_steps + 1):
         logging.info(f"Horizon: {horizon}")
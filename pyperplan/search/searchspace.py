@@ -19,6 +19,11 @@
 Building the search node and associated methods
 """
 
+from array import array
+from contextlib import contextmanager
+
+from .state_registry import DictStateRegistry
+
 
 class SearchNode:
     """
@@ -26,8 +31,14 @@ class SearchNode:
     search space for planning algorithms. Each node links to is parent
     node and contains informations about the state, action to arrive
     the node and the path length in the count of applied operators.
+
+    Nodes use __slots__ to avoid a __dict__ per instance. The "unreached"
+    slot is reserved for the landmark heuristic and the "relaxed_plan" slot
+    for the hFF heuristic.
     """
 
+    __slots__ = ("state", "parent", "action", "g", "unreached", "relaxed_plan")
+
     def __init__(self, state, parent, action, g):
         """
         Construct a search node
@@ -74,3 +85,120 @@ def make_child_node(parent_node, action, state):
     The g-value is set to the parents g-value + 1.
     """
     return SearchNode(state, parent_node, action, parent_node.g + 1)
+
+
+@contextmanager
+def keep_relaxed_plans(heuristic, keep=True):
+    """
+    Lets the hFF heuristic keep the relaxed plan of every node that it
+    evaluates within the with block (see hFFHeuristic.keep_relaxed_plans)
+    and restores its previous setting afterwards.
+
+    @param keep: If False, the heuristic is left as it is.
+    """
+    if not keep:
+        yield
+        return
+    previous = heuristic.keep_relaxed_plans
+    heuristic.keep_relaxed_plans = True
+    try:
+        yield
+    finally:
+        heuristic.keep_relaxed_plans = previous
+
+
+class NodeStore:
+    """
+    The NodeStore is a compact alternative to linked SearchNode objects. A
+    node is an integer index into parallel array.array columns that hold the
+    index of the node's state, its parent node, its action and its g-value.
+    States and actions are interned once and shared by all nodes that refer
+    to them.
+    """
+
+    def __init__(self, state_registry=None):
+        """
+        @param state_registry: The registry that interns the states, e.g., a
+                               state_registry.StateRegistry for the task. By
+                               default the states are kept in a dict.
+        """
+        if state_registry is None:
+            state_registry = DictStateRegistry()
+        self.state_registry = state_registry
+        self.actions = []
+        self.action_ids = {}
+        self.node_states = array("i")
+        self.parents = array("i")
+        self.node_actions = array("i")
+        self.g = array("i")
+
+    def __len__(self):
+        return len(self.node_states)
+
+    def _intern_action(self, action):
+        action_id = self.action_ids.get(action)
+        if action_id is None:
+            action_id = len(self.actions)
+            self.actions.append(action)
+            self.action_ids[action] = action_id
+        return action_id
+
+    def _add_node(self, state_id, parent, action_id, g):
+        self.node_states.append(state_id)
+        self.parents.append(parent)
+        self.node_actions.append(action_id)
+        self.g.append(g)
+        return len(self.node_states) - 1
+
+    def make_root_node(self, initial_state):
+        """
+        Store a root node without parent and action and with g-value zero.
+
+        @param initial_state: The initial state of the search space.
+        @return: The index of the new node.
+        """
+        state_id, _ = self.state_registry.insert(initial_state)
+        return self._add_node(state_id, -1, -1, 0)
+
+    def make_child_node(self, parent, action, state):
+        """
+        Store a node for "state" that is reached by applying "action" in the
+        node with index "parent". The g-value is the parent's g-value + 1.
+
+        @return: The index of the new node.
+        """
+        state_id, _ = self.state_registry.insert(state)
+        action_id = self._intern_action(action)
+        return self._add_node(state_id, parent, action_id, self.g[parent] + 1)
+
+    def make_new_child_node(self, parent, action, state):
+        """
+        Like make_child_node, but only store the node if no node for "state"
+        has been stored before.
+
+        @return: The index of the new node or None if "state" is known.
+        """
+        state_id, inserted = self.state_registry.insert(state)
+        if not inserted:
+            return None
+        action_id = self._intern_action(action)
+        return self._add_node(state_id, parent, action_id, self.g[parent] + 1)
+
+    def contains_state(self, state):
+        """Returns True iff a node for "state" has been stored."""
+        return self.state_registry.lookup(state) is not None
+
+    def get_state(self, node):
+        return self.state_registry.get_state(self.node_states[node])
+
+    def extract_solution(self, node):
+        """
+        Returns the list of actions that were applied from the root node to
+        the node with index "node".
+        """
+        solution = []
+        while self.parents[node] != -1:
+            solution.append(self.actions[self.node_actions[node]])
+            node = self.parents[node]
+        solution.reverse()
+        return solution
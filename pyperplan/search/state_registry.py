@@ -0,0 +1,179 @@
+#
+# This file is part of pyperplan.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+#
+
+"""
+Registries that intern states and hand out consecutive integer state IDs
+"""
+
+from array import array
+
+
+class DictStateRegistry:
+    """
+    Interns arbitrary hashable states with a dict. Every state is kept as
+    the Python object that was inserted.
+    """
+
+    def __init__(self):
+        self.states = []
+        self.state_ids = {}
+
+    def __len__(self):
+        return len(self.states)
+
+    def insert(self, state):
+        """
+        Intern "state" unless it is already known.
+
+        @return: A pair (state_id, inserted) where "inserted" is True iff the
+                 state has not been stored before.
+        """
+        state_id = self.state_ids.get(state)
+        if state_id is not None:
+            return state_id, False
+        state_id = len(self.states)
+        self.states.append(state)
+        self.state_ids[state] = state_id
+        return state_id, True
+
+    def lookup(self, state):
+        """Returns the ID of "state" or None if it has not been stored."""
+        return self.state_ids.get(state)
+
+    def get_state(self, state_id):
+        return self.states[state_id]
+
+
+class StateRegistry:
+    """
+    Interns the states of a task into one packed byte buffer.
+
+    A state is stored as a bitmask over the task's facts with as many bytes as
+    its highest fact needs. The bytes of all states are concatenated in a
+    bytearray and an offset column marks where each state starts. States of a
+    task.BitsetTask (and other int states) are stored directly. State IDs are
+    looked up in an open-addressing hash table that is an array of IDs, so the
+    registry keeps no Python object per state.
+    """
+
+    _EMPTY = -1
+
+    def __init__(self, task):
+        """
+        @param task: The task whose states are stored. Its states must either
+                     be ints or collections of facts from task.facts and
+                     task.initial_state.
+        """
+        if isinstance(task.initial_state, int):
+            self.fact_bits = None
+            self.facts = None
+        else:
+            self.facts = sorted(set(task.facts) | set(task.initial_state))
+            self.fact_bits = {fact: 1 << index for index, fact in enumerate(self.facts)}
+        self.buffer = bytearray()
+        self.offsets = array("Q", [0])
+        self.hashes = array("q")
+        self.table = array("q", [self._EMPTY]) * 8
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def _pack(self, state):
+        if self.fact_bits is None:
+            mask = state
+        else:
+            fact_bits = self.fact_bits
+            mask = 0
+            for fact in state:
+                mask |= fact_bits[fact]
+        return mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+
+    def _unpack(self, packed):
+        mask = int.from_bytes(packed, "little")
+        if self.facts is None:
+            return mask
+        bits = bin(mask)[:1:-1]
+        facts = self.facts
+        return frozenset(facts[index] for index, bit in enumerate(bits) if bit == "1")
+
+    def _get_packed(self, state_id):
+        return self.buffer[self.offsets[state_id] : self.offsets[state_id + 1]]
+
+    def _find_slot(self, packed, packed_hash):
+        """
+        Returns the index of the table slot that holds "packed" or of the
+        empty slot where it belongs.
+        """
+        table = self.table
+        hashes = self.hashes
+        mask = len(table) - 1
+        slot = packed_hash & mask
+        while True:
+            state_id = table[slot]
+            if state_id == self._EMPTY:
+                return slot
+            if hashes[state_id] == packed_hash and self._get_packed(state_id) == packed:
+                return slot
+            slot = (slot + 1) & mask
+
+    def _grow_table(self):
+        size = 2 * len(self.table)
+        self.table = table = array("q", [self._EMPTY]) * size
+        mask = size - 1
+        for state_id, packed_hash in enumerate(self.hashes):
+            slot = packed_hash & mask
+            while table[slot] != self._EMPTY:
+                slot = (slot + 1) & mask
+            table[slot] = state_id
+
+    def insert(self, state):
+        """
+        Intern "state" unless it is already known.
+
+        @return: A pair (state_id, inserted) where "inserted" is True iff the
+                 state has not been stored before.
+        """
+        packed = self._pack(state)
+        packed_hash = hash(packed)
+        slot = self._find_slot(packed, packed_hash)
+        state_id = self.table[slot]
+        if state_id != self._EMPTY:
+            return state_id, False
+        state_id = len(self.hashes)
+        self.buffer += packed
+        self.offsets.append(len(self.buffer))
+        self.hashes.append(packed_hash)
+        self.table[slot] = state_id
+        # Keep the load factor of the table below one half.
+        if 2 * len(self.hashes) > len(self.table):
+            self._grow_table()
+        return state_id, True
+
+    def lookup(self, state):
+        """Returns the ID of "state" or None if it has not been stored."""
+        packed = self._pack(state)
+        state_id = self.table[self._find_slot(packed, hash(packed))]
+        if state_id == self._EMPTY:
+            return None
+        return state_id
+
+    def get_state(self, state_id):
+        """
+        Returns the state with the given ID in the representation of the
+        task, i.e., as an int or as a frozenset of facts.
+        """
+        return self._unpack(self._get_packed(state_id))
@@ -19,6 +19,9 @@
 Classes for representing a STRIPS planning task
 """
 
+from collections import Counter, defaultdict
+import random
+
 
 class Operator:
     """
@@ -106,6 +109,7 @@ class Task:
         self.initial_state = initial_state
         self.goals = goals
         self.operators = operators
+        self.successor_generator = self._get_successor_generator()
 
     def goal_reached(self, state):
         """
@@ -116,13 +120,49 @@ class Task:
         """
         return self.goals <= state
 
+    def get_facts(self, state):
+        """
+        @return The set of fact names that are true in "state". States of
+                this task already are sets of fact names.
+        """
+        return state
+
+    def get_set_task(self):
+        """
+        @return An equivalent task whose states are sets of fact names.
+        """
+        return self
+
     def get_successor_states(self, state):
         """
         @return A list with (op, new_state) pairs where "op" is the applicable
         operator and "new_state" the state that results when "op" is applied
         in state "state".
         """
-        return [(op, op.apply(state)) for op in self.operators if op.applicable(state)]
+        return [
+            (op, op.apply(state))
+            for op in self.successor_generator.get_applicable_operators(state)
+        ]
+
+    def get_applicable_operators(self, state):
+        """
+        Yields the operators that are applicable in "state" in the order of
+        the operator list without computing their successor states.
+        """
+        yield from self.successor_generator.get_applicable_operators(state)
+
+    def sample_applicable_operator(self, state):
+        """
+        @return An operator drawn uniformly at random from the operators that
+                are applicable in "state", or None if there is none
+        """
+        operators = self.successor_generator.get_applicable_operators(state)
+        if not operators:
+            return None
+        return random.choice(operators)
+
+    def _get_successor_generator(self):
+        return SuccessorGenerator(self.operators)
 
     def __str__(self):
         s = "Task {0}\n  Vars:  {1}\n  Init:  {2}\n  Goals: {3}\n  Ops:   {4}"
@@ -137,3 +177,207 @@ class Task:
     def __repr__(self):
         string = "<Task {0}, vars: {1}, operators: {2}>"
         return string.format(self.name, len(self.facts), len(self.operators))
+
+
+class BitsetOperator(Operator):
+    """
+    An operator of a BitsetTask. The preconditions, add_effects and
+    del_effects are Python ints where bit i is set iff the i-th fact of the
+    task belongs to the set.
+    """
+
+    def __init__(self, name, preconditions, add_effects, del_effects):
+        self.name = name
+        self.preconditions = preconditions
+        self.add_effects = add_effects
+        self.del_effects = del_effects
+
+    def applicable(self, state):
+        """
+        @return True if all precondition bits are set in "state",
+                False otherwise
+        """
+        return self.preconditions & ~state == 0
+
+    def apply(self, state):
+        """
+        Clears the delete effect bits and sets the add effect bits, so add
+        effects win over delete effects as in the set-based Operator.
+
+        @param state The state (an int) that the operator should be applied to
+        @return The successor state as an int
+        """
+        assert self.applicable(state)
+        return (state & ~self.del_effects) | self.add_effects
+
+    def __str__(self):
+        s = "%s\n" % self.name
+        for group, facts in [
+            ("PRE", self.preconditions),
+            ("ADD", self.add_effects),
+            ("DEL", self.del_effects),
+        ]:
+            s += f"  {group}: {facts:b}\n"
+        return s
+
+
+class BitsetTask(Task):
+    """
+    A STRIPS planning task whose states, goals and operators are stored as
+    Python int bitmasks instead of sets of fact names.
+    """
+
+    def __init__(self, name, facts, initial_state, goals, operators):
+        """
+        @param name The task's name
+        @param facts A sequence of fact names, the i-th fact corresponds to
+                     bit i of a state
+        @param initial_state An int with the bits of the initial facts set
+        @param goals An int with the bits of the goal facts set
+        @param operators A list of BitsetOperator instances
+        """
+        super().__init__(name, tuple(facts), initial_state, goals, operators)
+        self._set_task = None
+
+    def goal_reached(self, state):
+        """
+        @return True if all goal bits are set in "state", False otherwise
+        """
+        return self.goals & ~state == 0
+
+    def _get_successor_generator(self):
+        return BitsetSuccessorGenerator(self.operators)
+
+    def get_facts(self, state):
+        """
+        @return A frozenset with the names of the facts whose bits are set in
+                "state" (or in any other bitmask of this task)
+        """
+        bits = bin(state)[:1:-1]
+        return frozenset(
+            self.facts[index] for index, bit in enumerate(bits) if bit == "1"
+        )
+
+    def get_state(self, facts):
+        """
+        @return The bitmask representing the given fact names
+        """
+        index = {fact: position for position, fact in enumerate(self.facts)}
+        state = 0
+        for fact in facts:
+            state |= 1 << index[fact]
+        return state
+
+    def get_set_task(self):
+        """
+        Heuristics and the SAT encoding work on fact names. They use this
+        equivalent set-based task, whose operators have the same names and
+        order as the operators of this task.
+        """
+        if self._set_task is None:
+            operators = [
+                Operator(
+                    op.name,
+                    self.get_facts(op.preconditions),
+                    self.get_facts(op.add_effects),
+                    self.get_facts(op.del_effects),
+                )
+                for op in self.operators
+            ]
+            self._set_task = Task(
+                self.name,
+                set(self.facts),
+                self.get_facts(self.initial_state),
+                self.get_facts(self.goals),
+                operators,
+            )
+        return self._set_task
+
+    def __str__(self):
+        return str(self.get_set_task())
+
+
+class SuccessorGenerator:
+    """
+    Index for finding the applicable operators of a state without testing
+    every operator.
+
+    Each operator "watches" one of its preconditions, the one that occurs in
+    the fewest preconditions of all operators. An operator is only tested for
+    applicability if its watched fact is true in the state. Operators without
+    preconditions are always tested.
+    """
+
+    def __init__(self, operators):
+        """
+        @param operators The list of operators of the task
+        """
+        self.operators = operators
+        self.unconditional = []
+        self.watchers = defaultdict(list)
+        facts = [self.get_precondition_facts(op) for op in operators]
+        counts = Counter(fact for op_facts in facts for fact in op_facts)
+        for index, op_facts in enumerate(facts):
+            if op_facts:
+                watched = min(op_facts, key=lambda fact: (counts[fact], fact))
+                self.watchers[watched].append(index)
+            else:
+                self.unconditional.append(index)
+        self.watchers = dict(self.watchers)
+
+    def get_precondition_facts(self, op):
+        return op.preconditions
+
+    def get_candidates(self, state):
+        """
+        @return The indices of all operators whose watched fact is true in
+                "state" and of all operators without preconditions
+        """
+        candidates = list(self.unconditional)
+        watchers = self.watchers
+        for fact in state:
+            indices = watchers.get(fact)
+            if indices is not None:
+                candidates.extend(indices)
+        return candidates
+
+    def get_applicable_operators(self, state):
+        """
+        @return A list of the operators that are applicable in "state" in the
+                same order as in the task's operator list
+        """
+        operators = self.operators
+        indices = [
+            index
+            for index in self.get_candidates(state)
+            if operators[index].applicable(state)
+        ]
+        indices.sort()
+        return [operators[index] for index in indices]
+
+
+class BitsetSuccessorGenerator(SuccessorGenerator):
+    """
+    SuccessorGenerator for the BitsetOperators of a BitsetTask. The watched
+    facts are single-bit masks.
+    """
+
+    def __init__(self, operators):
+        super().__init__(operators)
+        self.watchers = list(self.watchers.items())
+
+    def get_precondition_facts(self, op):
+        mask = op.preconditions
+        bits = []
+        while mask:
+            bit = mask & -mask
+            bits.append(bit)
+            mask ^= bit
+        return bits
+
+    def get_candidates(self, state):
+        candidates = list(self.unconditional)
+        for bit, indices in self.watchers:
+            if state & bit:
+                candidates.extend(indices)
+        return candidates
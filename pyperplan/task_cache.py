@@ -0,0 +1,235 @@
+#
+# This file is part of pyperplan.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>
+#
+
+"""
+A persistent cache of grounded tasks in a compact binary format
+"""
+
+from array import array
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+from .task import BitsetOperator, BitsetTask, Operator, Task
+
+
+MAGIC = b"PYPLTASK"
+VERSION = 1
+
+# magic, version, byte order, is bitset task, number of facts, number of
+# facts of task.facts, number of operators, number of initial facts, number
+# of goals, number of operator fact indices, length of the names in bytes
+HEADER = struct.Struct("<8sIIIIIIIIII")
+LITTLE_ENDIAN = 1
+BIG_ENDIAN = 2
+
+
+def task_key(domain_file, problem_file, options):
+    """
+    Returns a hex digest of the contents of both files, the grounding options
+    and the version of the file format.
+
+    @param options  A dict with the grounding options
+    """
+    digest = hashlib.sha256()
+    digest.update(b"%s %d\0" % (MAGIC, VERSION))
+    for filename in [domain_file, problem_file]:
+        with open(filename, "rb") as file:
+            content = file.read()
+        digest.update(b"%d\0" % len(content))
+        digest.update(content)
+    digest.update(repr(sorted(options.items())).encode())
+    return digest.hexdigest()
+
+
+def write_task(task, filename):
+    """
+    Writes a task.Task or task.BitsetTask to a file.
+
+    The file starts with the header, followed by the task name, the fact
+    names and the operator names, separated by newlines. Then come uint32
+    arrays with the fact indices of the initial state and the goals, the
+    offsets of the preconditions, add and delete effects of each operator,
+    and their fact indices. The arrays are 4-byte aligned and use the
+    machine's byte order, so they can be memory-mapped.
+    """
+    if isinstance(task, BitsetTask):
+        facts = list(task.facts)
+        num_task_facts = len(facts)
+
+        def get_indices(mask):
+            return [index for index, bit in enumerate(bin(mask)[:1:-1]) if bit == "1"]
+
+    else:
+        facts = sorted(task.facts)
+        num_task_facts = len(facts)
+        facts += sorted(set(task.initial_state) - set(task.facts))
+        fact_index = {fact: index for index, fact in enumerate(facts)}
+
+        def get_indices(fact_set):
+            return sorted(fact_index[fact] for fact in fact_set)
+
+    offsets = array("I", [0])
+    indices = array("I")
+    for op in task.operators:
+        for part in [op.preconditions, op.add_effects, op.del_effects]:
+            indices.extend(get_indices(part))
+            offsets.append(len(indices))
+    init = array("I", get_indices(task.initial_state))
+    goals = array("I", get_indices(task.goals))
+
+    names = "\n".join([task.name] + facts + [op.name for op in task.operators])
+    names = names.encode("utf-8")
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        LITTLE_ENDIAN if sys.byteorder == "little" else BIG_ENDIAN,
+        isinstance(task, BitsetTask),
+        len(facts),
+        num_task_facts,
+        len(task.operators),
+        len(init),
+        len(goals),
+        len(indices),
+        len(names),
+    )
+    padding = -(HEADER.size + len(names)) % 4
+    with open(filename, "wb") as file:
+        file.write(header)
+        file.write(names)
+        file.write(b"\0" * padding)
+        for values in [init, goals, offsets, indices]:
+            values.tofile(file)
+
+
+def read_task(filename):
+    """
+    Reads a task that was written by write_task.
+
+    @return The task or None if the file is not a task file of this version
+    """
+    if os.path.getsize(filename) < HEADER.size:
+        return None
+    with open(filename, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            (
+                magic,
+                version,
+                byte_order,
+                is_bitset_task,
+                num_facts,
+                num_task_facts,
+                num_operators,
+                num_init,
+                num_goals,
+                num_indices,
+                names_length,
+            ) = HEADER.unpack_from(buffer)
+            if magic != MAGIC or version != VERSION:
+                return None
+            start = HEADER.size
+            names = buffer[start : start + names_length].decode("utf-8")
+            start += names_length + (-(HEADER.size + names_length) % 4)
+            num_values = num_init + num_goals + 3 * num_operators + 1 + num_indices
+            values = array("I")
+            values.frombytes(buffer[start : start + 4 * num_values])
+    native = LITTLE_ENDIAN if sys.byteorder == "little" else BIG_ENDIAN
+    if byte_order != native:
+        values.byteswap()
+    values = values.tolist()
+
+    names = names.split("\n")
+    name = names[0]
+    facts = names[1 : 1 + num_facts]
+    operator_names = names[1 + num_facts :]
+    init = values[:num_init]
+    goals = values[num_init : num_init + num_goals]
+    start = num_init + num_goals
+    offsets = values[start : start + 3 * num_operators + 1]
+    indices = values[start + 3 * num_operators + 1 :]
+
+    if is_bitset_task:
+        bits = [1 << index for index in range(num_facts)]
+
+        def get_facts(fact_indices):
+            return sum(bits[index] for index in fact_indices)
+
+        operator_class = BitsetOperator
+    else:
+
+        def get_facts(fact_indices):
+            return frozenset(facts[index] for index in fact_indices)
+
+        operator_class = Operator
+
+    operators = []
+    for op_index, op_name in enumerate(operator_names):
+        offset = 3 * op_index
+        operators.append(
+            operator_class(
+                op_name,
+                get_facts(indices[offsets[offset] : offsets[offset + 1]]),
+                get_facts(indices[offsets[offset + 1] : offsets[offset + 2]]),
+                get_facts(indices[offsets[offset + 2] : offsets[offset + 3]]),
+            )
+        )
+    if is_bitset_task:
+        return BitsetTask(name, facts, get_facts(init), get_facts(goals), operators)
+    return Task(
+        name,
+        set(facts[:num_task_facts]),
+        get_facts(init),
+        get_facts(goals),
+        operators,
+    )
+
+
+def load_task(cache_dir, domain_file, problem_file, options, ground_task):
+    """
+    Returns the grounded task of the given files from the cache. On a cache
+    miss, the task is grounded and stored.
+
+    @param cache_dir     The directory of the cache. It is created if needed.
+    @param options       A dict with the grounding options
+    @param ground_task   A callable without arguments that parses and grounds
+                         the task with the given options
+    """
+    key = task_key(domain_file, problem_file, options)
+    filename = os.path.join(cache_dir, key + ".task")
+    if os.path.isfile(filename):
+        task = read_task(filename)
+        if task is not None:
+            logging.info(f"Loaded grounded task from {filename}")
+            return task
+    task = ground_task()
+    os.makedirs(cache_dir, exist_ok=True)
+    # Write to a temporary file first, so parallel runs never read a
+    # partially written task.
+    handle, temp_filename = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    os.close(handle)
+    try:
+        write_task(task, temp_filename)
+        os.replace(temp_filename, filename)
+    except BaseException:
+        os.remove(temp_filename)
+        raise
+    logging.info(f"Stored grounded task in {filename}")
+    return task
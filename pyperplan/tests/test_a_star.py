@@ -1,4 +1,7 @@
+from pyperplan.heuristics.heuristic_base import Heuristic
 from pyperplan.search import a_star, searchspace
+from pyperplan.search.open_lists import HeapOpenList
+from pyperplan.task import Operator, Task
 
 from . import dummy_task
 
@@ -116,3 +119,31 @@ def test_astar_search4():
         a_star.astar_search(task4, h4, make_open_entry=a_star.ordered_node_astar)
         is None
     )
+
+
+class _TableHeuristic(Heuristic):
+    """An inconsistent heuristic that delays the expansion of a."""
+
+    h_values = {"s": 0, "a": 5, "b": 0, "c": 0, "m": 2, "g": 3}
+
+    def __call__(self, node):
+        (fact,) = node.state
+        return self.h_values[fact]
+
+
+def test_astar_search_reopened_parent():
+    """
+    The state m is first reached via b and c and later reopened with a
+    cheaper path via a. The plan follows the cheaper path.
+    """
+    edges = [("s", "a"), ("a", "m"), ("s", "b"), ("b", "c"), ("c", "m"), ("m", "g")]
+    operators = [Operator(f"{x}-{y}", {x}, {y}, {x}) for x, y in edges]
+    task = Task("reopen", set("sabcmg"), frozenset("s"), {"g"}, operators)
+    open_list = HeapOpenList(a_star.ordered_node_astar)
+    pushed = []
+    push = open_list.push
+    open_list.push = lambda node, h: pushed.append(node) or push(node, h)
+    plan = a_star.astar_search(task, _TableHeuristic(), open_list=open_list)
+    assert [op.name for op in plan] == ["s-a", "a-m", "m-g"]
+    # The nodes in the open list do not keep the paths to them alive.
+    assert all(node.parent is None for node in pushed)
@@ -0,0 +1,62 @@
+import os
+import shutil
+
+from pyperplan import grounding, planner
+from pyperplan.domain_cache import DomainCache
+from pyperplan.pddl.parser import Parser
+
+
+parcprinter = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "../../benchmarks/parcprinter"
+)
+
+
+def _domain_file(number):
+    return os.path.join(parcprinter, "domain%02d.pddl" % number)
+
+
+def test_same_content_is_parsed_once():
+    cache = DomainCache()
+    domain = cache.load(_domain_file(1))
+    # The parcprinter domain files of problems 1 and 2 have the same content.
+    assert cache.load(_domain_file(2)) is domain
+    assert cache.load(_domain_file(1)) is domain
+    assert (cache.hits, cache.misses) == (2, 1)
+    expected = Parser(_domain_file(1)).parse_domain()
+    assert domain.name == expected.name
+    assert sorted(domain.actions) == sorted(expected.actions)
+    assert sorted(domain.predicates) == sorted(expected.predicates)
+
+
+def test_changed_content_is_parsed_again(tmp_path):
+    domain_file = str(tmp_path / "domain.pddl")
+    shutil.copy(_domain_file(1), domain_file)
+    cache = DomainCache(max_size=1)
+    domain = cache.load(domain_file)
+    with open(domain_file, "a") as file:
+        file.write("; a comment\n")
+    assert cache.load(domain_file) is not domain
+    assert len(cache.domains) == 1
+
+
+def test_domain_cache_dir(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    domain = DomainCache().load(_domain_file(1), cache_dir)
+    assert len(os.listdir(cache_dir)) == 1
+    # A new cache (e.g. in a later process) loads the stored domain.
+    loaded = DomainCache().load(_domain_file(1), cache_dir)
+    assert loaded is not domain
+    assert sorted(loaded.actions) == sorted(domain.actions)
+    assert sorted(loaded.types) == sorted(domain.types)
+
+
+def test_shared_domain_is_not_modified():
+    problem_file = os.path.join(parcprinter, "task01.pddl")
+    task = planner.load_task(_domain_file(1), problem_file)
+    # The second problem grounds the cached domain of the first problem.
+    assert planner.load_task(_domain_file(1), problem_file).operators == (
+        task.operators
+    )
+    parser = Parser(_domain_file(1), problem_file)
+    problem = parser.parse_problem(parser.parse_domain())
+    assert grounding.ground(problem).operators == task.operators
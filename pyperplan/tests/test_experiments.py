@@ -0,0 +1,85 @@
+import json
+import os
+
+import pytest
+
+from pyperplan.experiments import find_problems, make_runs, Run, run_experiment
+
+
+blocks_dir = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "../../benchmarks/blocks"
+)
+
+
+def test_find_problems():
+    problems = find_problems(blocks_dir, 2, 3)
+    assert [os.path.basename(problem) for problem in problems] == [
+        "task02.pddl",
+        "task03.pddl",
+        "task04.pddl",
+    ]
+    assert len(find_problems(blocks_dir)) == len(find_problems(blocks_dir, 1))
+    with pytest.raises(ValueError):
+        find_problems(blocks_dir, 1, 1000)
+
+
+def test_make_runs():
+    problems = find_problems(blocks_dir, 1, 2)
+    runs = make_runs(problems, ["gbf:hff", "bfs:hff"], [0, 1])
+    assert len(runs) == 8
+    assert runs[0] == Run(
+        os.path.join(os.path.dirname(problems[0]), "domain.pddl"),
+        problems[0],
+        "gbf",
+        "hff",
+        0,
+    )
+    # The runs of a problem are adjacent and blind searches get no heuristic.
+    assert [run.problem_file for run in runs] == [problems[0]] * 4 + [problems[1]] * 4
+    assert runs[2].heuristic is None
+    with pytest.raises(ValueError):
+        make_runs(problems, ["gbf:unknown"], [0])
+
+
+def test_run_experiment(tmp_path):
+    results_file = str(tmp_path / "results.jsonl")
+    runs = make_runs(find_problems(blocks_dir, 1, 2), ["gbf:hff", "mcrw:hff"], [0, 1])
+    results = run_experiment(runs, results_file, num_jobs=2, time_limit=60)
+    assert [result["seed"] for result in results] == [run.seed for run in runs]
+    assert all(result["status"] == "solved" for result in results)
+    assert all(result["expansions"] is not None for result in results)
+    assert len(results[0]["plan"]) == results[0]["plan_length"]
+    with open(results_file) as file:
+        written = [json.loads(line) for line in file]
+    assert sorted(written, key=results.index) == results
+
+    # Runs with the same seed find the same plan.
+    repeated = run_experiment(runs[2:3], num_jobs=1)
+    assert repeated[0]["plan"] == results[2]["plan"]
+
+
+def test_run_experiment_time_limit():
+    runs = make_runs([find_problems(blocks_dir, 15, 1)[0]], ["bfs"], [0])
+    (result,) = run_experiment(runs, time_limit=1)
+    assert result["status"] == "timeout"
+
+
+def test_runs_per_process():
+    runs = make_runs(find_problems(blocks_dir, 1, 1), ["mcrw:hff"], [0, 1, 2])
+    separate = run_experiment(runs, num_jobs=1)
+    shared = run_experiment(runs, num_jobs=1, runs_per_process=3)
+    assert [result["plan"] for result in shared] == [
+        result["plan"] for result in separate
+    ]
+
+    # After a timeout, the remaining runs of the batch get a new process.
+    runs = make_runs(find_problems(blocks_dir, 15, 1), ["bfs"], [0, 1])
+    results = run_experiment(runs, time_limit=1, runs_per_process=2)
+    assert [result["status"] for result in results] == ["timeout", "timeout"]
+
+
+def test_run_experiment_walk_workers():
+    # The walk pool of the run needs a process that may have children.
+    runs = make_runs(find_problems(blocks_dir, 1, 1), ["mcrw:hff", "ehrws:hff"], [0])
+    results = run_experiment(runs, num_workers=2, time_limit=60)
+    assert [result["status"] for result in results] == ["solved", "solved"]
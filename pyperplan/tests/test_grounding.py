@@ -1,4 +1,6 @@
 # from grounding import Grounder
+import os
+
 from pyperplan import grounding
 from pyperplan.pddl.parser import Parser
 from pyperplan.pddl.pddl import Action, Domain, Effect, Predicate, Problem, Type
@@ -314,6 +316,16 @@ def test_operators():
         assert any(op.name == operator for op in grounded_operators)
 
 
+def test_get_static_index():
+    index = grounding._get_static_index({"(road a ab)", "(road ab c)", "(clear)"})
+    assert index == {
+        ("road", 0, "a"),
+        ("road", 1, "ab"),
+        ("road", 0, "ab"),
+        ("road", 1, "c"),
+    }
+
+
 def test_create_operator():
     statics = grounding._get_statics(
         standard_domain.predicates.values(), [action_drive_car]
@@ -359,6 +371,21 @@ def test_ground():
         assert not any(dee.startswith("car_color") for dee in operators.del_effects)
 
 
+def test_ground_bitsets():
+    task = grounding.ground(standard_problem)
+    bitset_task = grounding.ground(standard_problem, use_bitsets=True)
+
+    assert set(bitset_task.facts) == task.facts | task.initial_state
+    assert bitset_task.get_facts(bitset_task.initial_state) == task.initial_state
+    assert bitset_task.get_facts(bitset_task.goals) == task.goals
+    assert len(bitset_task.operators) == len(task.operators)
+    for op, bitset_op in zip(task.operators, bitset_task.operators):
+        assert bitset_op.name == op.name
+        assert bitset_task.get_facts(bitset_op.preconditions) == op.preconditions
+        assert bitset_task.get_facts(bitset_op.add_effects) == op.add_effects
+        assert bitset_task.get_facts(bitset_op.del_effects) == op.del_effects
+
+
 def test_regression():
     parser = Parser("")
 
@@ -600,3 +627,108 @@ def test_add_del_effects():
         assert op.preconditions == pre_exp
         assert op.add_effects == add_exp
         assert op.del_effects == del_exp
+
+
+def test_join_grounding():
+    parser = Parser("")
+
+    def parse_problem(domain, problem):
+        parser.domInput = domain
+        parser.probInput = problem
+        domain = parser.parse_domain(False)
+        return parser.parse_problem(domain, False)
+
+    dom_pddl = """
+    (define (domain roads)
+      (:requirements :typing)
+      (:types place token)
+      (:predicates (at ?p - place) (road ?from ?to - place) (holding ?t - token))
+      (:action move
+       :parameters (?from ?to - place)
+       :precondition (and (at ?from) (road ?from ?to))
+       :effect (and (at ?to) (not (at ?from))))
+      (:action take
+       :parameters (?p - place ?t - token)
+       :precondition (and (at ?p))
+       :effect (and (holding ?t)))
+    )
+    """
+
+    prob_pddl = """
+    (define (problem prob)
+      (:domain roads)
+      (:objects a b c d e - place t - token)
+      (:init (at a) (road a b) (road b c) (road d e) (road e a))
+      (:goal (at c)))
+    """
+
+    product = grounding.ground(
+        parse_problem(dom_pddl, prob_pddl),
+        True,
+        False,
+        remove_unreachable_operators=False,
+    )
+    join = grounding.ground(
+        parse_problem(dom_pddl, prob_pddl), True, False, join_grounding=True
+    )
+    # d and e cannot be reached from a.
+    assert {op.name for op in product.operators} == {
+        "(move a b)",
+        "(move b c)",
+        "(move d e)",
+        "(move e a)",
+    } | {f"(take {place} t)" for place in "abcde"}
+    assert {op.name for op in join.operators} == {
+        "(move a b)",
+        "(move b c)",
+        "(take a t)",
+        "(take b t)",
+        "(take c t)",
+    }
+    reachable = {op.name for op in join.operators}
+    assert set(join.operators) == {
+        op for op in product.operators if op.name in reachable
+    }
+
+    # The reachability analysis removes the same operators.
+    reachable_product = grounding.ground(
+        parse_problem(dom_pddl, prob_pddl), True, False
+    )
+    assert set(reachable_product.operators) == set(join.operators)
+
+
+def test_reachability_analysis():
+    op1 = Operator("op1", {"a"}, {"b"}, set())
+    op2 = Operator("op2", {"b"}, {"c"}, {"a"})
+    op3 = Operator("op3", {"c", "d"}, {"e"}, set())
+    op4 = Operator("op4", set(), {"d"}, set())
+    op5 = Operator("op5", {"e", "f"}, {"g"}, set())
+    operators = [op1, op2, op3, op4, op5]
+    assert grounding._reachability_analysis(operators, {"a"}) == operators[:4]
+    assert grounding._reachability_analysis(operators, {"f"}) == [op4]
+
+
+def test_relevance_analysis():
+    # A chain that the goal reaches backwards through all operators.
+    chain = [Operator(f"op{i}", {f"f{i}"}, {f"f{i + 1}"}, set()) for i in range(50)]
+    side = Operator("side", {"f0"}, {"x", "f3"}, {"y"})
+    useless = Operator("useless", {"f1"}, {"z"}, set())
+    operators = grounding._relevance_analysis(chain + [side, useless], {"f50"})
+    assert operators == chain + [side]
+    assert side.add_effects == {"f3"}
+    assert side.del_effects == set()
+
+
+def test_parallel_grounding():
+    benchmarks = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "../../benchmarks"
+    )
+    problem_file = os.path.join(benchmarks, "depot", "task01.pddl")
+    parser = Parser(os.path.join(benchmarks, "depot", "domain.pddl"), problem_file)
+    problem = parser.parse_problem(parser.parse_domain())
+    sequential = grounding.ground(problem)
+    parallel = grounding.ground(problem, num_workers=3)
+    # The operators are equal and in the same order.
+    assert parallel.operators == sequential.operators
+    assert parallel.facts == sequential.facts
+    assert parallel.initial_state == sequential.initial_state
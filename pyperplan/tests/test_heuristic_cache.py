@@ -0,0 +1,63 @@
+from pyperplan.heuristics.heuristic_base import Heuristic
+from pyperplan.heuristics.heuristic_cache import HeuristicCache
+from pyperplan.search.searchspace import make_child_node, make_root_node
+
+
+class CountingHeuristic(Heuristic):
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, node):
+        self.calls += 1
+        return node.state
+
+
+class PathHeuristic(CountingHeuristic):
+    path_dependent = True
+
+    def __call__(self, node):
+        self.calls += 1
+        return node.g
+
+
+def test_cache_hits_and_misses():
+    heuristic = CountingHeuristic()
+    cache = HeuristicCache(heuristic)
+    for state in [1, 2, 1, 1, 3, 2]:
+        assert cache(make_root_node(state)) == state
+    assert heuristic.calls == 3
+    assert (cache.hits, cache.misses) == (3, 3)
+
+
+def test_cache_evicts_least_recently_used():
+    heuristic = CountingHeuristic()
+    cache = HeuristicCache(heuristic, max_size=2)
+    for state in [1, 2, 1, 3]:
+        cache(make_root_node(state))
+    # 2 was evicted, 1 was used more recently than 2.
+    assert list(cache.cache) == [1, 3]
+    cache(make_root_node(2))
+    assert heuristic.calls == 4
+    assert list(cache.cache) == [3, 2]
+
+
+def test_cache_batch():
+    heuristic = CountingHeuristic()
+    cache = HeuristicCache(heuristic)
+    cache(make_root_node(1))
+    nodes = [make_root_node(state) for state in [1, 2, 2, 3]]
+    assert cache.evaluate_batch(nodes) == [1, 2, 2, 3]
+    assert heuristic.calls == 4
+    assert cache.evaluate_batch(nodes) == [1, 2, 2, 3]
+    assert heuristic.calls == 4
+
+
+def test_cache_path_dependent():
+    heuristic = PathHeuristic()
+    cache = HeuristicCache(heuristic)
+    root = make_root_node(1)
+    child = make_child_node(root, "op", 1)
+    assert cache(root) == 0
+    assert cache(child) == 1
+    assert heuristic.calls == 2
+    assert len(cache.cache) == 0
@@ -0,0 +1,117 @@
+import random
+
+import pytest
+
+from pyperplan.search import searchspace
+from pyperplan.search.a_star import (
+    ordered_node_astar,
+    ordered_node_greedy_best_first,
+    ordered_node_weighted_astar,
+)
+from pyperplan.search.open_lists import (
+    AlternationOpenList,
+    BucketOpenList,
+    HeapOpenList,
+    make_open_list,
+    OPEN_LISTS,
+)
+
+
+def _make_nodes(count):
+    random.seed(0)
+    nodes = []
+    for index in range(count):
+        node = searchspace.make_root_node(index)
+        node.g = random.randint(0, 10)
+        nodes.append((node, random.randint(0, 10)))
+    return nodes
+
+
+def _pop_all(open_list):
+    popped = []
+    while open_list:
+        popped.append(open_list.pop())
+    return popped
+
+
+@pytest.mark.parametrize(
+    "make_open_entry, weights",
+    [
+        (ordered_node_astar, (1, 1)),
+        (ordered_node_weighted_astar(3), (1, 3)),
+        (ordered_node_greedy_best_first, (0, 1)),
+    ],
+)
+def test_bucket_open_list_order(make_open_entry, weights):
+    nodes = _make_nodes(500)
+    heap = HeapOpenList(make_open_entry)
+    buckets = BucketOpenList(*weights)
+    for open_list in [heap, buckets]:
+        # Interleave pushes and pops like a search does.
+        for node, h in nodes[:300]:
+            open_list.push(node, h)
+        for _ in range(100):
+            open_list.pop()
+        for node, h in nodes[300:]:
+            open_list.push(node, h)
+    assert len(buckets) == len(heap) == 400
+    assert _pop_all(buckets) == _pop_all(heap)
+
+
+def test_bucket_open_list_lifo():
+    nodes = _make_nodes(3)
+    open_list = BucketOpenList(0, 1, lifo=True)
+    for node, _ in nodes:
+        open_list.push(node, 2)
+    open_list.push(nodes[0][0], 1)
+    assert _pop_all(open_list) == [
+        (1, nodes[0][0]),
+        (2, nodes[2][0]),
+        (2, nodes[1][0]),
+        (2, nodes[0][0]),
+    ]
+    with pytest.raises(IndexError):
+        open_list.pop()
+
+
+def test_bucket_open_list_needs_integers():
+    open_list = BucketOpenList()
+    open_list.push(searchspace.make_root_node("s"), 2.0)
+    with pytest.raises(ValueError):
+        open_list.push(searchspace.make_root_node("s"), 0.5)
+    with pytest.raises(ValueError):
+        open_list.push(searchspace.make_root_node("s"), float("inf"))
+
+
+def test_alternation_open_list():
+    open_list = AlternationOpenList(
+        HeapOpenList(ordered_node_greedy_best_first),
+        HeapOpenList(ordered_node_greedy_best_first),
+        boost=2,
+    )
+    nodes = [searchspace.make_root_node(index) for index in range(6)]
+    for h, node in enumerate(nodes):
+        open_list.push(node, h, preferred=h >= 3)
+    assert len(open_list) == 9
+    # The lists take turns, starting with the list of all nodes.
+    assert [node.state for _, node in [open_list.pop() for _ in range(4)]] == [
+        0,
+        3,
+        1,
+        4,
+    ]
+    # After a boost, the preferred list is popped until its priority is the
+    # highest again or it is empty.
+    open_list.boost()
+    assert [node.state for _, node in _pop_all(open_list)] == [5, 2, 3, 4, 5]
+
+
+def test_make_open_list():
+    for name in OPEN_LISTS:
+        assert len(make_open_list(name, ordered_node_astar)) == 0
+        open_list = make_open_list(name, ordered_node_astar, preferred=True)
+        assert isinstance(open_list, AlternationOpenList)
+        assert len(open_list) == 0
+    assert make_open_list("bucket-lifo", ordered_node_astar).lifo
+    with pytest.raises(ValueError):
+        make_open_list("unknown", ordered_node_astar)
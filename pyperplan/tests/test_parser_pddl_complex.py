@@ -1,6 +1,7 @@
 from pytest import raises
 
-from pyperplan.pddl.lisp_parser import parse_lisp_iterator
+from pyperplan.pddl.errors import ParseError
+from pyperplan.pddl.lisp_parser import parse_lisp_iterator, parse_lisp_stream
 from pyperplan.pddl.parser import *
 
 
@@ -535,3 +536,99 @@ def test_parseProblemDef():
     predNames = [p.name for p in prob.init.predicates]
     assert len(predNames) == 13
     assert set(predNames) == {"at", "in-city"}
+
+
+def test_parseProblemStream():
+    test = [
+        "(define (problem logistics-4-1) ; comment (",
+        "(:domain logistics)",
+        "(:objects apn1 - airplane apt2 apt1 - (either airport location) x y)",
+        "(:init (at apn1 apt2) (handempty) (in-city?x ?y))",
+        "(:goal (and (at apn1 apt1))))",
+    ]
+    prob = parse_problem_stream(parse_lisp_stream(test))
+    expected = parse_problem_def(parse_lisp_iterator(test))
+    assert prob.name == expected.name == "logistics-4-1"
+    assert prob.domainName == "logistics"
+    assert [(o.name, o.typeName) for o in prob.objects] == [
+        (o.name, o.typeName) for o in expected.objects
+    ]
+    assert [o.typeName for o in prob.objects] == [
+        "airplane",
+        ["airport", "location"],
+        ["airport", "location"],
+        None,
+        None,
+    ]
+    assert [(p.name, p.parameters) for p in prob.init.predicates] == [
+        ("at", ["apn1", "apt2"]),
+        ("handempty", []),
+        ("in-city", ["?x", "?y"]),
+    ]
+    assert prob.goal.formula.key == "and"
+
+
+def test_parseProblemStream_fail():
+    for test, message in [
+        ("(define (problem p) (:domain d) (:init at) (:goal (at)))", "not a structure"),
+        (
+            "(define (problem p) (:domain d) (:init (at (x))) (:goal (at)))",
+            "not a word",
+        ),
+        ("(define (problem p) (:domain d) (:objects (a)) (:init))", "not a word"),
+        ("(define (problem p) (:domain d) (:init) (:goal (at)) x)", "expected to be"),
+        ("(define (problem p) (:domain d) (:init (at x)", "missing closing"),
+        ("(define (problem p) (:domain d) (:init) (:goal (at))) x", "Unexpected"),
+    ]:
+        with raises(ParseError) as stream_error:
+            parse_problem_stream(parse_lisp_stream([test]))
+        with raises(ParseError) as error:
+            parse_problem_def(parse_lisp_iterator([test]))
+        assert stream_error.value.args[0] == error.value.args[0]
+        assert stream_error.value.args[0].startswith(message)
+    test = ["(define (problem p) (:domain d) (:objects :a) (:init) (:goal (at)))"]
+    with raises(ValueError):
+        parse_problem_stream(parse_lisp_stream(test))
+
+
+def _parse_problem_error(problem, stream):
+    parser = Parser(None)
+    parser.probInput = problem
+    with raises(Exception) as error:
+        parser.parse_problem(None, read_from_file=False, stream=stream)
+    return type(error.value), str(error.value)
+
+
+def test_parseProblemStream_errors():
+    rest = "(:domain d) (:objects a b - block) (:init (clear a)) (:goal (clear b)))"
+    for test in [
+        "((define (problem p) " + rest,
+        "() define (problem p) " + rest,
+        "(define problem p) " + rest,
+        "(define ((problem p) " + rest,
+        "(define) (problem p) " + rest,
+        "(define (problem) ) " + rest,
+        "(define (problem p) (:domain d) (:objects a - ) (:init) (:goal (at)))",
+        "(define (problem p) (:domain d) (:objects a) (:init (clear (a)) ))",
+        "(define (problem p) (:domain d) (:objects a) (:init (clear a) -)",
+        "(define (problem p) (:domain d) (:init) (:goal (at))) x",
+        "(define (problem p) (:domain d) (:init) (:goal (at)) x)",
+    ]:
+        # The streaming parser fails like the general parser.
+        assert _parse_problem_error(test, True) == _parse_problem_error(test, False)
+
+
+def test_parseProblemStream_programming_error(monkeypatch):
+    import pyperplan.pddl.parser as parser_module
+
+    def broken_init(tokens):
+        raise IndexError("bug")
+
+    monkeypatch.setattr(parser_module, "_stream_init", broken_init)
+    parser = Parser(None)
+    parser.probInput = (
+        "(define (problem p) (:domain d) (:objects a) (:init) (:goal (at a)))"
+    )
+    # Only parse errors fall back to the general parser.
+    with raises(IndexError):
+        parser.parse_problem(None, read_from_file=False, stream=True)
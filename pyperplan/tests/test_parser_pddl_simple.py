@@ -291,3 +291,8 @@ def test_parse_goal_stmt_fail():
     iter = parse_lisp_iterator(test)
     with raises(ValueError):
         parse_goal_stmt(iter)
+
+
+def test_lisp_parser_tokens():
+    test = ["(Foo?x ?Y; (comment", "bar(baz) ;)", ")"]
+    assert parse_lisp_iterator(test).contents == ["foo", "?x", "?y", "bar", ["baz"]]
@@ -1,9 +1,17 @@
+import itertools
+import random
+
 import pytest
 
 from pyperplan import grounding
 from pyperplan.heuristics.relaxation import *
 from pyperplan.pddl.parser import Parser
-from pyperplan.search import a_star, enforced_hillclimbing_search, make_root_node
+from pyperplan.search import (
+    a_star,
+    enforced_hillclimbing_search,
+    make_child_node,
+    make_root_node,
+)
 from pyperplan.task import Operator, Task
 
 from .heuristic_test_instances import *
@@ -201,6 +209,135 @@ def test_heuristics(task, hadd, hmax, hsa, hff):
     compare_h_values(hFFHeuristic, task, hff)
 
 
+def _all_states(task):
+    facts = sorted(task.facts)
+    for size in range(len(facts) + 1):
+        for state in itertools.combinations(facts, size):
+            yield frozenset(state)
+
+
+@pytest.mark.parametrize(
+    "task", [task1, task2, task3, task4, task5, task6, task9, task10, task12, task14]
+)
+@pytest.mark.parametrize("Heuristic", [hAddHeuristic, hMaxHeuristic])
+def test_incremental_heuristics(task, Heuristic):
+    rh = Heuristic(task)
+    incremental = Heuristic(task, incremental=True)
+    # Always repair, however many facts change.
+    incremental.max_repair_ratio = inf
+    for state in _all_states(task):
+        node = make_root_node(state)
+        assert incremental(node) == rh(node)
+    assert incremental.repair_failures == 0
+
+
+@pytest.mark.parametrize("Heuristic", [hAddHeuristic, hMaxHeuristic, hFFHeuristic])
+def test_incremental_heuristics_random_walk(Heuristic):
+    parser = Parser("")
+    parser.domInput = blocks_dom
+    parser.probInput = blocks_problem_1
+    domain = parser.parse_domain(False)
+    task = grounding.ground(parser.parse_problem(domain, False))
+
+    rh = Heuristic(task)
+    incremental = Heuristic(task, incremental=True)
+    incremental.max_repair_ratio = inf
+    random.seed(0)
+    node = make_root_node(task.initial_state)
+    for _ in range(100):
+        h_value = incremental(node)
+        if Heuristic is hFFHeuristic:
+            # The relaxed plan depends on the order of ties.
+            assert (h_value == inf) == (rh(node) == inf)
+        else:
+            assert h_value == rh(node)
+        op, state = random.choice(list(task.get_successor_states(node.state)))
+        node = make_child_node(node, op, state)
+    assert incremental.repairs == 99
+
+
+@pytest.mark.parametrize(
+    "task", [task1, task2, task3, task4, task5, task6, task9, task10, task12, task14]
+)
+@pytest.mark.parametrize("Heuristic", [hAddHeuristic, hMaxHeuristic])
+def test_numpy_backend(task, Heuristic):
+    pytest.importorskip("numpy")
+    rh = Heuristic(task)
+    numpy_rh = Heuristic(task, backend="numpy")
+    for state in _all_states(task):
+        node = make_root_node(state)
+        assert numpy_rh(node) == rh(node)
+
+
+@pytest.mark.parametrize(
+    "task,hff",
+    [
+        (task1, 2),
+        (task2, 1),
+        (task3, 1),
+        (task4, 1),
+        (task5, 2),
+        (task6, 4),
+        (task7, inf),
+        (task8, 0),
+        (task9, 2),
+        (task10, 4),
+        (task12, 4),
+        (task13, 0),
+        (task14, inf),
+    ],
+)
+def test_numpy_backend_hff(task, hff):
+    pytest.importorskip("numpy")
+    rh = hFFHeuristic(task, backend="numpy")
+    node = make_root_node(task.initial_state)
+    assert rh(node) == hff
+    h_value, relaxed_plan = rh.calc_h_with_plan(node)
+    assert h_value == hff
+    if hff == inf:
+        assert relaxed_plan is None
+    else:
+        assert len(relaxed_plan) == hff
+        assert relaxed_plan <= {op.name for op in task.operators}
+
+
+@pytest.mark.parametrize("Heuristic", [hAddHeuristic, hMaxHeuristic, hFFHeuristic])
+@pytest.mark.parametrize("backend", ["python", "numpy"])
+def test_evaluate_batch(Heuristic, backend):
+    if backend == "numpy":
+        pytest.importorskip("numpy")
+    rh = Heuristic(task10, backend=backend)
+    nodes = [make_root_node(state) for state in _all_states(task10)]
+    assert rh.evaluate_batch(nodes) == [rh(node) for node in nodes]
+    assert rh.evaluate_batch([]) == []
+
+
+@pytest.mark.parametrize("backend", ["python", "numpy"])
+@pytest.mark.parametrize("task", [task10, task12, task14])
+def test_hff_keep_relaxed_plans(task, backend):
+    if backend == "numpy":
+        pytest.importorskip("numpy")
+    rh = hFFHeuristic(task, backend=backend)
+    expected = [
+        rh.calc_h_with_plan(make_root_node(state)) for state in _all_states(task)
+    ]
+    rh.keep_relaxed_plans = True
+    nodes = [make_root_node(state) for state in _all_states(task)]
+    values = rh.evaluate_batch(nodes[:-1]) + [rh(nodes[-1])]
+    assert values == [h_value for h_value, _ in expected]
+    # The relaxed plans are taken from the nodes without a forward pass.
+    rh.dijkstra = rh.calc_engine_h = None
+    for node, (h_value, relaxed_plan) in zip(nodes, expected):
+        assert rh.calc_h_with_plan(node) == (h_value, relaxed_plan)
+
+
+def test_relaxation_backend_errors():
+    with pytest.raises(ValueError):
+        hAddHeuristic(task1, backend="unknown")
+    with pytest.raises(ValueError):
+        hAddHeuristic(task1, incremental=True, backend="numpy")
+
+
 def compare_h_values(Heuristic, task, expected):
     rh = Heuristic(task)
     h_value = rh(make_root_node(task.initial_state))
@@ -2,7 +2,34 @@
 Unit test for searchalgorithms.py
 """
 
-from pyperplan.search import breadth_first_search
+import functools
+import os
+import queue
+import random
+
+import pytest
+
+from pyperplan import planner
+from pyperplan.heuristics.blind import BlindHeuristic
+from pyperplan.heuristics.heuristic_base import Heuristic
+from pyperplan.heuristics.landmarks import LandmarkHeuristic
+from pyperplan.heuristics.lm_cut import LmCutHeuristic
+from pyperplan.heuristics.relaxation import hAddHeuristic, hFFHeuristic
+from pyperplan.search import (
+    astar_search,
+    breadth_first_search,
+    enforced_hillclimbing_random_walk_search,
+    enforced_hillclimbing_search,
+    greedy_best_first_search,
+    iterative_deepening_search,
+    lazy_astar_search,
+    lazy_greedy_best_first_search,
+    lazy_weighted_astar_search,
+    monte_carlo_rrw_search,
+    weighted_astar_search,
+)
+from pyperplan.search.open_lists import OPEN_LISTS
+from pyperplan.task import Operator, Task
 
 from . import dummy_task
 
@@ -40,3 +67,319 @@ def test_breadth_first_search_four_step():
     print(solution)
     assert solution != None
     assert len(solution) == 4
+
+
+blocks_problem = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "../../benchmarks/blocks/task01.pddl",
+)
+
+
+@pytest.mark.parametrize(
+    "search, heuristic_class",
+    [
+        (breadth_first_search, None),
+        (iterative_deepening_search, None),
+        (astar_search, BlindHeuristic),
+        (astar_search, hFFHeuristic),
+        (astar_search, LandmarkHeuristic),
+        (astar_search, LmCutHeuristic),
+        (greedy_best_first_search, hAddHeuristic),
+    ],
+)
+def test_bitset_search(search, heuristic_class):
+    domain_file = planner.find_domain(blocks_problem)
+    plans = [
+        planner.search_plan(
+            domain_file, blocks_problem, search, heuristic_class, use_bitsets=bitsets
+        )
+        for bitsets in [False, True]
+    ]
+    assert [op.name for op in plans[0]] == [op.name for op in plans[1]]
+
+
+@pytest.mark.parametrize("open_list", ["bucket", "bucket-lifo"])
+@pytest.mark.parametrize(
+    "search, heuristic_class",
+    [
+        (astar_search, BlindHeuristic),
+        (weighted_astar_search, hFFHeuristic),
+        (greedy_best_first_search, hFFHeuristic),
+    ],
+)
+def test_bucket_open_list_search(search, heuristic_class, open_list):
+    domain_file = planner.find_domain(blocks_problem)
+    task = planner.load_task(domain_file, blocks_problem)
+    plans = [
+        search(task, heuristic_class(task), open_list=name)
+        for name in ["heap", open_list]
+    ]
+    assert _reaches_goal(task, plans[1])
+    if open_list == "bucket":
+        # Both break ties first in first out.
+        assert plans[1] == plans[0]
+    if search is astar_search:
+        assert len(plans[1]) == len(plans[0])
+
+
+@pytest.mark.parametrize("use_relaxed_plan", [False, True])
+@pytest.mark.parametrize(
+    "search", [lazy_greedy_best_first_search, lazy_weighted_astar_search]
+)
+def test_lazy_search(search, use_relaxed_plan):
+    domain_file = planner.find_domain(blocks_problem)
+    task = planner.load_task(domain_file, blocks_problem)
+    for open_list in ["heap", "bucket"]:
+        plan = search(
+            task,
+            hFFHeuristic(task),
+            use_relaxed_plan=use_relaxed_plan,
+            open_list=open_list,
+        )
+        assert _reaches_goal(task, plan)
+
+
+@pytest.mark.parametrize(
+    "search",
+    [
+        greedy_best_first_search,
+        weighted_astar_search,
+        lazy_greedy_best_first_search,
+        lazy_weighted_astar_search,
+    ],
+)
+def test_preferred_operators(search):
+    domain_file = planner.find_domain(blocks_problem)
+    task = planner.load_task(domain_file, blocks_problem)
+    for open_list in ["heap", "bucket"]:
+        plan = search(
+            task, hFFHeuristic(task), use_relaxed_plan=True, open_list=open_list
+        )
+        assert _reaches_goal(task, plan)
+
+
+@pytest.mark.parametrize(
+    "search", [greedy_best_first_search, lazy_greedy_best_first_search]
+)
+def test_preferred_operators_complete(search):
+    # The relaxed plan of the initial state uses get-c-bad, which leads to a
+    # dead end. The search has to continue with the other successors.
+    operators = [
+        Operator("get-c-bad", {"a"}, {"c"}, {"a"}),
+        Operator("get-d", {"a"}, {"d"}, set()),
+        Operator("get-c-good", {"a", "d"}, {"c"}, set()),
+        Operator("reach", {"a", "c"}, {"g"}, set()),
+    ]
+    task = Task("dead-end", {"a", "c", "d", "g"}, frozenset({"a"}), {"g"}, operators)
+    plan = search(task, hFFHeuristic(task), use_relaxed_plan=True)
+    assert [op.name for op in plan] == ["get-d", "get-c-good", "reach"]
+
+
+def test_enforced_hillclimbing_preferred_operators_fallback():
+    # The only preferred successor of the initial state is a dead end (see
+    # test_preferred_operators_complete).
+    operators = [
+        Operator("get-c-bad", {"a"}, {"c"}, {"a"}),
+        Operator("get-d", {"a"}, {"d"}, set()),
+        Operator("get-c-good", {"a", "d"}, {"c"}, set()),
+        Operator("reach", {"a", "c"}, {"g"}, set()),
+    ]
+    task = Task("dead-end", {"a", "c", "d", "g"}, frozenset({"a"}), {"g"}, operators)
+    plan = enforced_hillclimbing_search(
+        task, hFFHeuristic(task), use_preferred_ops=True, random_op_ordering=False
+    )
+    assert [op.name for op in plan] == ["get-d", "get-c-good", "reach"]
+
+
+@pytest.mark.parametrize(
+    "search", [greedy_best_first_search, enforced_hillclimbing_search]
+)
+def test_keep_relaxed_plans_restored(search):
+    domain_file = planner.find_domain(blocks_problem)
+    task = planner.load_task(domain_file, blocks_problem)
+    heuristic = hFFHeuristic(task)
+    assert _reaches_goal(task, search(task, heuristic, True))
+    # The heuristic can be shared with later searches without preferred
+    # operators.
+    assert not heuristic.keep_relaxed_plans
+
+
+@pytest.mark.parametrize("open_list", OPEN_LISTS)
+@pytest.mark.parametrize(
+    "search",
+    [
+        astar_search,
+        greedy_best_first_search,
+        weighted_astar_search,
+        lazy_greedy_best_first_search,
+    ],
+)
+def test_unsolvable_initial_state(search, open_list):
+    # No operator achieves the goal, so hFF is infinite in the initial state.
+    operators = [Operator("a-b", {"a"}, {"b"}, set())]
+    task = Task("unsolvable", {"a", "b", "g"}, frozenset({"a"}), {"g"}, operators)
+    assert search(task, hFFHeuristic(task), open_list=open_list) is None
+
+
+def test_lazy_search_dummy_tasks():
+    task = dummy_task.get_search_space_at_goal()
+    assert lazy_astar_search(task, BlindHeuristic(task)) == []
+    task = dummy_task.get_search_space_no_solution()
+    assert lazy_astar_search(task, BlindHeuristic(task)) is None
+    task = dummy_task.get_simple_search_space()
+    assert len(lazy_astar_search(task, BlindHeuristic(task))) == 3
+
+
+def _reaches_goal(task, plan):
+    state = task.initial_state
+    for op in plan:
+        assert op.applicable(state)
+        state = op.apply(state)
+    return task.goal_reached(state)
+
+
+@pytest.mark.parametrize(
+    "search",
+    [
+        monte_carlo_rrw_search,
+        functools.partial(
+            enforced_hillclimbing_random_walk_search, restart_sequence=None
+        ),
+    ],
+)
+def test_random_walk_search(search):
+    random.seed(0)
+    domain_file = planner.find_domain(blocks_problem)
+    task = planner._ground(planner._parse(domain_file, blocks_problem))
+    plan = search(task, hFFHeuristic(task))
+    assert plan is not None
+    assert _reaches_goal(task, plan)
+
+
+@pytest.mark.parametrize("heuristic_class", [hAddHeuristic, hFFHeuristic])
+@pytest.mark.parametrize("search", [astar_search, enforced_hillclimbing_search])
+def test_batch_evaluation(search, heuristic_class):
+    pytest.importorskip("numpy")
+    domain_file = planner.find_domain(blocks_problem)
+    task = planner._ground(planner._parse(domain_file, blocks_problem))
+    plan = search(task, heuristic_class(task, backend="numpy"))
+    assert plan is not None
+    assert _reaches_goal(task, plan)
+
+
+class _CountingEvaluations(Heuristic):
+    def __init__(self, heuristic, batched):
+        self.heuristic = heuristic
+        self.batched = batched
+        self.evaluations = 0
+
+    def __call__(self, node):
+        self.evaluations += 1
+        return self.heuristic(node)
+
+
+def test_enforced_hillclimbing_evaluations():
+    domain_file = planner.find_domain(blocks_problem)
+    task = planner._ground(planner._parse(domain_file, blocks_problem))
+    plans = []
+    heuristics = []
+    for batched in [False, True]:
+        random.seed(0)
+        heuristic = _CountingEvaluations(hFFHeuristic(task), batched)
+        plans.append(
+            enforced_hillclimbing_search(task, heuristic, random_op_ordering=False)
+        )
+        heuristics.append(heuristic)
+    assert plans[0] == plans[1]
+    # Without a batch backend, no successor after the first improving one is
+    # evaluated.
+    assert heuristics[0].evaluations < heuristics[1].evaluations
+
+
+@pytest.mark.parametrize(
+    "search, heuristic_class",
+    [
+        (monte_carlo_rrw_search, hFFHeuristic),
+        (astar_search, LandmarkHeuristic),
+        (greedy_best_first_search, hAddHeuristic),
+    ],
+)
+def test_heuristic_cache(search, heuristic_class):
+    random.seed(0)
+    domain_file = planner.find_domain(blocks_problem)
+    task = planner._ground(planner._parse(domain_file, blocks_problem))
+    plan = planner.search_plan(
+        domain_file,
+        blocks_problem,
+        search,
+        heuristic_class,
+        heuristic_cache_size=1000,
+    )
+    assert plan is not None
+    assert _reaches_goal(task, plan)
+
+
+@pytest.mark.parametrize(
+    "search",
+    [
+        monte_carlo_rrw_search,
+        functools.partial(
+            enforced_hillclimbing_random_walk_search, restart_sequence=None
+        ),
+    ],
+)
+def test_parallel_random_walk_search(search):
+    random.seed(0)
+    domain_file = planner.find_domain(blocks_problem)
+    task = planner._ground(planner._parse(domain_file, blocks_problem))
+    plan = search(task, hFFHeuristic(task), num_workers=2)
+    assert plan is not None
+    assert _reaches_goal(task, plan)
+
+
+def test_parse_portfolio():
+    assert planner.parse_portfolio(["gbf:hff", "bfs"]) == [
+        (greedy_best_first_search, hFFHeuristic),
+        (breadth_first_search, None),
+    ]
+    with pytest.raises(ValueError):
+        planner.parse_portfolio(["gbf:unknown"])
+
+
+def test_search_runs():
+    domain_file = planner.find_domain(blocks_problem)
+    task = planner.load_task(domain_file, blocks_problem)
+    heuristic = hFFHeuristic(task)
+    runs = list(planner.search_runs(task, monte_carlo_rrw_search, heuristic, [3, 4, 3]))
+    assert [seed for seed, _ in runs] == [3, 4, 3]
+    assert all(_reaches_goal(task, plan) for _, plan in runs)
+    assert runs[0][1] == runs[2][1]
+
+
+def _set_task_search(task):
+    return breadth_first_search(task.get_set_task())
+
+
+def test_portfolio_member_set_task_plan():
+    domain_file = planner.find_domain(blocks_problem)
+    task = planner.load_task(domain_file, blocks_problem, use_bitsets=True)
+    results = queue.Queue()
+    planner._run_portfolio_member(task, _set_task_search, None, 0, results)
+    index, solution = results.get_nowait()
+    assert index == 0
+    assert _reaches_goal(task, [task.operators[op_index] for op_index in solution])
+
+
+@pytest.mark.parametrize("deadline", [None, 60])
+def test_search_portfolio(deadline):
+    domain_file = planner.find_domain(blocks_problem)
+    portfolio = planner.parse_portfolio(["gbf:hff", "astar:lmcut", "bfs"])
+    plan = planner.search_portfolio(
+        domain_file, blocks_problem, portfolio, deadline=deadline
+    )
+    task = planner._ground(planner._parse(domain_file, blocks_problem))
+    assert plan is not None
+    assert _reaches_goal(task, plan)
+    if deadline is not None:
+        # The optimal searches finish, so the shortest plan is returned.
+        assert len(plan) == 6
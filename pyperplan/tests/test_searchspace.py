@@ -2,7 +2,9 @@
 Unit Testing for the search space module
 """
 
-from pyperplan.search.searchspace import make_child_node, make_root_node
+import pytest
+
+from pyperplan.search.searchspace import make_child_node, make_root_node, NodeStore
 
 
 # Construct a small tree in order to perform some needed test methods
@@ -44,3 +46,41 @@ def test_states():
 # right action since this is done implicitly by the test_extract_solution
 # method, i.e., if this test passes, it will imply that each node contains the
 # right action
+
+
+def test_search_node_slots():
+    assert not hasattr(root, "__dict__")
+    with pytest.raises(AttributeError):
+        root.h = 0
+
+
+store = NodeStore()
+store_root = store.make_root_node("state1")
+store_child1 = store.make_child_node(store_root, "action1", "state2")
+store_child2 = store.make_child_node(store_root, "action2", "state3")
+store_grandchild1 = store.make_child_node(store_child1, "action3", "state4")
+store_grandchild2 = store.make_child_node(store_child2, "action1", "state2")
+
+
+def test_node_store_extract_solution():
+    assert store.extract_solution(store_root) == []
+    assert store.extract_solution(store_grandchild1) == ["action1", "action3"]
+    assert store.extract_solution(store_grandchild2) == ["action2", "action1"]
+
+
+def test_node_store_g_values():
+    assert store.g[store_root] == 0
+    assert store.g[store_child1] == 1
+    assert store.g[store_grandchild2] == 2
+
+
+def test_node_store_states():
+    assert len(store) == 5
+    assert store.get_state(store_root) == "state1"
+    assert store.get_state(store_grandchild1) == "state4"
+    assert store.contains_state("state3")
+    assert not store.contains_state("state5")
+    # states and actions are only stored once
+    assert store.node_states[store_child1] == store.node_states[store_grandchild2]
+    assert len(store.state_registry) == 4
+    assert len(store.actions) == 3
@@ -0,0 +1,55 @@
+import pytest
+
+from pyperplan.search.state_registry import DictStateRegistry, StateRegistry
+from pyperplan.task import BitsetOperator, BitsetTask, Operator, Task
+
+
+op = Operator("op", {"a"}, {"b"}, {"a"})
+set_task = Task("set", {"a", "b", "c"}, frozenset({"a"}), {"b"}, [op])
+bitset_op = BitsetOperator("op", 0b001, 0b010, 0b001)
+bitset_task = BitsetTask("bits", ("a", "b", "c"), 0b001, 0b010, [bitset_op])
+
+set_states = [
+    frozenset(),
+    frozenset({"a"}),
+    frozenset({"b"}),
+    frozenset({"a", "c"}),
+    frozenset({"a", "b", "c"}),
+]
+bitset_states = [0, 0b001, 0b010, 0b101, 0b111]
+
+
+@pytest.mark.parametrize(
+    "registry,states",
+    [
+        (DictStateRegistry(), set_states),
+        (StateRegistry(set_task), set_states),
+        (StateRegistry(bitset_task), bitset_states),
+    ],
+)
+def test_insert_and_lookup(registry, states):
+    for index, state in enumerate(states):
+        assert registry.lookup(state) is None
+        assert registry.insert(state) == (index, True)
+    assert len(registry) == len(states)
+    for index, state in enumerate(states):
+        assert registry.insert(state) == (index, False)
+        assert registry.lookup(state) == index
+        assert registry.get_state(index) == state
+    assert len(registry) == len(states)
+
+
+def test_registry_grows():
+    registry = StateRegistry(bitset_task)
+    for state in range(1000):
+        assert registry.insert(state) == (state, True)
+    assert len(registry) == 1000
+    assert all(registry.lookup(state) == state for state in range(1000))
+    assert registry.lookup(1000) is None
+
+
+def test_registry_accepts_sets():
+    registry = StateRegistry(set_task)
+    state_id, _ = registry.insert({"c", "a"})
+    assert registry.lookup(frozenset({"a", "c"})) == state_id
+    assert registry.get_state(state_id) == frozenset({"a", "c"})
@@ -1,9 +1,12 @@
 """
 Tests for the task.py module
 """
+import itertools
+import random
+
 import pytest
 
-from pyperplan.task import Operator, Task
+from pyperplan.task import BitsetOperator, BitsetTask, Operator, Task
 
 
 s1 = frozenset(["var1"])
@@ -67,3 +70,103 @@ def test_task_goal_reached1():
 
 def test_task_goal_reached2():
     assert task1.goal_reached({"var1", "var2"})
+
+
+bitset_task = BitsetTask(
+    "bitset_task1",
+    ["var1", "var2", "var3"],
+    0b001,
+    0b011,
+    [
+        BitsetOperator("op1", 0b001, 0b010, 0b000),
+        BitsetOperator("op2", 0b001, 0b000, 0b000),
+        BitsetOperator("op3", 0b010, 0b001, 0b000),
+        BitsetOperator("op4", 0b001, 0b010, 0b011),
+    ],
+)
+
+
+def test_bitset_op_applicable():
+    op1, _, op3, _ = bitset_task.operators
+    assert op1.applicable(0b001)
+    assert op1.applicable(0b011)
+    assert not op1.applicable(0b010)
+    assert not op3.applicable(0b101)
+
+
+def test_bitset_op_application():
+    op1, _, _, op4 = bitset_task.operators
+    assert op1.apply(0b001) == 0b011
+    # delete-effects are applied before add-effects
+    assert op4.apply(0b001) == 0b010
+    with pytest.raises(AssertionError):
+        op1.apply(0b010)
+
+
+def test_bitset_task_successors():
+    op1, op2, _, op4 = bitset_task.operators
+    assert bitset_task.get_successor_states(0b001) == [
+        (op1, 0b011),
+        (op2, 0b001),
+        (op4, 0b010),
+    ]
+    assert bitset_task.get_successor_states(0b100) == []
+
+
+def test_bitset_task_goal_reached():
+    assert not bitset_task.goal_reached(0b001)
+    assert bitset_task.goal_reached(0b111)
+
+
+def test_bitset_task_facts():
+    assert bitset_task.get_facts(0b101) == {"var1", "var3"}
+    assert bitset_task.get_state({"var1", "var3"}) == 0b101
+    set_task = bitset_task.get_set_task()
+    assert set_task.initial_state == {"var1"}
+    assert set_task.goals == {"var1", "var2"}
+    assert [op.name for op in set_task.operators] == ["op1", "op2", "op3", "op4"]
+    assert set_task.operators[3].del_effects == {"var1", "var2"}
+
+
+def test_successor_generator_matches_operator_scan():
+    facts = ["var%d" % i for i in range(6)]
+    rng = random.Random(42)
+    operators = [
+        Operator(
+            "op%d" % i,
+            rng.sample(facts, rng.randint(0, 3)),
+            rng.sample(facts, 1),
+            rng.sample(facts, 1),
+        )
+        for i in range(40)
+    ]
+    operators.append(operators[0])
+    task = Task("task", set(facts), frozenset(), frozenset(), operators)
+    for states in itertools.product([False, True], repeat=len(facts)):
+        state = frozenset(fact for fact, true in zip(facts, states) if true)
+        expected = [(op, op.apply(state)) for op in operators if op.applicable(state)]
+        assert task.get_successor_states(state) == expected
+
+
+def test_bitset_successor_generator_matches_operator_scan():
+    rng = random.Random(42)
+    operators = [
+        BitsetOperator("op%d" % i, rng.getrandbits(6) & rng.getrandbits(6), 1, 2)
+        for i in range(40)
+    ]
+    task = BitsetTask("task", ["var%d" % i for i in range(6)], 0, 0, operators)
+    for state in range(2**6):
+        expected = [(op, op.apply(state)) for op in operators if op.applicable(state)]
+        assert task.get_successor_states(state) == expected
+
+
+def test_task_applicable_operators():
+    assert list(task1.get_applicable_operators(init)) == [op1, op2]
+    assert list(task1.get_applicable_operators({"var3"})) == []
+
+
+def test_task_sample_applicable_operator():
+    random.seed(0)
+    samples = {task1.sample_applicable_operator(init) for _ in range(50)}
+    assert samples == {op1, op2}
+    assert task1.sample_applicable_operator({"var3"}) is None
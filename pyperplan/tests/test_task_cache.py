@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from pyperplan import planner, task_cache
+
+
+benchmarks = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "../../benchmarks"
+)
+problems = [
+    os.path.join(benchmarks, "blocks", "task03.pddl"),
+    os.path.join(benchmarks, "airport", "task02.pddl"),
+]
+
+
+def _assert_same_task(task, loaded):
+    assert type(loaded) is type(task)
+    assert loaded.name == task.name
+    assert loaded.facts == task.facts
+    assert loaded.initial_state == task.initial_state
+    assert loaded.goals == task.goals
+    assert loaded.operators == task.operators
+
+
+@pytest.mark.parametrize("problem_file", problems)
+@pytest.mark.parametrize("use_bitsets", [False, True])
+def test_write_and_read_task(tmp_path, problem_file, use_bitsets):
+    task = planner.load_task(
+        planner.find_domain(problem_file), problem_file, use_bitsets
+    )
+    filename = str(tmp_path / "task")
+    task_cache.write_task(task, filename)
+    _assert_same_task(task, task_cache.read_task(filename))
+
+
+def test_read_invalid_file(tmp_path):
+    filename = str(tmp_path / "task")
+    with open(filename, "wb") as file:
+        file.write(b"not a task")
+    assert task_cache.read_task(filename) is None
+
+
+def test_task_key(tmp_path):
+    domain_file = planner.find_domain(problems[0])
+    key = task_cache.task_key(domain_file, problems[0], {"use_bitsets": False})
+    assert key == task_cache.task_key(domain_file, problems[0], {"use_bitsets": False})
+    assert key != task_cache.task_key(domain_file, problems[0], {"use_bitsets": True})
+    assert key != task_cache.task_key(domain_file, problems[1], {"use_bitsets": False})
+
+
+def test_load_task_from_cache(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    domain_file = planner.find_domain(problems[0])
+    task = planner.load_task(domain_file, problems[0], cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 1
+
+    def fail(*args):
+        raise AssertionError("The cached task is parsed again")
+
+    monkeypatch.setattr(planner, "_parse", fail)
+    _assert_same_task(
+        task, planner.load_task(domain_file, problems[0], cache_dir=cache_dir)
+    )
@@ -1,10 +1,9 @@
 import argparse
-import subprocess
 import yaml
-import json
 from collections import OrderedDict
 import os
-import platform
+
+from pyperplan.experiments import find_problems, make_runs, run_experiment
 
 def main():
     argparser = argparse.ArgumentParser(
@@ -14,107 +13,58 @@ def main():
     argparser.add_argument(dest="domain")
     argparser.add_argument(dest="num_task_experiments")
     argparser.add_argument(dest="num_runs_per_task")
-    
+    argparser.add_argument("-j", "--jobs", type=int, help="Number of parallel runs (default: number of CPUs)")
+    argparser.add_argument("--time-limit", type=float, default=600, help="CPU time limit of a run in seconds")
+    argparser.add_argument("--memory-limit", type=int, help="Memory limit of a run in MiB")
+
     args = argparser.parse_args()
 
     domain = args.domain
-    # print(domain)
-
-    # Get the operating system name
-    os_name = platform.system()
-    # print(os_name)
-    # exit()
-
-    # Check if it's Windows or mac and set path to domain file
-    if os_name == 'Windows':
-        domain_path = "benchmarks\\" + domain + "\\domain01.pddl"
-        starting_problem_path = "benchmarks\\" + domain + "\\task01.pddl"
-    elif os_name == 'Darwin':
-        domain_path = "benchmarks/" + domain + "/domain01.pddl"
-        starting_problem_path = "benchmarks/" + domain + "/task01.pddl"
-    else:
-        print(f"Unknown operating system: {os_name}")
-        exit()
-
-
-    starting_problem = 'tasks ' + starting_problem_path.split('k')[-1].split('.')[0]
-
-    # Define the command and arguments
-
-    experiment_prompt = ["pyperplan", "-H", "hff", "-s", args.algo, domain_path, starting_problem_path, args.num_task_experiments, args.num_runs_per_task]
-
-    # exit()
-
-    starting_problem_number = int(starting_problem.split('s')[-1])
-    stopping_problem = starting_problem_number-1 + int(args.num_task_experiments)
-
+    domain_dir = os.path.join("benchmarks", domain)
+    output_path = os.path.join("benchmarks", "experiment_output")
 
+    starting_problem_number = 1
     stopping_problem = starting_problem_number-1 + int(args.num_task_experiments)
-
+    num_runs = int(args.num_runs_per_task)
 
     print('\nRunning Experiments...\n')
     
-    print(f'Executing {starting_problem}-{stopping_problem} each for {args.num_runs_per_task} runs\n')
-    print('Time limit = 10 mins')
-    # print('restart_depth = 10')
+    print(f'Executing tasks {starting_problem_number}-{stopping_problem} each for {args.num_runs_per_task} runs\n')
+    print(f'Time limit = {args.time_limit:g} s')
 
 
     print(f'Domain: {domain}')
     print(f'Algorithm: {args.algo}\n')
 
+    problem_files = find_problems(domain_dir, starting_problem_number, int(args.num_task_experiments))
+    runs = make_runs(problem_files, [args.algo + ":hff"], range(num_runs))
+    output_name = 'luby_' + args.algo + '_' + domain + f'_tasks{starting_problem_number}-{stopping_problem}'
+    results = run_experiment(
+        runs,
+        results_file=os.path.join(output_path, output_name + '.jsonl'),
+        num_jobs=args.jobs,
+        time_limit=args.time_limit,
+        memory_limit=args.memory_limit,
+    )
 
-    # Run the command and capture the output
-    proc = subprocess.run(experiment_prompt, capture_output=True, text=True)
-
-    # Get the output
-    output = proc.stdout
-    error = proc.stderr
-
-    print(output, error)
-    task_list = output.split("task_splitter")[1:]
-
-    # print(output.count('\n'))
-    # print(task_list[1])
     OUTPUT_dict = {
 
         }
 
-    for task_output in task_list:
-        task_output = task_output.splitlines()[1:]
-        task_number = task_output[0].split(' ')[-1]
-
-        run_list = ('\n').join(task_output)
-        run_list = run_list.split('run_splitter')[1:]
+    for task_index, problem_file in enumerate(problem_files):
+        task_number = starting_problem_number + task_index
+        task_results = [result for result in results if result['problem_file'] == problem_file]
 
         OUTPUT_dict[f"task {task_number}"] = {}
 
-        run_number = 0
-        for run in run_list:
-            run_number += 1
-            run_output = run.splitlines()[1:]
-            
+        for run_number, result in enumerate(task_results, 1):
             OUTPUT_dict[f"task {task_number}"][f'run {run_number}'] = {}
 
-
-            for output in run_output:
-                if 'Nodes expanded' in output:
-                    expansions = output.split()
-                    expansions = ' '.join(expansions[-3:-2])
-                
-                    OUTPUT_dict[f"task {task_number}"][f'run {run_number}']['expansions'] = expansions
-            
-                # print(output)
-
-                if 'No solution could be found' in output:
-                    OUTPUT_dict[f"task {task_number}"][f'run {run_number}']['expansions'] = 'timed out'
-
-
-                if 'Plan length' in output:
-                    plan_length = output.split()
-                    plan_length = ' '.join(plan_length[-1:])
-                    
-                    OUTPUT_dict[f"task {task_number}"][f'run {run_number}']['plan length'] = plan_length
-        # print(f'run number: {run_number}')
+            if result['status'] == 'solved':
+                OUTPUT_dict[f"task {task_number}"][f'run {run_number}']['expansions'] = str(result['expansions'])
+                OUTPUT_dict[f"task {task_number}"][f'run {run_number}']['plan length'] = str(result['plan_length'])
+            else:
+                OUTPUT_dict[f"task {task_number}"][f'run {run_number}']['expansions'] = 'timed out'
 
         task_total_expansions = 0
 
@@ -132,9 +82,6 @@ def main():
 
 
 
-        run_number = 0
-
-
     total_cases = 0
     cases_without_timeout = 0
 
@@ -160,31 +107,16 @@ def main():
     # exit()
 
 
-    OUTPUT_dict = str(OUTPUT_dict)
-    OUTPUT_dict = json.loads(OUTPUT_dict.replace("'", "\""))
     OUTPUT_dict = OrderedDict(sorted(OUTPUT_dict.items(), key=lambda t: int(t[0].split(' ')[1])))
     yaml_string = yaml.dump(OUTPUT_dict)
  
     print('Experiment Output:\n')
 
     print(yaml_string)
-    # exit()
-
-    if os_name == 'Windows':
-        output_path = 'benchmarks\\experiment_output'
-        with open(output_path + '\\' + 'luby_' + args.algo + '_' + domain + f'_tasks{starting_problem_number}-{stopping_problem}' +  '.yaml', 'w') as file:
-            file.write(yaml_string)
-
-    elif os_name == 'Darwin':
-        output_path = 'benchmarks/experiment_output'
-        with open(output_path + '/' + 'luby_' + args.algo + '_' + domain + f'_tasks{starting_problem_number}-{stopping_problem}' +  '.yaml', 'w') as file:
-            file.write(yaml_string)
-
-
-    
 
-    # print(f'domain: {domain}')
+    with open(os.path.join(output_path, output_name + '.yaml'), 'w') as file:
+        file.write(yaml_string)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -38,5 +38,6 @@ setup(
         "Topic :: Scientific/Engineering",
     ],
     install_requires=["wheel"],
+    extras_require={"numpy": ["numpy"]},
     python_requires=">=3.6",
 )